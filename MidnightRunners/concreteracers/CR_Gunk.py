@@ -1,8 +1,7 @@
-from copy import deepcopy
 from MidnightRunners.concreteracers.RacerList import RacerName
 from MidnightRunners.core import AbstractRacer, BoardState
 from MidnightRunners.core.Player import Player
-from MidnightRunners.core.StateChange import MoveType
+from MidnightRunners.core.StateChange import MoveType, drop_dependent_changes
 from MidnightRunners.core.Track import FIXED_TRACK_LENGTH
 
 class Gunk(AbstractRacer):
@@ -11,14 +10,12 @@ class Gunk(AbstractRacer):
 
 
     def get_power_changes(self, bs, changes):
-        before_bs = deepcopy(bs)
         power_triggered = False
 
         # Go through all the changes
         for i in range(len(changes)):
             change = changes[i]
             if self.name in change.racers_processed or change.racer_flags.get("move_decreased", False):
-                before_bs.apply_change_list([change])
                 continue
             change.racers_processed.add(self.name)
 
@@ -38,7 +35,6 @@ class Gunk(AbstractRacer):
                         # Only if the racers movement is not already reduced because of reaching the finish line, decrease new pos by 1
                         pos_change.new_position = bs.track.GetNewSpace(pos_change.new_position, -1)
                     change.add_message(f"{pos_change.racer_name.value}'s movement is decreased by 1 from {self.name.value}.")
-                    return changes[0:i+1], True # Return early since all other changes after this could be invalid now
-
-            before_bs.apply_change_list([change])
+                    # Return early, dropping the changes that were caused by the original move since they could be invalid now
+                    return drop_dependent_changes(changes, i), True
         return changes, power_triggered
\ No newline at end of file
@@ -50,6 +50,7 @@ class Mouth(AbstractRacer):
                     power_activated = True
                     change.racers_processed.add(self.name)
                     elimination_change = ChangeSet()
+                    elimination_change.set_cause(change)
                     victim = racers_on_my_space[0]
                     elimination_change.add_eliminate_change(victim)
                     elimination_change.racers_processed.add(self.name)
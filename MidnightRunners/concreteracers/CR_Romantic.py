@@ -64,6 +64,7 @@ class Romantic(AbstractRacer):
             for space, racers in spaces_with_two_racers:
                 power_triggered = True
                 my_power_move = ChangeSet()
+                my_power_move.set_cause(change)
                 my_old_pos = after_bs.racer_name_to_position_map[self.name]
                 my_new_pos = bs.track.GetNewSpace(my_old_pos, 2)
                 my_power_move.add_pos_change(self.name, my_old_pos, my_new_pos)
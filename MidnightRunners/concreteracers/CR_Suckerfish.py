@@ -63,6 +63,7 @@ class Suckerfish(AbstractRacer):
             if chosen_index != 0:
                 power_activated = True
                 my_power_move = ChangeSet()
+                my_power_move.set_cause(change)
 
                 # Move myself to the new position
                 chosen_racer_name, chosen_new_pos = racers_moved_from_my_pos[chosen_index - 1]
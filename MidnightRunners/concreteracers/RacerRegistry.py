@@ -0,0 +1,77 @@
+"""
+Registry of the racer factories per racer name, imported only when a lineup uses the racer.
+
+A racer is found by the module naming convention: the racer named "Rocket Scientist" is the class
+RocketScientist in MidnightRunners.concreteracers.CR_RocketScientist. Racers defined elsewhere, e.g. in
+a plugin package, are added with register_racer(racer_name, "package.module:factory"). A factory is
+called with the player and returns the racer, like the racer classes themselves.
+
+Looking up which racers are available does not import their modules, so the GUI can list racers and
+a pool worker can build its lineup from racer names at the cost of the racers it actually runs.
+"""
+
+from importlib import import_module
+from importlib.util import find_spec
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.Player import Player
+
+RACER_MODULE_PREFIX = "MidnightRunners.concreteracers.CR_"
+
+# Factory paths ("module:attribute") of racers registered explicitly, overriding the naming convention
+registered_racers = {}
+# Imported factories per racer name
+racer_factories = {}
+
+
+def get_convention_path(racer_name: RacerName) -> str:
+    class_name = racer_name.value.replace(" ", "")
+    return f"{RACER_MODULE_PREFIX}{class_name}:{class_name}"
+
+
+def register_racer(racer_name: RacerName, factory_path: str):
+    """Use the factory at "module:attribute" for the racer, imported when the racer is first used."""
+    if ":" not in factory_path:
+        raise ValueError(f"Racer factory path must look like 'module:attribute', got {factory_path!r}")
+    registered_racers[racer_name] = factory_path
+    racer_factories.pop(racer_name, None)
+
+
+def get_factory_path(racer_name: RacerName) -> str:
+    return registered_racers.get(racer_name, get_convention_path(racer_name))
+
+
+def get_racer_module_name(racer_name: RacerName) -> str:
+    return get_factory_path(racer_name).split(":")[0]
+
+
+def is_racer_available(racer_name: RacerName) -> bool:
+    """Whether the module of the racer exists, checked without importing it."""
+    if racer_name in racer_factories:
+        return True
+    try:
+        return find_spec(get_racer_module_name(racer_name)) is not None
+    except ModuleNotFoundError:  # The parent package of a registered module does not exist
+        return False
+
+
+def get_available_racers() -> list:
+    """Racer names with an implementation, in RacerName order."""
+    return [racer_name for racer_name in RacerName if is_racer_available(racer_name)]
+
+
+def get_racer_factory(racer_name: RacerName):
+    """Import the factory of a racer on first use."""
+    if racer_name not in racer_factories:
+        module_name, attribute = get_factory_path(racer_name).split(":")
+        if not is_racer_available(racer_name):
+            raise KeyError(f"No racer implementation for {racer_name.value} (expected module {module_name})")
+        racer_factories[racer_name] = getattr(import_module(module_name), attribute)
+    return racer_factories[racer_name]
+
+
+def get_player_racer_config(racer_names: list) -> dict:
+    """Player to racer factory config for racer names in seat order, as used by Race lineups and run_batch."""
+    if len(racer_names) > len(Player):
+        raise ValueError(f"At most {len(Player)} racers fit in a lineup, got {len(racer_names)}")
+    return {player: get_racer_factory(racer_name) for player, racer_name in zip(Player, racer_names)}
@@ -1,15 +1,15 @@
 from copy import deepcopy
-import random
 
 from MidnightRunners.concreteracers.RacerList import RacerName
 from MidnightRunners.core.BoardState import BoardState
 from MidnightRunners.core.BoardView import PrintChangeList
+from MidnightRunners.core.Dice import Dice
 from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Profiler import measure, STAGE_POWER_CHANGES
 from MidnightRunners.core.RacerAI import NaiveRacerAI
 from MidnightRunners.core.StateChange import ChangeSet, MoveType, PositionChange, TurnPhaseChange
 from MidnightRunners.core.Track import Track
 from MidnightRunners.core.Turn import TurnPhase
-# from gui.input_dialogs import DiceRollInputDialog
 
 
 class AbstractRacer:
@@ -18,6 +18,8 @@ class AbstractRacer:
         self.name = racer_name
         self.ai = NaiveRacerAI(self.player_name, self.name) # Can be replaced with concrete racer specific AI if needed
         self.ask_for_move_input = ask_for_move_input
+        self.dice = Dice() # Replaced by the race's dice when the racer joins a race
+        self.profiler = None # Set by the race when it is profiled
 
     def before_race_effect(self, board_state) -> BoardState:
         """Trigger any before-race effects this racer may have."""
@@ -33,7 +35,7 @@ class AbstractRacer:
             main_move_change.add_trip_change(self.name, True, False)
             main_move_change.add_message(f"{self.name.value} is tripped and skips their main move this turn.")
         else:
-            roll = random.randint(1, 6)
+            roll = self.dice.roll(self.player_name)
             current_position = board_state.racer_name_to_position_map[self.name]
             new_position = Track.GetNewSpace(current_position, roll)
             pos_change = PositionChange(self.name, current_position, new_position)
@@ -114,9 +116,13 @@ class AbstractRacer:
                     my_turn_changes = self.get_end_of_turn_changes(bs_copy)
                 if len(my_turn_changes) > 0:
                     had_my_turn_triggers = True
+                for my_turn_change in my_turn_changes:
+                    if my_turn_change.cause_id is None:
+                        my_turn_change.set_cause(change)
                 new_changes.extend(my_turn_changes)
 
         changes.extend(new_changes)
-        changes, had_power_triggers = self.get_power_changes(bs_copy, changes)
+        with measure(self.profiler, STAGE_POWER_CHANGES, type(self).__name__):
+            changes, had_power_triggers = self.get_power_changes(bs_copy, changes)
 
         return changes, (had_my_turn_triggers or had_power_triggers)
\ No newline at end of file
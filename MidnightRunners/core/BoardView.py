@@ -1,7 +1,12 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
-from MidnightRunners.core import BoardState
 from MidnightRunners.core.StateChange import ChangeSet
 
+if TYPE_CHECKING:  # BoardState imports this module through Track
+    from MidnightRunners.core.BoardState import BoardState
+
 @staticmethod
 def PrintChangeList(changes: list, title: str = "Change List"):
     print(title)
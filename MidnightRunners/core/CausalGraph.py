@@ -0,0 +1,144 @@
+"""
+Causal graph of the changes created and edited while a race resolves its triggers.
+
+The race gives every ChangeSet a change id that survives deep copies. Each turn phase change is a
+root. When a racer or the track reacts to a change list, the graph compares the list before and
+after the call: new change sets become children of their cause (or, when the creator did not set
+one, of the change set right before them), and change sets edited in place (e.g. a move shortened
+by Gunk, a trip added by Banana) get a new version node whose parent is the previous version.
+Change sets dropped by the call are marked as discarded, since they will be recomputed.
+"""
+
+import json
+
+from MidnightRunners.core.StateChange import ChangeSet
+
+NODE_ROOT = "root"
+NODE_CREATED = "created"
+NODE_EDITED = "edited"
+
+
+def get_change_signature(change: ChangeSet) -> tuple:
+    """The effect of a change set on the board, ignoring messages and processed markers."""
+    return (
+        tuple((pos_change.racer_name, pos_change.old_position, pos_change.new_position) for pos_change in change.position_changes),
+        tuple((trip_change.racer_name, trip_change.tripped_after) for trip_change in change.trip_changes),
+        tuple((point_change.player, point_change.points_delta) for point_change in change.point_changes),
+        tuple(eliminate_change.racer_name for eliminate_change in change.eliminate_changes),
+        tuple(change.finished_racers),
+        tuple(phase_change.new_phase for phase_change in change.turn_phase_changes),
+    )
+
+
+class CausalNode:
+    """One version of a change set, created or edited by an owner (a racer class name, Race or Track)."""
+    def __init__(self, node_id: int, change_id: int, kind: str, owner: str, parent_ids: list,
+                 turn_number: int, description: str):
+        self.node_id = node_id
+        self.change_id = change_id
+        self.kind = kind
+        self.owner = owner
+        self.parent_ids = parent_ids
+        self.turn_number = turn_number
+        self.description = description
+        self.discarded = False
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.node_id,
+            "change_id": self.change_id,
+            "kind": self.kind,
+            "owner": self.owner,
+            "parents": self.parent_ids,
+            "turn": self.turn_number,
+            "description": self.description,
+            "discarded": self.discarded,
+        }
+
+
+class CausalGraph:
+    """Parent to child DAG of change set versions, recorded during trigger resolution."""
+    def __init__(self):
+        self.nodes = []
+        self.children = {}
+        self.latest_node_ids = {}  # Change id -> node id of its latest version
+        self.root_node_id = None
+        self.turn_number = 0
+
+    def add_node(self, change: ChangeSet, kind: str, owner: str, parent_ids: list) -> CausalNode:
+        description = change.change_messages[-1] if change.change_messages else ""
+        node = CausalNode(len(self.nodes), change.change_id, kind, owner, parent_ids, self.turn_number, description)
+        self.nodes.append(node)
+        self.children[node.node_id] = []
+        for parent_id in parent_ids:
+            self.children[parent_id].append(node.node_id)
+        self.latest_node_ids[change.change_id] = node.node_id
+        return node
+
+    def record_root(self, phase_change: ChangeSet, owner: str, turn_number: int):
+        """Record the change that starts a turn phase, which causes everything resolved in that phase."""
+        self.turn_number = turn_number
+        self.root_node_id = self.add_node(phase_change, NODE_ROOT, owner, []).node_id
+
+    def snapshot(self, changes: list) -> dict:
+        """Change ids and signatures of a change list, taken before a racer or the track reacts to it."""
+        return {change.change_id: get_change_signature(change) for change in changes}
+
+    def record_call(self, owner: str, snapshot: dict, changes: list):
+        """Record the change sets the owner created, edited and dropped, compared to the snapshot."""
+        seen_change_ids = set()
+        cause_node_id = self.root_node_id
+        for change in changes:
+            change_id = change.change_id
+            if change_id in snapshot and change_id not in seen_change_ids:
+                seen_change_ids.add(change_id)
+                if get_change_signature(change) != snapshot[change_id]:
+                    self.add_node(change, NODE_EDITED, owner, [self.latest_node_ids[change_id]])
+                cause_node_id = self.latest_node_ids[change_id]
+            else:
+                parent_id = self.latest_node_ids.get(change.cause_id, cause_node_id)
+                self.add_node(change, NODE_CREATED, owner, [parent_id] if parent_id is not None else [])
+        for change_id in snapshot:
+            if change_id not in seen_change_ids:
+                self.nodes[self.latest_node_ids[change_id]].discarded = True
+
+    def get_descendants(self, node_id: int) -> list:
+        """All nodes caused (directly or indirectly) by the given node, in creation order."""
+        descendants = set()
+        pending = [node_id]
+        while pending:
+            for child_id in self.children[pending.pop()]:
+                if child_id not in descendants:
+                    descendants.add(child_id)
+                    pending.append(child_id)
+        return sorted(descendants)
+
+    def get_ancestors(self, node_id: int) -> list:
+        """The chain of causes of the given node, in creation order."""
+        ancestors = set()
+        pending = list(self.nodes[node_id].parent_ids)
+        while pending:
+            parent_id = pending.pop()
+            if parent_id not in ancestors:
+                ancestors.add(parent_id)
+                pending.extend(self.nodes[parent_id].parent_ids)
+        return sorted(ancestors)
+
+    def to_json(self) -> dict:
+        return {"nodes": [node.to_dict() for node in self.nodes]}
+
+    def to_dot(self) -> str:
+        """Graphviz description of the graph, e.g. to render one turn's trigger cascade."""
+        lines = ["digraph causal_graph {"]
+        for node in self.nodes:
+            label = f"{node.owner} {node.kind}\\n{node.description}".replace('"', "'")
+            style = ", style=dashed" if node.discarded else ""
+            lines.append(f'  n{node.node_id} [label="{label}"{style}];')
+            for parent_id in node.parent_ids:
+                lines.append(f"  n{parent_id} -> n{node.node_id};")
+        lines.append("}")
+        return "\n".join(lines)
+
+    def save(self, path: str):
+        with open(path, "w") as graph_file:
+            json.dump(self.to_json(), graph_file, indent=2)
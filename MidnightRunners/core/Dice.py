@@ -0,0 +1,65 @@
+"""
+Dice used by racers for their rolls during a race.
+"""
+
+import random
+
+from MidnightRunners.core.Player import Player
+
+
+class DiceExhaustedError(IndexError):
+    """Raised when predetermined dice have no rolls left."""
+
+
+class Dice:
+    """D6 roll source for a race. Without a seed, rolls come from the global random module.
+
+    With a seed, every player gets their own roll stream, so the n-th roll of a seat is the same
+    across races that share the seed, regardless of what the other seats did. Antithetic dice turn
+    every roll into 7 - roll.
+    """
+    def __init__(self, seed: int = None, antithetic: bool = False):
+        self.seed = seed
+        self.antithetic = antithetic
+        self.player_rngs = {}
+
+    def roll(self, player: Player) -> int:
+        """Roll a D6 for the given player."""
+        if self.seed is None:
+            roll = random.randint(1, 6)
+        else:
+            if player not in self.player_rngs:
+                self.player_rngs[player] = random.Random(f"{self.seed}:{player.value}")
+            roll = self.player_rngs[player].randint(1, 6)
+        return 7 - roll if self.antithetic else roll
+
+
+class ScriptedDice(Dice):
+    """Dice that hand out predetermined rolls per player, e.g. rolls drawn by the batch engine."""
+    def __init__(self, player_rolls: dict):
+        super().__init__()
+        self.player_rolls = {player: list(rolls) for player, rolls in player_rolls.items()}
+        self.player_roll_index = {player: 0 for player in self.player_rolls}
+
+    def roll(self, player: Player) -> int:
+        """Hand out the next scripted roll for the given player."""
+        roll_index = self.player_roll_index[player]
+        if roll_index >= len(self.player_rolls[player]):
+            raise DiceExhaustedError(f"No scripted rolls left for player {player.value}")
+        self.player_roll_index[player] = roll_index + 1
+        return int(self.player_rolls[player][roll_index])
+
+
+class SequenceDice(Dice):
+    """Dice that hand out one predetermined sequence of rolls, whichever player rolls."""
+    def __init__(self, rolls: tuple):
+        super().__init__()
+        self.rolls = tuple(rolls)
+        self.roll_index = 0
+
+    def roll(self, player: Player) -> int:
+        """Hand out the next roll of the sequence."""
+        if self.roll_index >= len(self.rolls):
+            raise DiceExhaustedError(f"No rolls left in the sequence of {len(self.rolls)} rolls")
+        self.roll_index += 1
+        return self.rolls[self.roll_index - 1]
@@ -0,0 +1,101 @@
+"""
+Opt-in profiler that records wall time and call counts per race stage and per racer class.
+
+A race only measures its stages when it is given a profiler. Passing the same profiler to many
+races (e.g. a batch) aggregates their costs, which can then be printed as a cost table.
+"""
+
+from contextlib import nullcontext
+from time import perf_counter
+
+# Stages measured by the race and the racers
+STAGE_RACE = "do_race"
+STAGE_TRIGGER_PASS = "check_triggers pass"
+STAGE_RACER_TRIGGERS = "trig_changes"
+STAGE_POWER_CHANGES = "get_power_changes"
+STAGE_TRACK_TRIGGERS = "Track.trig_changes"
+STAGE_LOOP_DETECTION = "board_state_loop_detected"
+STAGE_APPLY_TO_COPY = "apply_changes_to_copy"
+
+RACE_OWNER = "Race"
+TRACK_OWNER = "Track"
+
+# Shared do-nothing context, so disabled profiling does not create objects
+NO_PROFILING = nullcontext()
+
+
+class StageStats:
+    """Accumulated call count and wall time of one stage for one owner."""
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+
+class StageTimer:
+    """Context manager that adds the time spent inside it to a StageStats."""
+    def __init__(self, stats: StageStats):
+        self.stats = stats
+        self.start_time = 0.0
+
+    def __enter__(self):
+        self.start_time = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.calls += 1
+        self.stats.total_time += perf_counter() - self.start_time
+        return False
+
+
+class RaceProfiler:
+    """Wall time and call counts per (owner, stage), where the owner is a racer class name, Race or Track.
+
+    Stage times are inclusive: trig_changes contains get_power_changes of the same racer, and
+    board_state_loop_detected contains the apply_changes_to_copy calls it makes.
+    """
+    def __init__(self):
+        self.stage_stats = {}
+
+    def measure(self, stage: str, owner: str) -> StageTimer:
+        key = (owner, stage)
+        if key not in self.stage_stats:
+            self.stage_stats[key] = StageStats()
+        return StageTimer(self.stage_stats[key])
+
+    def get_stats(self, owner: str, stage: str) -> StageStats:
+        return self.stage_stats.get((owner, stage), StageStats())
+
+    def get_racer_costs(self) -> dict:
+        """Stage stats per racer class name, leaving out the race and track stages."""
+        racer_costs = {}
+        for (owner, stage), stats in self.stage_stats.items():
+            if owner not in (RACE_OWNER, TRACK_OWNER):
+                racer_costs.setdefault(owner, {})[stage] = stats
+        return racer_costs
+
+    def get_cost_table(self) -> list:
+        """Rows of (owner, stage, calls, total seconds, mean seconds, share of race time), most expensive first."""
+        race_time = self.get_stats(RACE_OWNER, STAGE_RACE).total_time
+        rows = []
+        for (owner, stage), stats in self.stage_stats.items():
+            share = stats.total_time / race_time if race_time > 0 else 0.0
+            rows.append((owner, stage, stats.calls, stats.total_time, stats.mean_time, share))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def format_cost_table(self) -> str:
+        lines = [f"{'Owner':<14} {'Stage':<26} {'Calls':>9} {'Total [s]':>10} {'Mean [us]':>10} {'Share':>7}"]
+        for owner, stage, calls, total_time, mean_time, share in self.get_cost_table():
+            lines.append(f"{owner:<14} {stage:<26} {calls:>9} {total_time:>10.3f} {mean_time * 1e6:>10.1f} {share:>7.1%}")
+        return "\n".join(lines)
+
+
+def measure(profiler: RaceProfiler, stage: str, owner: str):
+    """Measure a stage with the given profiler, or do nothing when profiling is disabled."""
+    if profiler is None:
+        return NO_PROFILING
+    return profiler.measure(stage, owner)
@@ -7,7 +7,17 @@ from MidnightRunners.concreteracers.RacerList import RacerName
 from MidnightRunners.core.BoardView import PrintBoardState, PrintChangeList, DisplayBoardAfterRace, DisplayRacerPositions
 from MidnightRunners.core.AbstractRacer import AbstractRacer
 from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.CausalGraph import CausalGraph
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Profiler import (
+    RaceProfiler, measure, RACE_OWNER, TRACK_OWNER, STAGE_RACE, STAGE_TRIGGER_PASS, STAGE_RACER_TRIGGERS,
+    STAGE_TRACK_TRIGGERS, STAGE_LOOP_DETECTION, STAGE_APPLY_TO_COPY
+)
+from MidnightRunners.core.RaceTracer import (
+    RaceTracer, trace, CATEGORY_TURN, CATEGORY_PHASE, CATEGORY_TRIGGERS, CATEGORY_RACER, CATEGORY_TRACK
+)
 from MidnightRunners.core.StateChange import ChangeSet
+from MidnightRunners.core.TriggerCounters import TriggerCounters, STOP_RACE_FINISHED, STOP_NO_TRIGGERS, STOP_LOOP_DETECTED
 from MidnightRunners.core.Track import TrackVersion, Track
 from MidnightRunners.core.Player import Player
 from MidnightRunners.core.Turn import GetNextTurnPhase, TurnPhase
@@ -15,9 +25,22 @@ from MidnightRunners.core.Turn import GetNextTurnPhase, TurnPhase
 num_turns_limit = 200  # Limit number of turns to avoid infinite loops
 
 class Race:
-    def __init__(self, track_version: TrackVersion, player_to_racer_map: dict):
+    def __init__(self, track_version: TrackVersion, player_to_racer_map: dict, dice: Dice = None, verbose: bool = True,
+                 profiler: RaceProfiler = None, trigger_counters: TriggerCounters = None, tracer: RaceTracer = None,
+                 causal_graph: CausalGraph = None):
         self.num_players = len(player_to_racer_map)
         self.player_to_racer_map = player_to_racer_map
+        self.verbose = verbose # Batch simulations turn off console logging
+        self.profiler = profiler # Only measure stage costs when a profiler is given
+        self.trigger_counters = trigger_counters # Only count change set reprocessing when counters are given
+        self.tracer = tracer # Only record trace events when a tracer is given
+        self.turn_span = None
+        self.causal_graph = causal_graph # Only record which change caused which when a graph is given
+
+        # All racers roll with the race's dice, so a seeded race is reproducible
+        self.set_dice(dice if dice is not None else Dice())
+        for racer in player_to_racer_map.values():
+            racer.profiler = self.profiler
         if track_version == TrackVersion.MILD:
             self.track = Track(TrackVersion.MILD)
         else:
@@ -25,6 +48,7 @@ class Race:
 
         self.full_race_change_list = []
         self.current_turn_change_list = []
+        self.next_change_id = 0
 
         # Create map from player enum to racer name, which does not have the full Racer object
         player_to_racer_name_map = {player: racer.name for player, racer in player_to_racer_map.items()}
@@ -32,22 +56,76 @@ class Race:
 
         self.turn_order = [Player.P1, Player.P2, Player.P3, Player.P4, Player.P5, Player.P6][:self.num_players]
         self.num_turns_taken = 0
+        self.race_started = False # Set once the before-race powers have been triggered
+
+    def set_dice(self, dice: Dice):
+        """Make the race and all its racers roll with the given dice."""
+        self.dice = dice
+        for racer in self.player_to_racer_map.values():
+            racer.dice = dice
 
     def do_race(self):
-        self.trigger_before_race_powers()
+        self.race_started = False
         self.full_race_change_list = []
-        while (not self.board_state.race_is_finished) and self.num_turns_taken < num_turns_limit: # limit turns to avoid infinite loops
+        return self.continue_race()
+        # GameGUI().test_window()
+
+    def continue_race(self):
+        """Play until the race is over, starting it first if needed, e.g. for a race restored from a snapshot.
+
+        Returns the changes since the race started or, for a restored race, since the snapshot.
+        """
+        with measure(self.profiler, STAGE_RACE, RACE_OWNER):
+            if not self.race_started:
+                self.trigger_before_race_powers()
+            while not self.is_race_over():
+                self.do_turn_phase()
+            self.go_to_next_turn()  # Finalize last turn
+        self.close_turn_span()
+        if self.trigger_counters is not None:
+            self.trigger_counters.record_race_end(self.board_state.race_is_finished)
+        if self.verbose:
+            DisplayBoardAfterRace(self.board_state)
+        return self.full_race_change_list
+
+    def is_race_over(self) -> bool:
+        """Check if the race is finished or the turn limit is reached (to avoid infinite loops)."""
+        return self.board_state.race_is_finished or self.num_turns_taken >= num_turns_limit
+
+    def do_turn_phase(self) -> list:
+        """Advance to the next turn phase, resolve all triggers and apply the resulting changes."""
+        next_phase = GetNextTurnPhase(self.board_state.current_turn_phase)
+        if self.tracer is not None and next_phase == TurnPhase.PH1_START_OF_TURN:
+            self.turn_span = self.tracer.open_span(f"Turn {self.board_state.current_turn_number + 1}", CATEGORY_TURN,
+                                                   player=self.board_state.turn_order[0].name)
+        with trace(self.tracer, next_phase.name, CATEGORY_PHASE) as phase_args:
             changes = []
             changes.append(self.go_to_next_turn_phase(self.board_state.current_turn_phase))
+            self.link_new_changes(changes)
+            if self.causal_graph is not None:
+                turn_number = self.board_state.current_turn_number + (next_phase == TurnPhase.PH1_START_OF_TURN)
+                self.causal_graph.record_root(changes[0], RACE_OWNER, turn_number)
             changes = self.check_triggers(changes)
             self.board_state.apply_change_list(changes)
             self.turn_order = list(self.board_state.turn_order)
             self.full_race_change_list.extend(changes)
             self.current_turn_change_list.extend(changes)
-        self.go_to_next_turn()  # Finalize last turn
-        DisplayBoardAfterRace(self.board_state)
-        return self.full_race_change_list
-        # GameGUI().test_window()
+            phase_args["changes"] = len(changes)
+        if next_phase == TurnPhase.PH4_END_OF_TURN:
+            self.close_turn_span()
+        return changes
+
+    def close_turn_span(self):
+        """Close the trace span of the current turn, if one is open."""
+        if self.turn_span is not None:
+            self.tracer.close_span(self.turn_span)
+            self.turn_span = None
+
+    def do_turn(self):
+        """Advance turn phases until the next player's turn is up or the race is over."""
+        self.do_turn_phase()
+        while self.board_state.current_turn_phase != TurnPhase.PH0_BETWEEN_TURNS and not self.is_race_over():
+            self.do_turn_phase()
 
     def go_to_next_turn_phase(self, current_phase: TurnPhase) -> ChangeSet:
         """Advance to the next turn phase, returning a newly created Change object."""
@@ -59,7 +137,8 @@ class Race:
             self.go_to_next_turn()
             phase_change.add_turn_sequence_change(self.turn_order)
             phase_change.add_message(f"Next turn: player {self.turn_order[0].name}")
-            print(f"=== [Turn {self.num_turns_taken + 1}] Processing turn... ================================================")
+            if self.verbose:
+                print(f"=== [Turn {self.num_turns_taken + 1}] Processing turn... ================================================")
 
         phase_change.add_message(f"Advancing turn phase from {current_phase.name} to {next_phase.name}.")
         phase_change.add_turn_phase_change(current_phase, next_phase)
@@ -68,44 +147,101 @@ class Race:
 
     def check_triggers(self, changes) -> list:
         """Check for any triggers based on the given change, return updated change list."""
-        print("Checking for triggers...")
+        if self.verbose:
+            print("Checking for triggers...")
+        num_passes = 0
         while True:
-            any_changes_found = False
-            for player in self.turn_order:
-                racer = self.player_to_racer_map[player]
-                print(f"  Checking triggers for racer {racer.name.value}...")
-                # Don't process racers that have already finished or been eliminated
-                # TODO: This did not actually work as intended, since the racer order might mean
-                # some racers are eliminated before they can actually react (mouth, gunk)
-                # Maybe we have to do this in a smarter way, where we instead after checking the racer's triggers,
-                # if there is any change, we only take those changes into account if the racer is not eliminated/finished at the end of that changeset?
-                # after_bs = self.apply_changes_to_copy(self.board_state, changes)
-                # if after_bs.first_place_racer == racer.name or \
-                #    after_bs.second_place_racer == racer.name or \
-                #    racer.name in after_bs.eliminated_racers:
-                #     continue
-                changes, racer_had_triggers = racer.trig_changes(self.board_state, changes)
-                any_changes_found = any_changes_found or racer_had_triggers
-                if racer_had_triggers:
-                    print(f"    Racer {racer.name.value} had triggers! Now about to trigger track...")
-                    changes, track_had_triggers = self.track.trig_changes(self.board_state, changes)
-                    if track_had_triggers:
-                        continue
+            with measure(self.profiler, STAGE_TRIGGER_PASS, RACE_OWNER), \
+                 trace(self.tracer, f"check_triggers pass {num_passes + 1}", CATEGORY_TRIGGERS,
+                       changes_before=len(changes)) as pass_args:
+                changes, any_changes_found = self.check_triggers_pass(changes)
+                pass_args["changes_after"] = len(changes)
+                pass_args["triggered"] = any_changes_found
+            num_passes += 1
 
             # changes, _ = self.track.trig_changes(self.board_state, changes)
 
             if self.apply_changes_to_copy(self.board_state, changes).race_is_finished:
+                stop_reason = STOP_RACE_FINISHED
                 break
             if not any_changes_found:
+                stop_reason = STOP_NO_TRIGGERS
                 break
             if self.board_state_loop_detected(changes):
+                stop_reason = STOP_LOOP_DETECTED
                 break
+        if self.trigger_counters is not None:
+            self.trigger_counters.record_check_triggers(num_passes, stop_reason, len(changes))
         return changes
 
+    def check_triggers_pass(self, changes: list) -> tuple[list, bool]:
+        """Let every racer (and the track after them) react to the changes once."""
+        any_changes_found = False
+        for player in self.turn_order:
+            racer = self.player_to_racer_map[player]
+            if self.verbose:
+                print(f"  Checking triggers for racer {racer.name.value}...")
+            # Don't process racers that have already finished or been eliminated
+            # TODO: This did not actually work as intended, since the racer order might mean
+            # some racers are eliminated before they can actually react (mouth, gunk)
+            # Maybe we have to do this in a smarter way, where we instead after checking the racer's triggers,
+            # if there is any change, we only take those changes into account if the racer is not eliminated/finished at the end of that changeset?
+            # after_bs = self.apply_changes_to_copy(self.board_state, changes)
+            # if after_bs.first_place_racer == racer.name or \
+            #    after_bs.second_place_racer == racer.name or \
+            #    racer.name in after_bs.eliminated_racers:
+            #     continue
+            if self.trigger_counters is not None:
+                self.trigger_counters.record_racer_visit(type(racer).__name__, racer.name, changes)
+            changes, racer_had_triggers = self.call_trigger_owner(
+                type(racer).__name__, STAGE_RACER_TRIGGERS, CATEGORY_RACER, f"{racer.name.value}.trig_changes",
+                racer.trig_changes, changes)
+            any_changes_found = any_changes_found or racer_had_triggers
+            if racer_had_triggers:
+                if self.verbose:
+                    print(f"    Racer {racer.name.value} had triggers! Now about to trigger track...")
+                if self.trigger_counters is not None:
+                    self.trigger_counters.record_track_visit(changes)
+                changes, track_had_triggers = self.call_trigger_owner(
+                    TRACK_OWNER, STAGE_TRACK_TRIGGERS, CATEGORY_TRACK, "Track.trig_changes", self.track.trig_changes, changes)
+                if track_had_triggers:
+                    continue
+        return changes, any_changes_found
+
+    def call_trigger_owner(self, owner: str, stage: str, category: str, trace_name: str, trig_changes,
+                           changes: list) -> tuple[list, bool]:
+        """Let a racer or the track react to the changes, with the enabled instrumentation around the call."""
+        snapshot = self.causal_graph.snapshot(changes) if self.causal_graph is not None else None
+        with measure(self.profiler, stage, owner), \
+             trace(self.tracer, trace_name, category, changes_before=len(changes)) as trace_args:
+            changes, had_triggers = trig_changes(self.board_state, changes)
+            trace_args["changes_after"] = len(changes)
+            trace_args["triggered"] = had_triggers
+        self.link_new_changes(changes)
+        if snapshot is not None:
+            self.causal_graph.record_call(owner, snapshot, changes)
+        return changes, had_triggers
+
+    def link_new_changes(self, changes: list):
+        """Give new change sets an id. Copies of an earlier change set in the list are caused by that change set."""
+        seen_change_ids = set()
+        for change in changes:
+            if change.change_id is None or change.change_id in seen_change_ids:
+                if change.change_id is not None:
+                    change.cause_id = change.change_id
+                change.change_id = self.next_change_id
+                self.next_change_id += 1
+            seen_change_ids.add(change.change_id)
+
     def board_state_loop_detected(self, changes: list) -> bool:
         """Check if the given changes contain a board state loop"""
         if len(changes) < 2: # Need at least two changes to form a loop
             return False
+        with measure(self.profiler, STAGE_LOOP_DETECTION, RACE_OWNER):
+            return self.changes_revisit_board_state(changes)
+
+    def changes_revisit_board_state(self, changes: list) -> bool:
+        """Check if applying the changes one by one passes the final board state before the last change."""
         last_board_state = self.apply_changes_to_copy(self.board_state, changes)
         iter_bs = deepcopy(self.board_state)
         for change in changes[:-1]:
@@ -127,6 +263,7 @@ class Race:
 
     def trigger_before_race_powers(self) -> BoardState:
         """Trigger any before-race powers each racer may have."""
+        self.race_started = True
         for racer in self.player_to_racer_map.values():
             self.board_state = racer.before_race_effect(self.board_state)
 
@@ -134,14 +271,17 @@ class Race:
         """Cycle turn order list to the next player."""
         self.num_turns_taken += 1
         self.turn_order.append(self.turn_order.pop(0))
-        # Check if upcoming turn(s) can be skipped
-        while self.is_player_out_of_the_race(self.turn_order[0]):
+        # Check if upcoming turn(s) can be skipped (stop once everyone is out, e.g. a finished 2 player race)
+        num_skipped = 0
+        while self.is_player_out_of_the_race(self.turn_order[0]) and num_skipped < len(self.turn_order):
             self.turn_order.append(self.turn_order.pop(0))
+            num_skipped += 1
         current_player = self.board_state.turn_order[0]
         current_racer = self.player_to_racer_map[current_player]
         # TODO Logging this here is not nice timing, should see if it can be moved to a more sensible spot
-        PrintChangeList(self.current_turn_change_list, title=f"=== [Turn {self.num_turns_taken}] On {current_player.name}'s/{current_racer.name}'s turn the following happened:")
-        DisplayRacerPositions(self.board_state, title=f"  Leading to these positions:")
+        if self.verbose:
+            PrintChangeList(self.current_turn_change_list, title=f"=== [Turn {self.num_turns_taken}] On {current_player.name}'s/{current_racer.name}'s turn the following happened:")
+            DisplayRacerPositions(self.board_state, title=f"  Leading to these positions:")
         self.current_turn_change_list = []
 
     def is_player_out_of_the_race(self, player) -> bool:
@@ -154,6 +294,7 @@ class Race:
 
     def apply_changes_to_copy(self, bs: BoardState, changes: list) -> BoardState:
         """Apply a list of changes to a copy of the board state and get the result."""
-        temp_bs = deepcopy(bs)
-        temp_bs.apply_change_list(changes)
+        with measure(self.profiler, STAGE_APPLY_TO_COPY, RACE_OWNER):
+            temp_bs = deepcopy(bs)
+            temp_bs.apply_change_list(changes)
         return temp_bs
@@ -0,0 +1,76 @@
+"""
+Snapshots of a race between turn phases, to pause, serialize and restore it.
+"""
+
+import pickle
+import random
+from copy import deepcopy
+
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+
+
+class RaceSnapshot:
+    """Everything a race needs to go on from where it was: board state, turn order, racers and dice.
+
+    The racers are copied with their AIs and with the dice, including the state of its random number
+    generators, so a restored race rolls exactly what the original race would have rolled next. The
+    state of the global random module is kept too, for unseeded dice and AIs that decide at random.
+    Changes made before the snapshot and instrumentation (profiler, tracer, ...) are not part of it.
+
+    Snapshots are taken between turn phases, e.g. after do_turn_phase, do_turn or before do_race.
+    Racers and their AIs must be picklable to serialize a snapshot.
+    """
+
+    def __init__(self, race: Race):
+        self.track_version = race.track.track_version
+        # Racers share the race's dice, so they are copied together to keep sharing it
+        self.player_to_racer_map, self.dice = deepcopy((race.player_to_racer_map, race.dice))
+        self.board_state = deepcopy(race.board_state)
+        self.turn_order = list(race.turn_order)
+        self.num_turns_taken = race.num_turns_taken
+        self.next_change_id = race.next_change_id
+        self.race_started = race.race_started
+        self.random_state = random.getstate()
+
+    @classmethod
+    def from_board_state(cls, track_version: TrackVersion, player_to_racer_map: dict, bs: BoardState,
+                         dice: Dice = None) -> "RaceSnapshot":
+        """Snapshot of a race that reached a board state between turns, e.g. one shown in a replay."""
+        if bs.current_turn_phase != TurnPhase.PH0_BETWEEN_TURNS:
+            raise ValueError(f"Races can only be restored between turns, not in {bs.current_turn_phase.name}")
+        race = Race(track_version, player_to_racer_map, dice=dice, verbose=False)
+        race.board_state = bs
+        race.turn_order = list(bs.turn_order)
+        race.num_turns_taken = bs.current_turn_number
+        race.race_started = True
+        return cls(race)
+
+    def restore(self, dice: Dice = None, verbose: bool = False, restore_random_state: bool = True, **race_options) -> Race:
+        """New race that goes on from the snapshot; the snapshot itself can be restored again.
+
+        Without dice, the race rolls on with the snapshot's dice. Other dice, e.g. one seed per
+        continuation, give the race a different future from the same position. Race options are the
+        instrumentation arguments of Race (profiler, trigger_counters, tracer, causal_graph).
+        """
+        player_to_racer_map, snapshot_dice = deepcopy((self.player_to_racer_map, self.dice))
+        race = Race(self.track_version, player_to_racer_map, dice=dice if dice is not None else snapshot_dice,
+                    verbose=verbose, **race_options)
+        race.board_state = deepcopy(self.board_state)
+        race.turn_order = list(self.turn_order)
+        race.num_turns_taken = self.num_turns_taken
+        race.next_change_id = self.next_change_id
+        race.race_started = self.race_started
+        if restore_random_state:
+            random.setstate(self.random_state)
+        return race
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "RaceSnapshot":
+        return pickle.loads(data)
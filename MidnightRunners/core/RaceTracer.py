@@ -0,0 +1,83 @@
+"""
+Opt-in tracer that records a race as Chrome trace events (viewable in chrome://tracing or Perfetto).
+
+Turns, turn phases, check_triggers passes, every racer's trig_changes and every Track.trig_changes
+call become nested spans, with arguments such as the number of changes and whether anything triggered.
+"""
+
+import json
+from contextlib import nullcontext
+from time import perf_counter
+
+# Spans recorded by the race
+CATEGORY_TURN = "turn"
+CATEGORY_PHASE = "phase"
+CATEGORY_TRIGGERS = "triggers"
+CATEGORY_RACER = "racer"
+CATEGORY_TRACK = "track"
+
+TRACE_PROCESS_ID = 1
+TRACE_THREAD_ID = 1
+
+
+class TraceSpan:
+    """An open span; arguments can be added until it is closed."""
+    def __init__(self, tracer, name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_time = perf_counter()
+
+    def __enter__(self) -> dict:
+        return self.args
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.close_span(self)
+        return False
+
+
+class RaceTracer:
+    """Collects complete ("X") trace events with timestamps in microseconds since the tracer was created."""
+    def __init__(self):
+        self.trace_events = []
+        self.start_time = perf_counter()
+
+    def open_span(self, name: str, category: str, **args) -> TraceSpan:
+        return TraceSpan(self, name, category, args)
+
+    def close_span(self, span: TraceSpan):
+        end_time = perf_counter()
+        self.trace_events.append({
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (span.start_time - self.start_time) * 1e6,
+            "dur": (end_time - span.start_time) * 1e6,
+            "pid": TRACE_PROCESS_ID,
+            "tid": TRACE_THREAD_ID,
+            "args": span.args,
+        })
+
+    def get_spans(self, category: str = None) -> list:
+        return [event for event in self.trace_events if category is None or event["cat"] == category]
+
+    def to_json(self) -> dict:
+        # Parents close after their children, so sort by start time for viewers that expect it
+        return {"traceEvents": sorted(self.trace_events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        with open(path, "w") as trace_file:
+            json.dump(self.to_json(), trace_file, default=str)
+
+
+def trace(tracer: RaceTracer, name: str, category: str, **args):
+    """Trace a span with the given tracer, or do nothing when tracing is disabled.
+
+    The context yields the span's argument dict, so results can be added before the span closes.
+    Without a tracer it yields a new dict that is thrown away, so untraced races, e.g. in other
+    threads, share no state.
+    """
+    if tracer is None:
+        return nullcontext({})
+    return tracer.open_span(name, category, **args)
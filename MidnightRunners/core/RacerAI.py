@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 import random
 
 from MidnightRunners.concreteracers.RacerList import RacerName
-from MidnightRunners.core import BoardState
+from MidnightRunners.core.BoardState import BoardState
 from MidnightRunners.core.Player import Player
 
 class IRacerAI:
@@ -32,7 +32,7 @@ class RandomRacerAI(IRacerAI):
 
     def choose_path(self, bs: BoardState, bs_options: list) -> int:
         """Randomly chooses one of the available board state options."""
-        return bs_options[0]
+        return random.randrange(len(bs_options))
 
 class NaiveRacerAI(IRacerAI):
     def __init__(self, player_name: Player, racer_name: RacerName):
@@ -70,6 +70,13 @@ class ChangeSet:
         # Flags that can be set specifically by racers, if the racers_processed set is not enough information or
         # if racers_processed reset should not affect some logic
         self.racer_flags = {}
+        # Identity kept across deep copies, assigned by the race, and the change set that caused this one
+        self.change_id = None
+        self.cause_id = None
+
+    def set_cause(self, cause: "ChangeSet"):
+        """Mark the change set this one was created in reaction to."""
+        self.cause_id = cause.change_id
 
     def add_message(self, message: str):
         self.change_messages.append(message)
@@ -102,4 +109,18 @@ class ChangeSet:
 
     def add_eliminate_change(self, racer_name: RacerName):
         eliminate_change = EliminateChange(racer_name)
-        self.eliminate_changes.append(eliminate_change)
\ No newline at end of file
+        self.eliminate_changes.append(eliminate_change)
+
+def drop_dependent_changes(changes: list, edited_index: int) -> list:
+    """Drop the change sets caused (directly or indirectly) by an edited change set, keeping everything else.
+
+    Change sets with an unknown cause are dropped as well, since they might depend on the edited one.
+    """
+    dependent_change_ids = {changes[edited_index].change_id}
+    kept_changes = changes[:edited_index + 1]
+    for change in changes[edited_index + 1:]:
+        if change.cause_id is None or change.cause_id in dependent_change_ids:
+            dependent_change_ids.add(change.change_id)
+        else:
+            kept_changes.append(change)
+    return kept_changes
@@ -0,0 +1,80 @@
+"""
+Opt-in counters that show how often change sets are re-examined while triggers are resolved.
+
+Racers like Gunk and Banana reset the processed markers of changes they edit, so the same change
+can be handled by the other racers and the track many times in one turn phase. A race given a
+TriggerCounters records this; passing the same counters to many races aggregates a whole batch.
+"""
+
+from collections import Counter
+
+from MidnightRunners.core.Profiler import TRACK_OWNER
+
+# Reasons check_triggers stops resolving triggers
+STOP_RACE_FINISHED = "race finished"
+STOP_NO_TRIGGERS = "no new triggers"
+STOP_LOOP_DETECTED = "loop detected"
+
+
+class TriggerCounters:
+    """Change set visits per racer class and the track, check_triggers passes and how races ended.
+
+    A visit is a change set handed to a racer or the track; a processing is a visit to a change set
+    the owner has not marked as processed yet, i.e. one it has to examine (again).
+    """
+    def __init__(self):
+        self.num_races = 0
+        self.races_ended_by_turn_limit = 0
+        self.num_check_triggers_calls = 0
+        self.num_changes_resolved = 0
+        self.passes_histogram = Counter()  # Passes per check_triggers call (one call per turn phase)
+        self.stop_reasons = Counter()
+        self.change_visits = Counter()
+        self.change_processings = Counter()
+        self.max_processings_per_phase = Counter()
+        self.current_phase_processings = Counter()
+
+    def record_racer_visit(self, owner: str, racer_name, changes: list):
+        self.change_visits[owner] += len(changes)
+        self.current_phase_processings[owner] += sum(1 for change in changes if racer_name not in change.racers_processed)
+
+    def record_track_visit(self, changes: list):
+        self.change_visits[TRACK_OWNER] += len(changes)
+        self.current_phase_processings[TRACK_OWNER] += sum(1 for change in changes if not change.processed_by_track)
+
+    def record_check_triggers(self, num_passes: int, stop_reason: str, num_changes: int):
+        self.num_check_triggers_calls += 1
+        self.num_changes_resolved += num_changes
+        self.passes_histogram[num_passes] += 1
+        self.stop_reasons[stop_reason] += 1
+        for owner, processings in self.current_phase_processings.items():
+            self.change_processings[owner] += processings
+            self.max_processings_per_phase[owner] = max(self.max_processings_per_phase[owner], processings)
+        self.current_phase_processings = Counter()
+
+    def record_race_end(self, race_is_finished: bool):
+        self.num_races += 1
+        if not race_is_finished:
+            self.races_ended_by_turn_limit += 1
+
+    def get_amplification(self, owner: str) -> float:
+        """Average number of times the owner processed each resolved change set."""
+        if self.num_changes_resolved == 0:
+            return 0.0
+        return self.change_processings[owner] / self.num_changes_resolved
+
+    def get_mean_passes(self) -> float:
+        if self.num_check_triggers_calls == 0:
+            return 0.0
+        return sum(passes * count for passes, count in self.passes_histogram.items()) / self.num_check_triggers_calls
+
+    def format_summary(self) -> str:
+        lines = [f"Races: {self.num_races} ({self.races_ended_by_turn_limit} ended by the turn limit)",
+                 f"check_triggers calls: {self.num_check_triggers_calls}, mean passes {self.get_mean_passes():.2f}, "
+                 f"max passes {max(self.passes_histogram, default=0)}",
+                 "Stop reasons: " + ", ".join(f"{reason}: {count}" for reason, count in self.stop_reasons.most_common()),
+                 f"{'Owner':<14} {'Visits':>10} {'Processings':>12} {'Per change':>11} {'Max/phase':>10}"]
+        for owner, processings in self.change_processings.most_common():
+            lines.append(f"{owner:<14} {self.change_visits[owner]:>10} {processings:>12} "
+                         f"{self.get_amplification(owner):>11.2f} {self.max_processings_per_phase[owner]:>10}")
+        return "\n".join(lines)
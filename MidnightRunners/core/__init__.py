@@ -1,12 +1,45 @@
 """
 Midnight Runners Board Game Framework
+
+The classes below are imported on first access (PEP 562), so importing the package, e.g. in a
+short-lived simulation worker, only loads the modules that are actually used.
 """
 
-from .BoardState import BoardState
-from .Player import Player
-from .Track import Track
-from .Race import Race
-from .AbstractRacer import AbstractRacer
+import sys
+from importlib import import_module
+from types import ModuleType
 
 __version__ = "0.1.0"
 __all__ = ["BoardState", "Player", "Track", "Race", "AbstractRacer"]
+
+# Each exported class lives in the submodule of the same name
+_LAZY_CLASSES = set(__all__)
+
+
+def __getattr__(name):
+    if name not in _LAZY_CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    cls = getattr(import_module(f".{name}", __name__), name)
+    globals()[name] = cls
+    return cls
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _CoreModule(ModuleType):
+    """Keeps the exported classes as package attributes when their submodules are imported.
+
+    The import system binds every imported submodule to the package attribute of its name, which
+    would hide a class like Race behind the module Race. The submodules stay reachable through
+    sys.modules and import statements.
+    """
+
+    def __setattr__(self, name, value):
+        if name in _LAZY_CLASSES and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _CoreModule
@@ -1,11 +1,15 @@
+from __future__ import annotations
+
 from copy import deepcopy
 from enum import Enum
-from re import match
+from typing import TYPE_CHECKING
 
-from MidnightRunners.core import BoardState
 from MidnightRunners.core.BoardView import PrintChangeList
 from MidnightRunners.core.StateChange import ChangeSet, MoveType, PositionChange, TripChange
 
+if TYPE_CHECKING:  # BoardState imports this module
+    from MidnightRunners.core.BoardState import BoardState
+
 class TrackVersion(Enum):
     MILD = "Mild Miles"
     WILD = "Wild Wilds"
@@ -27,6 +31,16 @@ class SpecialSpaceProperties(Enum):
     STAR1 = "Star 1"
     TRIP = "Trip"
 
+# Movement applied by each arrow property when a racer lands on it
+ArrowPropertyToDelta = {
+    SpecialSpaceProperties.ARROW_PLUS_1:   1,
+    SpecialSpaceProperties.ARROW_PLUS_2:   2,
+    SpecialSpaceProperties.ARROW_PLUS_3:   3,
+    SpecialSpaceProperties.ARROW_MINUS_1: -1,
+    SpecialSpaceProperties.ARROW_MINUS_2: -2,
+    SpecialSpaceProperties.ARROW_MINUS_4: -4,
+}
+
 class Track:
     def __init__(self, track_version: TrackVersion):
         self.track_version = track_version
@@ -77,6 +91,7 @@ class Track:
                     # Getting here means there is at least one property to process
                     special_space_triggered = True
                     new_change = ChangeSet()
+                    new_change.set_cause(change)
                     new_change.add_message(f"{racer_name.value} landed on special space {landed_pos} with property {property.name}.")
                     if property == SpecialSpaceProperties.TRIP and old_pos != landed_pos:
                         new_change.add_trip_change(pos_change.racer_name, False, True)
@@ -88,14 +103,7 @@ class Track:
                         new_change.add_finished_racer(racer_name)
                         new_change.add_message(f"{racer_name.value} finished!")
                     else:
-                        pos_after_move = landed_pos
-                        match(property):
-                            case SpecialSpaceProperties.ARROW_PLUS_1: pos_after_move = self.GetNewSpace(landed_pos, 1)
-                            case SpecialSpaceProperties.ARROW_PLUS_2: pos_after_move = self.GetNewSpace(landed_pos, 2)
-                            case SpecialSpaceProperties.ARROW_PLUS_3: pos_after_move = self.GetNewSpace(landed_pos, 3)
-                            case SpecialSpaceProperties.ARROW_MINUS_1: pos_after_move = self.GetNewSpace(landed_pos, -1)
-                            case SpecialSpaceProperties.ARROW_MINUS_2: pos_after_move = self.GetNewSpace(landed_pos, -2)
-                            case SpecialSpaceProperties.ARROW_MINUS_4: pos_after_move = self.GetNewSpace(landed_pos, -4)
+                        pos_after_move = self.GetNewSpace(landed_pos, ArrowPropertyToDelta.get(property, 0))
                         pos_change = PositionChange(racer_name, landed_pos, pos_after_move)
                         pos_change.set_move_type(MoveType.TRACK)
                         new_change.add_pos_change_obj(pos_change)
@@ -105,12 +113,7 @@ class Track:
 
                     # If an arrow was triggered, no need to check other properties
                     # Also, return early since the subsequent changes could be invalid now
-                    if property in (SpecialSpaceProperties.ARROW_PLUS_1,
-                                    SpecialSpaceProperties.ARROW_PLUS_2,
-                                    SpecialSpaceProperties.ARROW_PLUS_3,
-                                    SpecialSpaceProperties.ARROW_MINUS_1,
-                                    SpecialSpaceProperties.ARROW_MINUS_2,
-                                    SpecialSpaceProperties.ARROW_MINUS_4):
+                    if property in ArrowPropertyToDelta:
                         return changes_after_processing, True
         # PrintChangeList(changes_after_processing, title="--- Track added changes resulting in: ---") if special_space_triggered else None
         return changes_after_processing, special_space_triggered
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Paired tournament that measures whether a candidate racer AI beats a baseline AI.
+
+Every racer of the lineup gets the baseline AI, except for one seat that gets the candidate AI. For
+each race index the candidate takes every seat in turn, and all of these races use the same per seat
+dice as one race where every seat has the baseline AI. The difference per race index (candidate
+minus baseline, averaged over the seats) is then free of seat order bias and most of the dice luck,
+and its confidence intervals shrink much faster than those of independent races.
+
+The baseline race lets every seat's baseline AI shadow a candidate AI that sees the same decisions.
+When a seat's candidate would never have decided differently, its race would replay the baseline
+race exactly, so that race is skipped. Lineups of racers that never ask their AI run on the vectorized
+batch engine without any candidate races.
+
+Usage: python -m MidnightRunners.simulation.AITournament --candidate table --racers GUNK SUCKERFISH --races 1000
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from statistics import NormalDist
+
+import numpy as np
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.concreteracers.RacerRegistry import get_player_racer_config
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.RacerAI import IRacerAI, NaiveRacerAI, RandomRacerAI
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import DiceTable, can_vectorize, replay_race, run_batch
+from MidnightRunners.simulation.LineupComparison import get_standard_error
+from MidnightRunners.simulation.MCTSAI import MCTSRacerAI
+from MidnightRunners.simulation.RerollTables import TableRerollAI
+from MidnightRunners.simulation.SearchAI import ExpectimaxRacerAI
+from MidnightRunners.simulation.Tournament import TOURNAMENT_RACERS
+
+# AIs created with (player, racer name)
+AI_POLICIES = {
+    "naive": NaiveRacerAI,
+    "random": RandomRacerAI,
+    "table": TableRerollAI,
+}
+# AIs that also need the track version and the lineup to search with
+SEARCH_AI_POLICIES = {
+    "expectimax": ExpectimaxRacerAI,
+    "mcts": MCTSRacerAI,
+}
+DEFAULT_CHUNK_SIZE = 200
+
+
+class ShadowAI(IRacerAI):
+    """Decides like the baseline AI and records whether the candidate AI would ever have decided differently."""
+    def __init__(self, baseline_ai: IRacerAI, candidate_ai: IRacerAI):
+        super().__init__(baseline_ai.player_name, baseline_ai.racer_name)
+        self.baseline_ai = baseline_ai
+        self.candidate_ai = candidate_ai
+        self.diverged = False
+
+    def decide_reroll(self, bs: BoardState, reroll_count: int, rolled_value: int) -> bool:
+        decision = self.baseline_ai.decide_reroll(bs, reroll_count, rolled_value)
+        if not self.diverged and self.candidate_ai.decide_reroll(bs, reroll_count, rolled_value) != decision:
+            self.diverged = True
+        return decision
+
+    def choose_path(self, bs: BoardState, bs_options: list) -> int:
+        decision = self.baseline_ai.choose_path(bs, bs_options)
+        if not self.diverged and self.candidate_ai.choose_path(bs, bs_options) != decision:
+            self.diverged = True
+        return decision
+
+
+def make_racer_with_ai(racer_class, ai_factory, player: Player):
+    """Create a racer that decides with the AI made by ai_factory(player, racer name)."""
+    racer = racer_class(player)
+    racer.ai = ai_factory(player, racer.name)
+    return racer
+
+
+def make_shadowed_racer(racer_class, baseline_ai_factory, candidate_ai_factory, player: Player):
+    racer = racer_class(player)
+    racer.ai = ShadowAI(baseline_ai_factory(player, racer.name), candidate_ai_factory(player, racer.name))
+    return racer
+
+
+def get_ai_factory(policy_name: str, track_version: TrackVersion, player_racer_config: dict):
+    """AI factory for a policy name; search AIs search with the plain lineup."""
+    if policy_name in SEARCH_AI_POLICIES:
+        return partial(SEARCH_AI_POLICIES[policy_name], track_version=track_version, player_racer_config=player_racer_config)
+    return AI_POLICIES[policy_name]
+
+
+class PairedResults:
+    """Wins and points per race index and seat, of the candidate in that seat and of the baseline race."""
+    def __init__(self, num_races: int, num_seats: int):
+        self.candidate_wins = np.zeros((num_races, num_seats))
+        self.candidate_points = np.zeros((num_races, num_seats))
+        self.baseline_wins = np.zeros((num_races, num_seats))
+        self.baseline_points = np.zeros((num_races, num_seats))
+        self.num_races_run = 0
+        self.num_races_skipped = 0
+
+    @staticmethod
+    def concatenate(chunks: list):
+        results = PairedResults(0, chunks[0].candidate_wins.shape[1])
+        for name in ["candidate_wins", "candidate_points", "baseline_wins", "baseline_points"]:
+            setattr(results, name, np.concatenate([getattr(chunk, name) for chunk in chunks]))
+        results.num_races_run = sum(chunk.num_races_run for chunk in chunks)
+        results.num_races_skipped = sum(chunk.num_races_skipped for chunk in chunks)
+        return results
+
+
+def record_seat_result(wins: np.ndarray, points: np.ndarray, race_index: int, seat: int, race: Race, player: Player):
+    bs = race.board_state
+    wins[race_index, seat] = bs.first_place_racer == bs.player_to_racer_name_map[player]
+    points[race_index, seat] = bs.player_points_map[player]
+
+
+def run_paired_chunk(track_version: TrackVersion, player_racer_config: dict, candidate_ai_factory, baseline_ai_factory,
+                     num_races: int, seed: int, skip_identical: bool = True) -> PairedResults:
+    """Run the baseline race and the candidate race for every seat, for num_races race indices."""
+    players = [player for player in Player if player in player_racer_config]
+    baseline_config = {player: partial(make_racer_with_ai, player_racer_config[player], baseline_ai_factory)
+                       for player in players}
+    if skip_identical:
+        baseline_race_config = {player: partial(make_shadowed_racer, player_racer_config[player], baseline_ai_factory,
+                                                candidate_ai_factory) for player in players}
+    else:
+        baseline_race_config = baseline_config
+    results = PairedResults(num_races, len(players))
+    if skip_identical and can_vectorize(player_racer_config):
+        # Racers with only the default behaviour never ask their AI, so every candidate race is the baseline race
+        batch = run_batch(track_version, player_racer_config, num_races, seed=seed)
+        results.baseline_wins = (batch.first_place[:, None] == np.arange(len(players))).astype(float)
+        results.baseline_points = batch.points.astype(float)
+        results.candidate_wins = results.baseline_wins.copy()
+        results.candidate_points = results.baseline_points.copy()
+        results.num_races_run = num_races
+        results.num_races_skipped = num_races * len(players)
+        return results
+
+    dice_table = DiceTable(seed, num_races, len(players))
+    for race_index in range(num_races):
+        baseline_race = replay_race(track_version, baseline_race_config, dice_table, race_index)
+        results.num_races_run += 1
+        for seat, player in enumerate(players):
+            record_seat_result(results.baseline_wins, results.baseline_points, race_index, seat, baseline_race, player)
+            if skip_identical and not baseline_race.player_to_racer_map[player].ai.diverged:
+                # The candidate would have made the same decisions, so its race is the baseline race
+                record_seat_result(results.candidate_wins, results.candidate_points, race_index, seat, baseline_race, player)
+                results.num_races_skipped += 1
+                continue
+            candidate_config = dict(baseline_config)
+            candidate_config[player] = partial(make_racer_with_ai, player_racer_config[player], candidate_ai_factory)
+            candidate_race = replay_race(track_version, candidate_config, dice_table, race_index)
+            results.num_races_run += 1
+            record_seat_result(results.candidate_wins, results.candidate_points, race_index, seat, candidate_race, player)
+    return results
+
+
+class Difference:
+    """Mean candidate minus baseline difference with its confidence interval."""
+    def __init__(self, samples: np.ndarray, confidence: float):
+        self.mean = float(np.mean(samples))
+        self.standard_error = get_standard_error(samples)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.interval = (self.mean - z * self.standard_error, self.mean + z * self.standard_error)
+
+    def is_significant(self) -> bool:
+        """Whether the interval excludes zero."""
+        return self.interval[0] > 0 or self.interval[1] < 0
+
+
+class AITournamentResult:
+    """Win rate and points differences of the candidate AI, overall (seats rotated) and per seat."""
+    def __init__(self, players: list, racer_names: list, results: PairedResults, confidence: float):
+        self.players = players
+        self.racer_names = racer_names
+        self.num_races = len(results.candidate_wins)
+        self.num_races_run = results.num_races_run
+        self.num_races_skipped = results.num_races_skipped
+        self.candidate_win_rate = float(results.candidate_wins.mean())
+        self.baseline_win_rate = float(results.baseline_wins.mean())
+        win_differences = results.candidate_wins - results.baseline_wins
+        points_differences = results.candidate_points - results.baseline_points
+        self.win_rate_difference = Difference(win_differences.mean(axis=1), confidence)
+        self.points_difference = Difference(points_differences.mean(axis=1), confidence)
+        self.seat_win_rate_differences = [Difference(win_differences[:, seat], confidence) for seat in range(len(players))]
+        self.seat_points_differences = [Difference(points_differences[:, seat], confidence) for seat in range(len(players))]
+
+    def format_summary(self) -> str:
+        lines = [f"Race indices: {self.num_races} ({self.num_races_run} races run, {self.num_races_skipped} skipped as identical)",
+                 f"Win rate: candidate {self.candidate_win_rate:.4f}, baseline {self.baseline_win_rate:.4f}",
+                 f"Win rate difference: {format_difference(self.win_rate_difference)}",
+                 f"Points difference:   {format_difference(self.points_difference)}"]
+        for seat, (player, racer_name) in enumerate(zip(self.players, self.racer_names)):
+            lines.append(f"  {player.name} {racer_name.value:<12} win rate {format_difference(self.seat_win_rate_differences[seat])}, "
+                         f"points {format_difference(self.seat_points_differences[seat])}")
+        return "\n".join(lines)
+
+
+def format_difference(difference: Difference) -> str:
+    marker = " *" if difference.is_significant() else ""
+    return f"{difference.mean:+.4f} [{difference.interval[0]:+.4f}, {difference.interval[1]:+.4f}]{marker}"
+
+
+def run_ai_tournament(track_version: TrackVersion, player_racer_config: dict, candidate_ai_factory, baseline_ai_factory=NaiveRacerAI,
+                      num_races: int = 1000, seed: int = 0, num_workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      skip_identical: bool = True, confidence: float = 0.95) -> AITournamentResult:
+    """Compare the candidate AI against the baseline AI over num_races race indices with rotated seats.
+
+    Chunk i uses seed + i, so a run is reproducible no matter how many workers are used. With more
+    than one worker the racer classes and AI factories must be picklable. skip_identical relies on the
+    AIs deciding the same whenever they see the same decisions; turn it off for AIs that decide at random.
+    """
+    chunk_sizes = [min(chunk_size, num_races - start) for start in range(0, num_races, chunk_size)]
+    chunk_args = [(track_version, player_racer_config, candidate_ai_factory, baseline_ai_factory, size, seed + chunk_index,
+                   skip_identical) for chunk_index, size in enumerate(chunk_sizes)]
+    if num_workers <= 1:
+        chunks = [run_paired_chunk(*args) for args in chunk_args]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            chunks = list(executor.map(run_paired_chunk, *zip(*chunk_args)))
+
+    players = [player for player in Player if player in player_racer_config]
+    racer_names = [player_racer_config[player](player).name for player in players]
+    return AITournamentResult(players, racer_names, PairedResults.concatenate(chunks), confidence)
+
+
+def main():
+    policy_names = list(AI_POLICIES) + list(SEARCH_AI_POLICIES)
+    parser = argparse.ArgumentParser(description="Compare a candidate racer AI against a baseline AI with paired races.")
+    parser.add_argument("--candidate", choices=policy_names, required=True)
+    parser.add_argument("--baseline", choices=policy_names, default="naive")
+    parser.add_argument("--racers", nargs="+", default=[name.name for name in TOURNAMENT_RACERS],
+                        choices=[name.name for name in TOURNAMENT_RACERS], help="Lineup in seat order")
+    parser.add_argument("--track", choices=[version.name for version in TrackVersion], default=TrackVersion.MILD.name)
+    parser.add_argument("--races", type=int, default=1000, help="Number of race indices (each runs every seat rotation)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--no-skip", action="store_true", help="Run every candidate race, e.g. for AIs that decide at random")
+    args = parser.parse_args()
+
+    track_version = TrackVersion[args.track]
+    racer_config = get_player_racer_config([RacerName[name] for name in args.racers])
+    result = run_ai_tournament(track_version, racer_config, get_ai_factory(args.candidate, track_version, racer_config),
+                               get_ai_factory(args.baseline, track_version, racer_config), args.races, args.seed,
+                               args.workers, args.chunk_size, not args.no_skip)
+    print(f"=== {args.candidate} vs {args.baseline} on {track_version.name}: {' / '.join(args.racers)} ===")
+    print(result.format_summary())
+
+
+if __name__ == "__main__":
+    main()
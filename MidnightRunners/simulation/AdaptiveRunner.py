@@ -0,0 +1,169 @@
+"""
+Adaptive Monte Carlo runner that keeps simulating until the estimates are precise enough.
+
+Races are run in chunks (in parallel when workers are available). After every chunk the confidence
+intervals are updated: Wilson intervals for win rates and a bootstrap interval for mean points. The
+runner stops once every interval is narrow enough, or when the race budget runs out.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import BatchResult, run_batch
+
+NUM_BOOTSTRAP_SAMPLES = 1000
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a success rate."""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = successes / trials
+    denominator = 1 + z**2 / trials
+    center = (rate + z**2 / (2 * trials)) / denominator
+    half_width = z * np.sqrt(rate * (1 - rate) / trials + z**2 / (4 * trials**2)) / denominator
+    return float(center - half_width), float(center + half_width)
+
+
+def bootstrap_mean_interval(value_counts: np.ndarray, confidence: float = 0.95, seed: int = 0) -> tuple[float, float]:
+    """Percentile bootstrap interval for the mean of small non-negative integers, given their counts.
+
+    Resampling n values with replacement is the same as drawing their counts from a multinomial
+    distribution, so the cost does not grow with the number of races.
+    """
+    num_values = int(value_counts.sum())
+    if num_values == 0:
+        return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    resampled_counts = rng.multinomial(num_values, value_counts / num_values, size=NUM_BOOTSTRAP_SAMPLES)
+    resampled_means = resampled_counts @ np.arange(len(value_counts)) / num_values
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(resampled_means, [tail, 1 - tail])
+    return float(low), float(high)
+
+
+class RacerEstimate:
+    """Current estimates and confidence intervals for one racer."""
+    def __init__(self, racer_name, win_rate: float, win_rate_interval: tuple, mean_points: float, mean_points_interval: tuple):
+        self.racer_name = racer_name
+        self.win_rate = win_rate
+        self.win_rate_interval = win_rate_interval
+        self.mean_points = mean_points
+        self.mean_points_interval = mean_points_interval
+
+
+class AdaptiveResult:
+    """Estimates after the last processed chunk."""
+    def __init__(self, num_races: int, converged: bool, racer_estimates: list):
+        self.num_races = num_races
+        self.converged = converged
+        self.racer_estimates = racer_estimates
+
+    def get_estimate(self, racer_name) -> RacerEstimate:
+        for estimate in self.racer_estimates:
+            if estimate.racer_name == racer_name:
+                return estimate
+        return None
+
+
+class RunningTotals:
+    """Win counts and points histograms per seat, accumulated over chunks."""
+    def __init__(self, racer_names: list):
+        self.racer_names = racer_names
+        self.num_races = 0
+        self.wins = np.zeros(len(racer_names), dtype=np.int64)
+        self.points_counts = np.zeros((len(racer_names), 1), dtype=np.int64)
+
+    def add_batch(self, batch: BatchResult):
+        self.num_races += batch.num_races
+        self.wins += np.bincount(batch.first_place[batch.first_place >= 0], minlength=len(self.racer_names))
+        max_points = int(batch.points.max()) + 1
+        if max_points > self.points_counts.shape[1]:
+            self.points_counts = np.pad(self.points_counts, ((0, 0), (0, max_points - self.points_counts.shape[1])))
+        for seat in range(len(self.racer_names)):
+            self.points_counts[seat] += np.bincount(batch.points[:, seat], minlength=self.points_counts.shape[1])
+
+    def get_estimates(self, confidence: float) -> list:
+        estimates = []
+        points_values = np.arange(self.points_counts.shape[1])
+        for seat, racer_name in enumerate(self.racer_names):
+            estimates.append(RacerEstimate(
+                racer_name,
+                float(self.wins[seat] / self.num_races),
+                wilson_interval(int(self.wins[seat]), self.num_races, confidence),
+                float(self.points_counts[seat] @ points_values / self.num_races),
+                bootstrap_mean_interval(self.points_counts[seat], confidence, seed=seat),
+            ))
+        return estimates
+
+
+def is_converged(estimates: list, win_rate_precision: float, points_precision: float) -> bool:
+    """Check whether every interval half-width is within its target precision."""
+    for estimate in estimates:
+        if (estimate.win_rate_interval[1] - estimate.win_rate_interval[0]) / 2 > win_rate_precision:
+            return False
+        if (estimate.mean_points_interval[1] - estimate.mean_points_interval[0]) / 2 > points_precision:
+            return False
+    return True
+
+
+def run_chunk(track_version: TrackVersion, player_racer_config: dict, chunk_size: int, seed: int) -> BatchResult:
+    return run_batch(track_version, player_racer_config, chunk_size, seed=seed)
+
+
+def run_adaptive(track_version: TrackVersion, player_racer_config: dict, win_rate_precision: float = 0.01,
+                 points_precision: float = 0.05, confidence: float = 0.95, chunk_size: int = 2000,
+                 max_races: int = 200_000, num_workers: int = 1, seed: int = 0, progress_callback=None) -> AdaptiveResult:
+    """Simulate chunks of races until all win rates and mean points are within the target precision.
+
+    Chunk i uses seed + i and chunks are always processed in order, so a run is reproducible no matter
+    how many workers are used. The last chunk is cut short so no more than max_races races are run.
+    With more than one worker the racer classes in the config must be importable (picklable). The
+    progress callback receives the AdaptiveResult after every chunk.
+    """
+    chunk_sizes = [min(chunk_size, max_races - start) for start in range(0, max_races, chunk_size)]
+    max_chunks = len(chunk_sizes)
+    totals = None
+    result = None
+
+    if num_workers <= 1:
+        for chunk_index in range(max_chunks):
+            batch = run_chunk(track_version, player_racer_config, chunk_sizes[chunk_index], seed + chunk_index)
+            totals, result = add_chunk(totals, batch, confidence, win_rate_precision, points_precision, progress_callback)
+            if result.converged:
+                break
+        return result
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        pending = {}
+        next_chunk = 0
+        for chunk_index in range(max_chunks):
+            # Keep every worker busy with the chunks that come next
+            while next_chunk < max_chunks and len(pending) < num_workers:
+                pending[next_chunk] = executor.submit(run_chunk, track_version, player_racer_config, chunk_sizes[next_chunk],
+                                                      seed + next_chunk)
+                next_chunk += 1
+            batch = pending.pop(chunk_index).result()
+            totals, result = add_chunk(totals, batch, confidence, win_rate_precision, points_precision, progress_callback)
+            if result.converged:
+                break
+        for future in pending.values():
+            future.cancel()
+    return result
+
+
+def add_chunk(totals: RunningTotals, batch: BatchResult, confidence: float, win_rate_precision: float,
+              points_precision: float, progress_callback) -> tuple[RunningTotals, AdaptiveResult]:
+    """Add a chunk to the running totals and compute the updated estimates."""
+    if totals is None:
+        totals = RunningTotals(batch.racer_names)
+    totals.add_batch(batch)
+    estimates = totals.get_estimates(confidence)
+    result = AdaptiveResult(totals.num_races, is_converged(estimates, win_rate_precision, points_precision), estimates)
+    if progress_callback is not None:
+        progress_callback(result)
+    return totals, result
@@ -0,0 +1,266 @@
+"""
+Batch engine that advances many simple races in lockstep as NumPy arrays.
+
+Only lineups whose racers use the default main move (optionally with Gunk's -1 power) can be
+vectorized. Any other lineup falls back to running Race.do_race once per race.
+"""
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.AbstractRacer import AbstractRacer
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Dice import ScriptedDice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Profiler import RaceProfiler
+from MidnightRunners.core.TriggerCounters import TriggerCounters
+from MidnightRunners.core.Race import Race, num_turns_limit
+from MidnightRunners.core.Track import (
+    Track, TrackVersion, SpecialSpaceProperties, ArrowPropertyToDelta, FIXED_TRACK_LENGTH
+)
+
+# Racer methods that must not be overridden for the default behaviour to apply
+DEFAULT_BEHAVIOUR_METHODS = [
+    "before_race_effect", "main_move", "get_start_of_turn_changes", "get_before_main_move_changes",
+    "get_main_move_changes", "get_end_of_turn_changes", "get_power_changes", "trig_changes",
+]
+# Racers with powers the batch engine models itself
+VECTORIZED_POWER_RACERS = [Gunk]
+
+NO_SEAT = -1
+FINISHED_POSITION = -1
+DICE_BLOCK_SIZE = 64  # Rolls per seat drawn at once; more blocks are drawn when races run long
+
+
+class DiceTable:
+    """Per race and per seat D6 roll streams, drawn in blocks from a seeded NumPy generator.
+
+    Every seat has its own stream, so roll k of seat p in race r only depends on (seed, r, p, k), and
+    different lineups run with the same seed, of any size, see the same dice per seat (common random
+    numbers). An antithetic table hands out 7 - roll instead, to pair every race with its mirrored dice.
+    """
+    def __init__(self, seed: int, num_races: int, num_players: int, antithetic: bool = False):
+        self.seed = seed
+        self.num_races = num_races
+        self.num_players = num_players
+        self.antithetic = antithetic
+        self.blocks = []
+
+    def get_rolls(self, race_indices: np.ndarray, seats: np.ndarray, roll_indices: np.ndarray) -> np.ndarray:
+        """Look up the rolls for the given (race, seat, roll number) triples."""
+        needed_blocks = int(roll_indices.max()) // DICE_BLOCK_SIZE + 1 if len(roll_indices) > 0 else 0
+        while len(self.blocks) < needed_blocks:
+            self.blocks.append(self.draw_block(len(self.blocks)))
+        block_indices, offsets = np.divmod(roll_indices, DICE_BLOCK_SIZE)
+        rolls = np.empty(len(race_indices), dtype=np.int16)
+        for block_index in np.unique(block_indices):
+            in_block = block_indices == block_index
+            rolls[in_block] = self.blocks[block_index][race_indices[in_block], seats[in_block], offsets[in_block]]
+        return rolls
+
+    def draw_block(self, block_index: int) -> np.ndarray:
+        block = np.empty((self.num_races, self.num_players, DICE_BLOCK_SIZE), dtype=np.int8)
+        for seat in range(self.num_players):
+            rng = np.random.default_rng([self.seed, seat, block_index])
+            block[:, seat] = rng.integers(1, 7, size=(self.num_races, DICE_BLOCK_SIZE), dtype=np.int8)
+        return 7 - block if self.antithetic else block
+
+    def player_rolls(self, race_index: int, players: list) -> dict:
+        """All rolls a race could need, per player, for use with ScriptedDice."""
+        num_rolls = num_turns_limit
+        seats = np.repeat(np.arange(len(players)), num_rolls)
+        roll_indices = np.tile(np.arange(num_rolls), len(players))
+        rolls = self.get_rolls(np.full(len(seats), race_index), seats, roll_indices).reshape(len(players), num_rolls)
+        return {player: rolls[seat].tolist() for seat, player in enumerate(players)}
+
+
+class TrackTables:
+    """Lookup tables with the effect of landing on each space of a track."""
+    def __init__(self, track: Track):
+        self.star_points = np.zeros(FIXED_TRACK_LENGTH, dtype=np.int32)
+        self.trip_space = np.zeros(FIXED_TRACK_LENGTH, dtype=bool)
+        self.finish_space = np.zeros(FIXED_TRACK_LENGTH, dtype=bool)
+        self.arrow_destination = np.arange(FIXED_TRACK_LENGTH, dtype=np.int16)
+
+        for space, properties in enumerate(track.space_properties):
+            for property in properties:
+                if property == SpecialSpaceProperties.STAR1:
+                    self.star_points[space] += 1
+                elif property == SpecialSpaceProperties.TRIP:
+                    self.trip_space[space] = True
+                elif property == SpecialSpaceProperties.FINISH:
+                    self.finish_space[space] = True
+                elif property in ArrowPropertyToDelta:
+                    self.arrow_destination[space] = Track.GetNewSpace(space, ArrowPropertyToDelta[property])
+
+
+class BatchResult:
+    """Outcome of a batch of races with the same lineup, indexed by race and seat."""
+    def __init__(self, players: list, racer_names: list, num_races: int, vectorized: bool):
+        self.players = players
+        self.racer_names = racer_names
+        self.vectorized = vectorized
+        self.points = np.zeros((num_races, len(players)), dtype=np.int32)
+        self.final_positions = np.zeros((num_races, len(players)), dtype=np.int16)
+        self.first_place = np.full(num_races, NO_SEAT, dtype=np.int8)
+        self.second_place = np.full(num_races, NO_SEAT, dtype=np.int8)
+        self.num_turns = np.zeros(num_races, dtype=np.int32)
+
+    @property
+    def num_races(self) -> int:
+        return len(self.num_turns)
+
+    def win_rates(self) -> dict:
+        """Fraction of races won, per racer name."""
+        return {name: float(np.mean(self.first_place == seat)) for seat, name in enumerate(self.racer_names)}
+
+    def mean_points(self) -> dict:
+        """Average points scored, per racer name."""
+        return {name: float(self.points[:, seat].mean()) for seat, name in enumerate(self.racer_names)}
+
+
+def get_lineup(player_racer_config: dict) -> dict:
+    """Create one racer per player from the player to racer class (or factory) config, in seat order."""
+    return {player: player_racer_config[player](player) for player in Player if player in player_racer_config}
+
+
+def can_vectorize(player_racer_config: dict) -> bool:
+    """Check whether all racers in the lineup are supported by the vectorized engine."""
+    for racer in get_lineup(player_racer_config).values():
+        if type(racer) in VECTORIZED_POWER_RACERS:
+            continue
+        for method in DEFAULT_BEHAVIOUR_METHODS:
+            if getattr(type(racer), method) is not getattr(AbstractRacer, method):
+                return False
+    return True
+
+
+def run_batch(track_version: TrackVersion, player_racer_config: dict, num_races: int, seed: int = 0,
+              antithetic: bool = False, profiler: RaceProfiler = None,
+              trigger_counters: TriggerCounters = None) -> BatchResult:
+    """Run a batch of races, vectorized when the lineup allows it, otherwise with the object engine.
+
+    A profiler or trigger counters always select the object engine, as the vectorized engine has no
+    race stages to measure.
+    """
+    dice_table = DiceTable(seed, num_races, len(player_racer_config), antithetic)
+    if profiler is None and trigger_counters is None and can_vectorize(player_racer_config):
+        return run_vectorized_batch(track_version, player_racer_config, dice_table)
+    return run_object_batch(track_version, player_racer_config, dice_table, profiler, trigger_counters)
+
+
+def run_object_batch(track_version: TrackVersion, player_racer_config: dict, dice_table: DiceTable,
+                     profiler: RaceProfiler = None, trigger_counters: TriggerCounters = None) -> BatchResult:
+    """Run every race of the batch with Race.do_race, using the rolls from the dice table.
+
+    All races share the given profiler and trigger counters, so they hold the totals of the whole batch.
+    """
+    lineup = get_lineup(player_racer_config)
+    players = list(lineup.keys())
+    result = BatchResult(players, [racer.name for racer in lineup.values()], dice_table.num_races, vectorized=False)
+
+    for race_index in range(dice_table.num_races):
+        race = replay_race(track_version, player_racer_config, dice_table, race_index, profiler=profiler,
+                           trigger_counters=trigger_counters)
+        record_race_result(result, race_index, race)
+    return result
+
+
+def replay_race(track_version: TrackVersion, player_racer_config: dict, dice_table: DiceTable, race_index: int,
+                **race_options) -> Race:
+    """Run one race of a batch with the object engine, e.g. to trace a race that was slow in the batch.
+
+    The race options (profiler, trigger_counters, tracer, verbose) are passed on to Race.
+    """
+    lineup = get_lineup(player_racer_config)
+    dice = ScriptedDice(dice_table.player_rolls(race_index, list(lineup.keys())))
+    race_options.setdefault("verbose", False)
+    race = Race(track_version, lineup, dice=dice, **race_options)
+    race.do_race()
+    return race
+
+
+def record_race_result(result: BatchResult, race_index: int, race: Race):
+    """Copy the final board state of a finished race into the batch result."""
+    bs = race.board_state
+    for seat, player in enumerate(result.players):
+        racer_name = bs.player_to_racer_name_map[player]
+        result.points[race_index, seat] = bs.player_points_map[player]
+        result.final_positions[race_index, seat] = bs.racer_name_to_position_map[racer_name]
+        if bs.first_place_racer == racer_name:
+            result.first_place[race_index] = seat
+        if bs.second_place_racer == racer_name:
+            result.second_place[race_index] = seat
+    result.num_turns[race_index] = bs.current_turn_number
+
+
+def run_vectorized_batch(track_version: TrackVersion, player_racer_config: dict, dice_table: DiceTable) -> BatchResult:
+    """Advance all races of the batch one turn at a time with array operations."""
+    lineup = get_lineup(player_racer_config)
+    players = list(lineup.keys())
+    num_races, num_players = dice_table.num_races, len(players)
+    result = BatchResult(players, [racer.name for racer in lineup.values()], num_races, vectorized=True)
+    track = Track(track_version)
+    tables = TrackTables(track)
+    rewards = BoardState(num_players, track, {player: racer.name for player, racer in lineup.items()})
+    finish_space = FIXED_TRACK_LENGTH - 1
+
+    gunk_seat = NO_SEAT
+    for seat, racer in enumerate(lineup.values()):
+        if type(racer) is Gunk:
+            gunk_seat = seat
+
+    positions = np.zeros((num_races, num_players), dtype=np.int16)
+    tripped = np.zeros((num_races, num_players), dtype=bool)
+    finished = np.zeros((num_races, num_players), dtype=bool)
+    rolls_taken = np.zeros((num_races, num_players), dtype=np.int32)
+    active_seat = np.zeros(num_races, dtype=np.int64)
+    running = np.ones(num_races, dtype=bool)
+
+    for _ in range(num_turns_limit):
+        races = np.nonzero(running)[0]
+        if len(races) == 0:
+            break
+        seats = active_seat[races]
+        result.num_turns[races] += 1
+
+        # Tripped racers skip their main move and get back up
+        skipping = tripped[races, seats]
+        tripped[races[skipping], seats[skipping]] = False
+        movers, mover_seats = races[~skipping], seats[~skipping]
+
+        # Main move, shortened by Gunk for everyone else unless the finish was overshot
+        rolls = dice_table.get_rolls(movers, mover_seats, rolls_taken[movers, mover_seats])
+        rolls_taken[movers, mover_seats] += 1
+        old_positions = positions[movers, mover_seats]
+        intended_positions = old_positions + rolls
+        landed = np.minimum(intended_positions, finish_space)
+        if gunk_seat != NO_SEAT:
+            slowed = (mover_seats != gunk_seat) & (intended_positions <= finish_space)
+            landed = np.where(slowed, np.maximum(intended_positions - 1, 0), landed)
+
+        # Effects of the landing space
+        result.points[movers, mover_seats] += tables.star_points[landed]
+        tripped[movers, mover_seats] |= tables.trip_space[landed] & (landed != old_positions)
+        reached_finish = tables.finish_space[landed]
+        positions[movers, mover_seats] = np.where(reached_finish, FINISHED_POSITION, tables.arrow_destination[landed])
+
+        # Hand out finishing places, the race ends when second place is taken
+        finishers, finisher_seats = movers[reached_finish], mover_seats[reached_finish]
+        finished[finishers, finisher_seats] = True
+        takes_first = result.first_place[finishers] == NO_SEAT
+        result.first_place[finishers[takes_first]] = finisher_seats[takes_first]
+        result.points[finishers[takes_first], finisher_seats[takes_first]] += rewards.pts_reward_first_place
+        result.second_place[finishers[~takes_first]] = finisher_seats[~takes_first]
+        result.points[finishers[~takes_first], finisher_seats[~takes_first]] += rewards.pts_reward_second_place
+        running[finishers[~takes_first]] = False
+
+        # Next turn goes to the next seat that is still in the race
+        next_seats = (seats + 1) % num_players
+        for _ in range(num_players):
+            out = finished[races, next_seats]
+            next_seats = np.where(out, (next_seats + 1) % num_players, next_seats)
+        active_seat[races] = next_seats
+
+    result.final_positions[:] = positions
+    return result
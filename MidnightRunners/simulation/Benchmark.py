@@ -0,0 +1,226 @@
+"""
+Benchmark suite for the simulation engine.
+
+Measures full races (Race.do_race on both tracks with 2 to 6 players) and single calls of the
+engine stages: check_triggers, every concrete racer's get_power_changes on a long change list,
+Track.trig_changes, BoardState.apply_change_list and board_state_loop_detected. All dice and change
+lists come from fixed seeds. Results can be saved as JSON and compared against a stored baseline.
+
+Usage: python -m MidnightRunners.simulation.Benchmark --output bench.json --baseline baseline.json
+"""
+
+import argparse
+import json
+import random
+import sys
+from copy import deepcopy
+from functools import partial
+from statistics import median
+from time import perf_counter
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.CR_Mouth import Mouth
+from MidnightRunners.concreteracers.CR_Romantic import Romantic
+from MidnightRunners.concreteracers.CR_Suckerfish import Suckerfish
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.AbstractRacer import AbstractRacer
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.StateChange import ChangeSet, MoveType, PositionChange, TurnPhaseChange
+from MidnightRunners.core.Track import TrackVersion, FIXED_TRACK_LENGTH
+from MidnightRunners.core.Turn import TurnPhase
+
+# Racers in seat order; an n player benchmark uses the first n
+BENCHMARK_RACERS = [Gunk, Banana, Mouth, Romantic, Suckerfish, partial(AbstractRacer, racer_name=RacerName.EGG)]
+CONCRETE_RACERS = [Banana, Gunk, Mouth, Romantic, Suckerfish]
+
+DEFAULT_RACES_PER_LINEUP = 3
+DEFAULT_MICRO_REPEATS = 50
+LONG_CHANGE_LIST_LENGTH = 24
+MID_RACE_TURNS = 8  # Turns played before the micro-benchmark board state is taken
+DEFAULT_REGRESSION_TOLERANCE = 0.25  # Flag benchmarks that got more than 25% slower
+BENCHMARK_SEED = 1234
+
+
+class BenchmarkResult:
+    """Per call latencies of one benchmark, in seconds."""
+    def __init__(self, name: str, latencies: list):
+        self.name = name
+        self.latencies = latencies
+
+    @property
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def median_latency(self) -> float:
+        return median(self.latencies)
+
+    @property
+    def calls_per_second(self) -> float:
+        return 1 / self.mean_latency if self.mean_latency > 0 else float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": len(self.latencies),
+            "mean_latency": self.mean_latency,
+            "median_latency": self.median_latency,
+            "calls_per_second": self.calls_per_second,
+        }
+
+
+def get_benchmark_lineup(num_players: int) -> dict:
+    players = list(Player)[:num_players]
+    return {player: racer_class(player) for player, racer_class in zip(players, BENCHMARK_RACERS)}
+
+
+def time_calls(name: str, call, argument_sets: list) -> BenchmarkResult:
+    """Time one call per prepared argument set. Preparing arguments is not part of the timing."""
+    latencies = []
+    for arguments in argument_sets:
+        start_time = perf_counter()
+        call(*arguments)
+        latencies.append(perf_counter() - start_time)
+    return BenchmarkResult(name, latencies)
+
+
+def benchmark_race(track_version: TrackVersion, num_players: int, num_races: int) -> BenchmarkResult:
+    """Full races with seeded dice; calls per second is races per second."""
+    races = [Race(track_version, get_benchmark_lineup(num_players), dice=Dice(seed=BENCHMARK_SEED + race_index), verbose=False)
+             for race_index in range(num_races)]
+    return time_calls(f"do_race/{track_version.name}/{num_players}p", Race.do_race, [(race,) for race in races])
+
+
+def get_mid_race(track_version: TrackVersion) -> Race:
+    """A seeded five racer race that has played a few turns and is about to start a turn."""
+    race = Race(track_version, get_benchmark_lineup(len(CONCRETE_RACERS)), dice=Dice(seed=BENCHMARK_SEED), verbose=False)
+    race.trigger_before_race_powers()
+    for _ in range(MID_RACE_TURNS):
+        race.do_turn()
+    return race
+
+
+def make_long_change_list(race: Race, length: int = LONG_CHANGE_LIST_LENGTH) -> list:
+    """Consecutive main moves of the racers still on the board, none of them reaching the finish."""
+    rng = random.Random(BENCHMARK_SEED)
+    bs = race.board_state
+    positions = dict(bs.racer_name_to_position_map)
+    racer_names = [racer_name for racer_name, position in positions.items() if position >= 0]
+    changes = []
+    for index in range(length):
+        racer_name = racer_names[index % len(racer_names)]
+        roll = rng.randint(1, 6)
+        new_position = min(positions[racer_name] + roll, FIXED_TRACK_LENGTH - 2)
+        pos_change = PositionChange(racer_name, positions[racer_name], new_position)
+        pos_change.set_move_type(MoveType.MAIN)
+        pos_change.set_intended_movement(roll)
+        change = ChangeSet()
+        change.add_pos_change_obj(pos_change)
+        changes.append(change)
+        positions[racer_name] = new_position
+    return changes
+
+
+def make_main_move_phase_change(race: Race) -> list:
+    """The change list that starts the main move phase of the current player."""
+    phase_change = ChangeSet()
+    phase_change.turn_phase_changes.append(TurnPhaseChange(TurnPhase.PH2_BEFORE_MAIN_MOVE, TurnPhase.PH3_MAIN_MOVE))
+    return [phase_change]
+
+
+def run_micro_benchmarks(track_version: TrackVersion, repeats: int = DEFAULT_MICRO_REPEATS) -> list:
+    """Single calls of the engine stages on a mid-race board state."""
+    race = get_mid_race(track_version)
+    # Move the race to just before the main move, so check_triggers resolves a full main move
+    while race.board_state.current_turn_phase != TurnPhase.PH2_BEFORE_MAIN_MOVE:
+        race.do_turn_phase()
+    changes = make_long_change_list(race)
+    bs = race.board_state
+    prefix = f"{track_version.name}"
+    results = []
+
+    race_copies = [deepcopy(race) for _ in range(repeats)]
+    results.append(time_calls(f"check_triggers/{prefix}", Race.check_triggers,
+                              [(race_copy, make_main_move_phase_change(race_copy)) for race_copy in race_copies]))
+
+    for racer in race.player_to_racer_map.values():
+        if type(racer) not in CONCRETE_RACERS:
+            continue
+        results.append(time_calls(f"get_power_changes/{type(racer).__name__}/{prefix}", racer.get_power_changes,
+                                  [(deepcopy(bs), deepcopy(changes)) for _ in range(repeats)]))
+
+    results.append(time_calls(f"Track.trig_changes/{prefix}", race.track.trig_changes,
+                              [(bs, deepcopy(changes)) for _ in range(repeats)]))
+    results.append(time_calls(f"BoardState.apply_change_list/{prefix}", type(bs).apply_change_list,
+                              [(deepcopy(bs), changes) for _ in range(repeats)]))
+    results.append(time_calls(f"board_state_loop_detected/{prefix}", race.board_state_loop_detected,
+                              [(changes,) for _ in range(repeats)]))
+    return results
+
+
+def run_benchmarks(races_per_lineup: int = DEFAULT_RACES_PER_LINEUP, micro_repeats: int = DEFAULT_MICRO_REPEATS,
+                   track_versions: list = None, player_counts: list = None) -> list:
+    track_versions = track_versions if track_versions is not None else list(TrackVersion)
+    player_counts = player_counts if player_counts is not None else list(range(2, len(BENCHMARK_RACERS) + 1))
+    results = []
+    for track_version in track_versions:
+        for num_players in player_counts:
+            results.append(benchmark_race(track_version, num_players, races_per_lineup))
+        results.extend(run_micro_benchmarks(track_version, micro_repeats))
+    return results
+
+
+def results_to_json(results: list) -> dict:
+    return {result.name: result.to_dict() for result in results}
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float = DEFAULT_REGRESSION_TOLERANCE) -> list:
+    """Names and slowdown factors of benchmarks whose median latency grew by more than the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline or baseline[name]["median_latency"] <= 0:
+            continue
+        slowdown = result["median_latency"] / baseline[name]["median_latency"]
+        if slowdown > 1 + tolerance:
+            regressions.append((name, slowdown))
+    return regressions
+
+
+def format_results(results: list) -> str:
+    lines = [f"{'Benchmark':<48} {'Calls':>6} {'Median [us]':>12} {'Mean [us]':>12} {'Calls/s':>10}"]
+    for result in results:
+        lines.append(f"{result.name:<48} {len(result.latencies):>6} {result.median_latency * 1e6:>12.1f} "
+                     f"{result.mean_latency * 1e6:>12.1f} {result.calls_per_second:>10.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation engine.")
+    parser.add_argument("--races", type=int, default=DEFAULT_RACES_PER_LINEUP, help="Races per track and player count")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_MICRO_REPEATS, help="Calls per micro-benchmark")
+    parser.add_argument("--output", help="Write the results to this JSON file (e.g. to store a baseline)")
+    parser.add_argument("--baseline", help="Compare against the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_REGRESSION_TOLERANCE,
+                        help="Allowed relative slowdown before a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.races, args.repeats)
+    print(format_results(results))
+    json_results = results_to_json(results)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(json_results, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_to_baseline(json_results, json.load(baseline_file), args.tolerance)
+        for name, slowdown in regressions:
+            print(f"REGRESSION: {name} is {slowdown:.2f}x slower than the baseline")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Counterfactual re-simulation of a recorded race: "what if this roll had been a 6 instead of a 2".
+
+A race is recorded by numbering every dice roll and AI decision (the events of the race) and taking
+a snapshot at the start of every few turns. A variant overrides the values of some events. It is
+restored from the last checkpoint before its first override and only the rest of the race is
+simulated again. Variants whose first override falls in the same turn phase also share the phases
+between the checkpoint and that phase, which are simulated once for all of them.
+
+The rolls of a variant come from the recorded race's dice, so every roll that is not overridden is
+the same as in the recorded race: an overridden roll still draws the recorded value from the dice,
+then uses the override. Event indices of a variant count its own events; the first override always
+refers to the recorded event, later ones to whatever happens at that index in the variant.
+
+Usage:
+    recorded = record_race(Race(TrackVersion.WILD, lineup, dice=Dice(7), verbose=False))
+    roll = next(event for event in recorded.events if event.kind == EVENT_ROLL and event.turn == 5)
+    races = recorded.run_counterfactuals([{roll.index: value} for value in range(1, 7)])
+"""
+
+import random
+from bisect import bisect_right
+
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.RaceSnapshot import RaceSnapshot
+from MidnightRunners.core.RacerAI import IRacerAI
+from MidnightRunners.core.Turn import TurnPhase
+
+EVENT_ROLL = "roll"
+EVENT_REROLL = "reroll"
+EVENT_PATH = "path"
+
+DICE_FACES = range(1, 7)
+DEFAULT_CHECKPOINT_TURNS = 1  # Turns between checkpoints of a recorded race
+
+
+class RaceEvent:
+    """A dice roll or AI decision, with the value the race went on with."""
+    def __init__(self, index: int, kind: str, player: Player, value, options):
+        self.index = index
+        self.kind = kind
+        self.player = player
+        self.value = value
+        self.options = options  # Values the event could have had
+        self.turn = None  # Turn number, set once the race is recorded
+
+    def __repr__(self):
+        return f"RaceEvent({self.index}, {self.kind}, {self.player.name}, {self.value}, turn {self.turn})"
+
+
+class EventRecorder:
+    """Numbers the events of a race, records them and replaces the values of overridden events.
+
+    Copies of the recorder, e.g. in race snapshots, keep the event count and the overrides but start
+    without recorded events, so checkpoints do not copy the event log.
+    """
+    def __init__(self, overrides: dict = None):
+        self.num_events = 0
+        self.overrides = dict(overrides) if overrides else {}  # Event index -> value
+        self.events = []
+
+    def __getstate__(self):
+        return {"num_events": self.num_events, "overrides": self.overrides}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.events = []
+
+    def record(self, kind: str, player: Player, value, options):
+        """Record an event and return the value to go on with."""
+        index = self.num_events
+        self.num_events += 1
+        if index in self.overrides:
+            value = self.overrides[index]
+            if value not in options:
+                raise ValueError(f"Override {value!r} of event {index} ({kind} of {player.name}) is not one of {list(options)}")
+        self.events.append(RaceEvent(index, kind, player, value, options))
+        return value
+
+
+class RecordingDice(Dice):
+    """Rolls with other dice and passes every roll through the recorder."""
+    def __init__(self, dice: Dice, recorder: EventRecorder):
+        super().__init__()
+        self.dice = dice
+        self.recorder = recorder
+
+    def roll(self, player: Player) -> int:
+        return self.recorder.record(EVENT_ROLL, player, self.dice.roll(player), DICE_FACES)
+
+
+class RecordingAI(IRacerAI):
+    """Decides like another AI and passes every decision through the recorder."""
+    def __init__(self, ai: IRacerAI, recorder: EventRecorder):
+        super().__init__(ai.player_name, ai.racer_name)
+        self.ai = ai
+        self.recorder = recorder
+
+    def decide_reroll(self, bs: BoardState, reroll_count: int, rolled_value: int) -> bool:
+        return self.recorder.record(EVENT_REROLL, self.player_name, self.ai.decide_reroll(bs, reroll_count, rolled_value),
+                                    (False, True))
+
+    def choose_path(self, bs: BoardState, bs_options: list) -> int:
+        return self.recorder.record(EVENT_PATH, self.player_name, self.ai.choose_path(bs, bs_options),
+                                    range(len(bs_options)))
+
+
+def do_race_step(race: Race):
+    """Start the race, or play its next turn phase; the steps between which checkpoints are taken."""
+    if not race.race_started:
+        race.trigger_before_race_powers()
+    else:
+        race.do_turn_phase()
+
+
+class RecordedRace:
+    """A finished race with its events and checkpoints, to re-simulate variants of it."""
+    def __init__(self, race: Race, recorder: EventRecorder):
+        self.race = race
+        self.recorder = recorder
+        self.events = recorder.events
+        self.step_first_events = []  # Index of the first event of every step
+        self.checkpoint_steps = []
+        self.checkpoints = []  # RaceSnapshot before each checkpoint step
+
+    def get_step(self, event_index: int) -> int:
+        """Step in which an event happened."""
+        if not 0 <= event_index < len(self.events):
+            raise IndexError(f"The recorded race has no event {event_index}, it has {len(self.events)} events")
+        return bisect_right(self.step_first_events, event_index) - 1
+
+    def run_counterfactual(self, overrides: dict) -> Race:
+        return self.run_counterfactuals([overrides])[0]
+
+    def run_counterfactuals(self, variants: list) -> list:
+        """Finish the race once per variant, a dict of event index to overriding value.
+
+        Returns the finished races in variant order. Their change lists hold the changes from their
+        checkpoint on, the changes before it are those of the recorded race.
+        """
+        variant_steps = [self.get_step(min(overrides)) if overrides else None for overrides in variants]
+        races = [None] * len(variants)
+        order = sorted((step, index) for index, step in enumerate(variant_steps) if step is not None)
+
+        prefix_race = None
+        prefix_step = None
+        prefix_snapshot = None
+        for step, variant_index in order:
+            checkpoint_index = bisect_right(self.checkpoint_steps, step) - 1
+            checkpoint_step = self.checkpoint_steps[checkpoint_index]
+            if prefix_race is None or prefix_step < checkpoint_step or prefix_step > step:
+                prefix_race = self.checkpoints[checkpoint_index].restore()
+                prefix_step = checkpoint_step
+                prefix_snapshot = self.checkpoints[checkpoint_index]
+            if prefix_step < step and prefix_snapshot is not None:
+                random.setstate(prefix_snapshot.random_state)  # Undo what the previous variant drew
+            while prefix_step < step:
+                do_race_step(prefix_race)
+                prefix_step += 1
+                prefix_snapshot = None
+            if prefix_snapshot is None:
+                prefix_snapshot = RaceSnapshot(prefix_race)
+            race = prefix_snapshot.restore()
+            race.dice.recorder.overrides = dict(variants[variant_index])
+            race.continue_race()
+            races[variant_index] = race
+
+        for variant_index, step in enumerate(variant_steps):
+            if step is None:  # Nothing overridden, the recorded race is the answer
+                races[variant_index] = self.race
+        return races
+
+
+def record_race(race: Race, checkpoint_turns: int = DEFAULT_CHECKPOINT_TURNS) -> RecordedRace:
+    """Play a new race to its end while recording its events, with a checkpoint every checkpoint_turns turns.
+
+    The racers' AIs and the race's dice are wrapped to record their events; they, and the racers, must
+    be copyable like for RaceSnapshot. Re-simulating variants resets the global random module to the
+    state of their checkpoint, like restoring a snapshot does.
+    """
+    recorder = EventRecorder()
+    race.set_dice(RecordingDice(race.dice, recorder))
+    for racer in race.player_to_racer_map.values():
+        racer.ai = RecordingAI(racer.ai, recorder)
+
+    recorded = RecordedRace(race, recorder)
+    step_turns = []
+    last_checkpoint_turn = None
+    while not race.race_started or not race.is_race_over():
+        at_turn_start = not race.race_started or race.board_state.current_turn_phase == TurnPhase.PH0_BETWEEN_TURNS
+        if at_turn_start and (last_checkpoint_turn is None or race.num_turns_taken - last_checkpoint_turn >= checkpoint_turns):
+            recorded.checkpoint_steps.append(len(step_turns))
+            recorded.checkpoints.append(RaceSnapshot(race))
+            last_checkpoint_turn = race.num_turns_taken
+        recorded.step_first_events.append(recorder.num_events)
+        step_turns.append(race.board_state.current_turn_number)
+        do_race_step(race)
+    race.continue_race()  # Finalizes the last turn, like do_race
+
+    for event in recorder.events:
+        event.turn = step_turns[recorded.get_step(event.index)]
+    return recorded
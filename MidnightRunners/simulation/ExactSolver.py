@@ -0,0 +1,256 @@
+"""
+Exact win probabilities and expected points by treating a race as a Markov chain over board states.
+
+Each state is a compact board state between turns (positions, trip flags, whose turn it is and the
+finishing places). Every turn has six equally likely rolls for the active player, which lead to the
+next states. Value iteration over all reachable states then gives the exact chances of finishing
+first or second and the expected points per player. The turn limit of the object engine is ignored,
+it only cuts off races that are practically impossible.
+"""
+
+from copy import deepcopy
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Dice import ScriptedDice
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Track import Track, TrackVersion, FIXED_TRACK_LENGTH
+from MidnightRunners.simulation.BatchEngine import TrackTables, can_vectorize, get_lineup
+
+NO_SEAT = -1
+DICE_FACES = [1, 2, 3, 4, 5, 6]
+DEFAULT_MAX_STATES = 2_000_000
+CONVERGENCE_TOLERANCE = 1e-12
+MAX_VALUE_ITERATIONS = 100_000  # Guards against lineups where a race can stall forever
+
+# Solutions per (track version, lineup) configuration
+solution_cache = {}
+
+
+class ExactResult:
+    """Exact outcome probabilities and expected points for a lineup, per racer name."""
+    def __init__(self, racer_names: list, first_place: np.ndarray, second_place: np.ndarray,
+                 expected_points: np.ndarray, num_states: int):
+        self.racer_names = racer_names
+        self.first_place_probabilities = dict(zip(racer_names, first_place.tolist()))
+        self.second_place_probabilities = dict(zip(racer_names, second_place.tolist()))
+        self.expected_points = dict(zip(racer_names, expected_points.tolist()))
+        self.num_states = num_states
+
+
+class DefaultMoveModel:
+    """Turn transitions for lineups with only the default main move, the track and Gunk's -1 power.
+
+    A state is (positions per seat, trip flags per seat, active seat, first place seat), with
+    finished racers at position -1. The rules mirror the vectorized batch engine.
+    """
+    def __init__(self, track_version: TrackVersion, player_racer_config: dict):
+        lineup = get_lineup(player_racer_config)
+        self.num_players = len(lineup)
+        self.racer_names = [racer.name for racer in lineup.values()]
+        self.gunk_seat = NO_SEAT
+        for seat, racer in enumerate(lineup.values()):
+            if type(racer) is Gunk:
+                self.gunk_seat = seat
+
+        track = Track(track_version)
+        tables = TrackTables(track)
+        self.star_points = tables.star_points.tolist()
+        self.trip_space = tables.trip_space.tolist()
+        self.finish_space = tables.finish_space.tolist()
+        self.arrow_destination = tables.arrow_destination.tolist()
+        rewards = BoardState(self.num_players, track, dict(zip(lineup.keys(), self.racer_names)))
+        self.pts_reward_first_place = rewards.pts_reward_first_place
+        self.pts_reward_second_place = rewards.pts_reward_second_place
+
+    def get_initial_state(self):
+        return ((0,) * self.num_players, (False,) * self.num_players, 0, NO_SEAT)
+
+    def get_next_seat(self, positions: tuple, seat: int) -> int:
+        """Next seat in turn order that has not finished yet."""
+        for offset in range(1, self.num_players + 1):
+            next_seat = (seat + offset) % self.num_players
+            if positions[next_seat] != -1:
+                return next_seat
+        return seat
+
+    def get_transitions(self, state) -> list:
+        """Next state and points per seat for each of the six rolls of the active player."""
+        positions, trips, seat, first_seat = state
+        if trips[seat]:
+            # Tripped racers skip their main move, whatever the roll
+            new_trips = trips[:seat] + (False,) + trips[seat + 1:]
+            next_state = (positions, new_trips, self.get_next_seat(positions, seat), first_seat)
+            return [(next_state, (0,) * self.num_players)] * len(DICE_FACES)
+
+        transitions = []
+        for roll in DICE_FACES:
+            old_position = positions[seat]
+            intended_position = old_position + roll
+            landed = Track.GetNewSpace(old_position, roll)
+            if seat != self.gunk_seat and self.gunk_seat != NO_SEAT and intended_position <= FIXED_TRACK_LENGTH - 1:
+                landed = Track.GetNewSpace(intended_position, -1)
+
+            points = [0] * self.num_players
+            points[seat] += self.star_points[landed]
+            tripped = self.trip_space[landed] and landed != old_position
+            new_trips = trips[:seat] + (tripped,) + trips[seat + 1:]
+
+            if self.finish_space[landed]:
+                new_positions = positions[:seat] + (-1,) + positions[seat + 1:]
+                if first_seat == NO_SEAT:
+                    points[seat] += self.pts_reward_first_place
+                    next_state = (new_positions, new_trips, self.get_next_seat(new_positions, seat), seat)
+                else:
+                    points[seat] += self.pts_reward_second_place
+                    next_state = FinishedState(first_seat, seat)
+            else:
+                new_positions = positions[:seat] + (self.arrow_destination[landed],) + positions[seat + 1:]
+                next_state = (new_positions, new_trips, self.get_next_seat(new_positions, seat), first_seat)
+            transitions.append((next_state, tuple(points)))
+        return transitions
+
+
+class EngineModel:
+    """Turn transitions computed by running single turns of the object engine with a fixed roll.
+
+    Works for any racer whose power only depends on the dice (and on deterministic AI choices), at
+    the cost of a full trigger resolution per state and roll. Only practical for small lineups.
+    """
+    def __init__(self, track_version: TrackVersion, player_racer_config: dict):
+        self.track_version = track_version
+        self.player_racer_config = player_racer_config
+        initial_race = Race(track_version, get_lineup(player_racer_config), verbose=False)
+        initial_race.trigger_before_race_powers()
+        self.players = list(initial_race.board_state.player_to_racer_name_map.keys())
+        self.racer_names = list(initial_race.board_state.player_to_racer_name_map.values())
+        self.num_players = len(self.players)
+        self.initial_board_state = initial_race.board_state
+        self.board_states = {}
+
+    def get_state_key(self, bs: BoardState):
+        """Compact fingerprint of a board state between turns, without the points scored so far."""
+        key = (
+            tuple(bs.racer_name_to_position_map[racer_name] for racer_name in self.racer_names),
+            tuple(bs.racer_trip_map[racer_name] for racer_name in self.racer_names),
+            tuple(bs.turn_order),
+            bs.first_place_racer,
+            frozenset(bs.eliminated_racers),
+        )
+        if key not in self.board_states:
+            self.board_states[key] = bs
+        return key
+
+    def get_initial_state(self):
+        return self.get_state_key(self.initial_board_state)
+
+    def get_transitions(self, state) -> list:
+        """Next state and points per seat for each of the six rolls of the active player."""
+        bs = self.board_states[state]
+        active_player = bs.turn_order[0]
+        transitions = []
+        for roll in DICE_FACES:
+            dice = ScriptedDice({player: [roll] if player == active_player else [] for player in self.players})
+            race = Race(self.track_version, get_lineup(self.player_racer_config), dice=dice, verbose=False)
+            race.board_state = deepcopy(bs)
+            race.board_state.player_points_map = {player: 0 for player in self.players}
+            race.turn_order = list(bs.turn_order)
+            race.do_turn()
+
+            after_bs = race.board_state
+            points = tuple(after_bs.player_points_map[player] for player in self.players)
+            if after_bs.race_is_finished:
+                next_state = FinishedState(self.racer_names.index(after_bs.first_place_racer),
+                                           self.racer_names.index(after_bs.second_place_racer))
+            else:
+                next_state = self.get_state_key(after_bs)
+            transitions.append((next_state, points))
+
+            if dice.player_roll_index[active_player] == 0:
+                # The roll was not used (e.g. a tripped racer), so every roll gives the same outcome
+                return transitions * len(DICE_FACES)
+        return transitions
+
+
+class FinishedState:
+    """Absorbing state of a finished race."""
+    def __init__(self, first_seat: int, second_seat: int):
+        self.first_seat = first_seat
+        self.second_seat = second_seat
+
+    def __eq__(self, other):
+        return isinstance(other, FinishedState) and \
+            (self.first_seat, self.second_seat) == (other.first_seat, other.second_seat)
+
+    def __hash__(self):
+        return hash((FinishedState, self.first_seat, self.second_seat))
+
+
+def solve_exact(track_version: TrackVersion, player_racer_config: dict, max_states: int = DEFAULT_MAX_STATES) -> ExactResult:
+    """Exact outcome of a lineup, using the fast model when the lineup allows it. Results are cached."""
+    config_key = (track_version, tuple((player, player_racer_config[player]) for player in sorted(player_racer_config, key=lambda p: p.value)))
+    if config_key not in solution_cache:
+        if can_vectorize(player_racer_config):
+            model = DefaultMoveModel(track_version, player_racer_config)
+        else:
+            model = EngineModel(track_version, player_racer_config)
+        solution_cache[config_key] = solve_markov_chain(model, max_states)
+    return solution_cache[config_key]
+
+
+def solve_markov_chain(model, max_states: int = DEFAULT_MAX_STATES) -> ExactResult:
+    """Enumerate all reachable states of the model and run value iteration until convergence."""
+    num_players = model.num_players
+    states = [model.get_initial_state()]
+    state_indices = {states[0]: 0}
+    next_indices = []
+    mean_points = []
+
+    # Breadth-first enumeration of every reachable state with its transitions
+    state_index = 0
+    while state_index < len(states):
+        state = states[state_index]
+        if isinstance(state, FinishedState):
+            next_indices.extend([state_index] * len(DICE_FACES))
+            mean_points.append((0.0,) * num_players)
+        else:
+            transitions = model.get_transitions(state)
+            for next_state, _ in transitions:
+                if next_state not in state_indices:
+                    if len(states) >= max_states:
+                        raise ValueError(f"Race has more than {max_states} reachable states, use Monte Carlo simulation instead")
+                    state_indices[next_state] = len(states)
+                    states.append(next_state)
+                next_indices.append(state_indices[next_state])
+            mean_points.append(tuple(sum(points[seat] for _, points in transitions) / len(transitions)
+                                     for seat in range(num_players)))
+        state_index += 1
+
+    num_states = len(states)
+    next_indices = np.array(next_indices, dtype=np.int64).reshape(num_states, len(DICE_FACES))
+    # Values per state: expected future points, then P(first place), then P(second place) per seat
+    rewards = np.zeros((num_states, 3 * num_players))
+    rewards[:, :num_players] = np.array(mean_points)
+    finished = np.zeros(num_states, dtype=bool)
+    finished_values = np.zeros((num_states, 3 * num_players))
+    for index, state in enumerate(states):
+        if isinstance(state, FinishedState):
+            finished[index] = True
+            finished_values[index, num_players + state.first_seat] = 1.0
+            finished_values[index, 2 * num_players + state.second_seat] = 1.0
+
+    values = finished_values.copy()
+    for _ in range(MAX_VALUE_ITERATIONS):
+        new_values = rewards.copy()
+        for roll_index in range(len(DICE_FACES)):
+            new_values += values[next_indices[:, roll_index]] / len(DICE_FACES)
+        new_values[finished] = finished_values[finished]
+        difference = np.abs(new_values - values).max()
+        values = new_values
+        if difference < CONVERGENCE_TOLERANCE:
+            break
+
+    return ExactResult(model.racer_names, values[0, num_players:2 * num_players],
+                       values[0, 2 * num_players:], values[0, :num_players], num_states)
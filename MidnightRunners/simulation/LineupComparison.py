@@ -0,0 +1,103 @@
+"""
+Paired comparison of two lineups with variance reduction.
+
+With common random numbers both lineups race with the same per seat dice streams, so the difference
+between them is mostly caused by the racers and not by luck. Antithetic dice additionally pair every
+race with a race on mirrored dice (7 - roll). Both shrink the variance of the estimated difference
+for the same number of races.
+"""
+
+import numpy as np
+
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import run_batch
+
+MIN_SAMPLING_UNITS = 2  # Needed for a standard error
+
+
+class LineupSamples:
+    """Wins and points per seat, per race and per sampling unit (a race, or an antithetic pair of races)."""
+    def __init__(self, track_version: TrackVersion, player_racer_config: dict, num_races: int, seed: int, antithetic: bool):
+        num_units = num_races // 2 if antithetic else num_races
+        if antithetic and num_races % 2 != 0:
+            raise ValueError(f"Antithetic sampling runs whole pairs of races, got an odd race count {num_races}")
+        if num_units < MIN_SAMPLING_UNITS:
+            raise ValueError(f"At least {MIN_SAMPLING_UNITS} {'pairs of races' if antithetic else 'races'} are needed, "
+                             f"got {num_races} races")
+        if antithetic:
+            batches = [run_batch(track_version, player_racer_config, num_units, seed=seed),
+                       run_batch(track_version, player_racer_config, num_units, seed=seed, antithetic=True)]
+        else:
+            batches = [run_batch(track_version, player_racer_config, num_races, seed=seed)]
+        self.players = batches[0].players
+        self.racer_names = batches[0].racer_names
+
+        seats = np.arange(len(self.players))
+        batch_wins = [(batch.first_place[:, None] == seats).astype(float) for batch in batches]
+        batch_points = [batch.points.astype(float) for batch in batches]
+        self.race_wins = np.concatenate(batch_wins)
+        self.race_points = np.concatenate(batch_points)
+        self.unit_wins = np.mean(batch_wins, axis=0)
+        self.unit_points = np.mean(batch_points, axis=0)
+
+
+class SeatComparison:
+    """Difference between lineup A and lineup B for one seat (A minus B)."""
+    def __init__(self, player, racer_name_a, racer_name_b, samples_a: LineupSamples, samples_b: LineupSamples, seat: int):
+        self.player = player
+        self.racer_name_a = racer_name_a
+        self.racer_name_b = racer_name_b
+        self.num_races = len(samples_a.race_points)
+
+        win_differences = samples_a.unit_wins[:, seat] - samples_b.unit_wins[:, seat]
+        points_differences = samples_a.unit_points[:, seat] - samples_b.unit_points[:, seat]
+        self.win_rate_difference = float(np.mean(win_differences))
+        self.win_rate_difference_se = get_standard_error(win_differences)
+        self.points_difference = float(np.mean(points_differences))
+        self.points_difference_se = get_standard_error(points_differences)
+
+        # Standard error of plain independent sampling with the same number of races per lineup
+        self.independent_win_rate_difference_se = get_independent_standard_error(
+            samples_a.race_wins[:, seat], samples_b.race_wins[:, seat])
+        self.independent_points_difference_se = get_independent_standard_error(
+            samples_a.race_points[:, seat], samples_b.race_points[:, seat])
+
+    @property
+    def variance_reduction(self) -> float:
+        """How many times lower the variance of the points difference is than with independent sampling."""
+        if self.points_difference_se == 0:
+            return float("inf")
+        return (self.independent_points_difference_se / self.points_difference_se) ** 2
+
+
+def get_standard_error(samples: np.ndarray) -> float:
+    if len(samples) < 2:
+        return float("inf")
+    return float(np.std(samples, ddof=1) / np.sqrt(len(samples)))
+
+
+def get_independent_standard_error(race_samples_a: np.ndarray, race_samples_b: np.ndarray) -> float:
+    """Standard error of the difference of two independent means, from the spread of single races."""
+    return float(np.sqrt(np.var(race_samples_a, ddof=1) / len(race_samples_a) +
+                         np.var(race_samples_b, ddof=1) / len(race_samples_b)))
+
+
+def compare_lineups(track_version: TrackVersion, config_a: dict, config_b: dict, num_races: int, seed: int = 0,
+                    common_random_numbers: bool = True, antithetic: bool = False) -> list:
+    """Estimate per seat differences in win rate and points between two lineups with the same players.
+
+    Each lineup runs num_races races, an even number with antithetic dice. Without common random
+    numbers, lineup B uses seed + 1 so its dice are independent of lineup A.
+    """
+    if set(config_a.keys()) != set(config_b.keys()):
+        raise ValueError("Both lineups must have the same players")
+
+    samples_a = LineupSamples(track_version, config_a, num_races, seed, antithetic)
+    seed_b = seed if common_random_numbers else seed + 1
+    samples_b = LineupSamples(track_version, config_b, num_races, seed_b, antithetic)
+
+    comparisons = []
+    for seat, player in enumerate(samples_a.players):
+        comparisons.append(SeatComparison(player, samples_a.racer_names[seat], samples_b.racer_names[seat],
+                                          samples_a, samples_b, seat))
+    return comparisons
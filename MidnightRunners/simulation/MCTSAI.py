@@ -0,0 +1,207 @@
+"""
+Monte Carlo tree search racer AI with rollouts played to the end of the race.
+
+Each option is evaluated from the start of the next turn. Rollouts are played by a quiet Race
+(no console output, no instrumentation) in which every racer, including the searching one, uses its
+default AI. The option to sample next is picked with UCB1. Rollouts run in batches, spread over a
+process pool when one is configured.
+
+The tree has a node for every board state at the start of one of the first few turns of a rollout,
+keyed by its point-free fingerprint. A node holds the mean number of points gained from that state to
+the end of the race, which does not depend on the path to it. The tree is kept between the
+decisions of a race, so states that were already reached in earlier rollouts start with their
+statistics.
+"""
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from time import perf_counter
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.RacerAI import IRacerAI, NaiveRacerAI
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+from MidnightRunners.simulation.BatchEngine import get_lineup
+from MidnightRunners.simulation.SearchAI import get_next_turn_state
+from MidnightRunners.simulation.TurnOutcomes import get_board_fingerprint
+
+DEFAULT_TIME_BUDGET = 0.5  # Seconds per decision
+DEFAULT_MAX_ITERATIONS = 200  # Rollouts over all options per decision
+DEFAULT_BATCH_SIZE = 8  # Rollouts selected before their results are backpropagated
+DEFAULT_TREE_DEPTH = 4  # Turns of every rollout that get a tree node
+EXPLORATION_CONSTANT = 2.0  # In points, the order of a race's point rewards
+MAX_TREE_NODES = 100_000
+
+
+class MCTSNode:
+    """Rollout statistics of one board state: points gained from there to the end of the race."""
+    def __init__(self):
+        self.visits = 0
+        self.total_points = 0.0
+
+    def get_mean(self) -> float:
+        return self.total_points / self.visits if self.visits > 0 else 0.0
+
+
+def run_rollout(track_version: TrackVersion, player_racer_config: dict, bs: BoardState, player: Player,
+                seed: int, tree_depth: int) -> tuple[float, list]:
+    """Play the race to its end from a board state between turns.
+
+    Returns the points the player gained and, for the first tree_depth turns, the fingerprint of the
+    board state at the start of the turn with the points the player had gained up to then.
+    """
+    race = Race(track_version, get_lineup(player_racer_config), dice=Dice(seed), verbose=False)
+    race.board_state = deepcopy(bs)
+    race.turn_order = list(bs.turn_order)
+    race.num_turns_taken = bs.current_turn_number
+    start_points = bs.player_points_map[player]
+
+    path = [(get_board_fingerprint(race.board_state), 0)]
+    while not race.is_race_over():
+        race.do_turn_phase()
+        if race.board_state.current_turn_phase == TurnPhase.PH0_BETWEEN_TURNS and len(path) < tree_depth:
+            path.append((get_board_fingerprint(race.board_state), race.board_state.player_points_map[player] - start_points))
+    return race.board_state.player_points_map[player] - start_points, path
+
+
+def run_rollouts(track_version: TrackVersion, player_racer_config: dict, player: Player, tree_depth: int,
+                 tasks: list) -> list:
+    """Run a chunk of rollouts, given as (board state, seed) pairs; used as the unit of work of the pool."""
+    return [run_rollout(track_version, player_racer_config, bs, player, seed, tree_depth) for bs, seed in tasks]
+
+
+class MCTSRacerAI(IRacerAI):
+    """Chooses paths by the points gained in rollouts to the end of the race.
+
+    The search stops at the time budget or once the options have max_iterations rollouts, whichever
+    comes first; rollouts through an option's state in earlier decisions count as well. With
+    num_workers > 1 the rollouts of a batch are spread over a process pool that the AI creates on its
+    first decision; call close() to shut it down. An executor can also be given, e.g. to share one
+    pool between the racers of a batch simulation; each batch is then split into num_workers chunks.
+    """
+    def __init__(self, player_name: Player, racer_name: RacerName, track_version: TrackVersion, player_racer_config: dict,
+                 time_budget: float = DEFAULT_TIME_BUDGET, max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                 batch_size: int = DEFAULT_BATCH_SIZE, tree_depth: int = DEFAULT_TREE_DEPTH,
+                 num_workers: int = 1, executor: ProcessPoolExecutor = None, seed: int = None):
+        super().__init__(player_name, racer_name)
+        self.track_version = track_version
+        self.player_racer_config = player_racer_config  # Racers used in the rollouts, with their default AIs
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.batch_size = batch_size
+        self.tree_depth = tree_depth
+        self.num_workers = num_workers
+        self.executor = executor
+        self.owns_executor = False
+        self.rng = random.Random(seed)
+        self.nodes = {}  # Board fingerprint -> MCTSNode, kept between the decisions of a race
+        self.last_turn_number = 0
+        self.last_num_iterations = 0
+        self.fallback_ai = NaiveRacerAI(player_name, racer_name)
+
+    def decide_reroll(self, bs: BoardState, reroll_count: int, rolled_value: int) -> bool:
+        """Rerolls happen in the middle of a move, where rollouts cannot start, so this uses the naive threshold."""
+        return self.fallback_ai.decide_reroll(bs, reroll_count, rolled_value)
+
+    def choose_path(self, bs: BoardState, bs_options: list) -> int:
+        """Sample the options with UCB1 until the budget is used up, then pick the best mean."""
+        deadline = perf_counter() + self.time_budget
+        if bs.current_turn_number < self.last_turn_number or len(self.nodes) > MAX_TREE_NODES:
+            self.nodes = {}  # A new race, or too many states to keep
+        self.last_turn_number = bs.current_turn_number
+
+        next_turn_states = [get_next_turn_state(option) for option in bs_options]
+        option_nodes = [self.get_node(get_board_fingerprint(next_turn_state)) for next_turn_state in next_turn_states]
+        option_points = [option.player_points_map[self.player_name] for option in bs_options]
+
+        # Visits from earlier decisions count towards the budget, so reused states need fewer new rollouts
+        unique_nodes = list({id(node): node for node in option_nodes}.values())
+        self.last_num_iterations = 0
+        while perf_counter() < deadline:
+            batch_size = min(self.batch_size, self.max_iterations - sum(node.visits for node in unique_nodes))
+            if batch_size <= 0:
+                break
+            selected = self.select_options(option_nodes, option_points, batch_size)
+            tasks = [(next_turn_states[index], self.rng.getrandbits(32)) for index in selected]
+            for rollout_points, path in self.run_batch(tasks):
+                self.backpropagate(rollout_points, path)
+            self.last_num_iterations += batch_size
+
+        scores = [points + node.get_mean() for points, node in zip(option_points, option_nodes)]
+        return scores.index(max(scores))
+
+    def get_node(self, fingerprint: tuple) -> MCTSNode:
+        if fingerprint not in self.nodes:
+            self.nodes[fingerprint] = MCTSNode()
+        return self.nodes[fingerprint]
+
+    def select_options(self, option_nodes: list, option_points: list, batch_size: int) -> list:
+        """Pick the options for a batch with UCB1, counting options already in the batch as visited."""
+        pending_visits = [0] * len(option_nodes)
+        selected = []
+        for _ in range(batch_size):
+            total_visits = sum(node.visits for node in option_nodes) + len(selected)
+            best_index, best_score = 0, -math.inf
+            for index, (node, points) in enumerate(zip(option_nodes, option_points)):
+                visits = node.visits + pending_visits[index]
+                if visits == 0:
+                    score = math.inf
+                else:
+                    score = points + node.get_mean() + EXPLORATION_CONSTANT * math.sqrt(math.log(total_visits) / visits)
+                if score > best_score:
+                    best_index, best_score = index, score
+            pending_visits[best_index] += 1
+            selected.append(best_index)
+        return selected
+
+    def run_batch(self, tasks: list) -> list:
+        """Run the rollouts of a batch, in chunks over the worker pool when there is one."""
+        executor = self.get_executor()
+        if executor is None:
+            return run_rollouts(self.track_version, self.player_racer_config, self.player_name, self.tree_depth, tasks)
+        num_chunks = min(len(tasks), self.num_workers)
+        chunks = [tasks[chunk_index::num_chunks] for chunk_index in range(num_chunks)]
+        futures = [executor.submit(run_rollouts, self.track_version, self.player_racer_config, self.player_name,
+                                   self.tree_depth, chunk) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None and self.num_workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=self.num_workers)
+            self.owns_executor = True
+        return self.executor
+
+    def backpropagate(self, rollout_points: float, path: list):
+        """Add the points gained from each board state on the path to the end of the race to its node."""
+        for fingerprint, points_so_far in path:
+            node = self.get_node(fingerprint)
+            node.visits += 1
+            node.total_points += rollout_points - points_so_far
+
+    def close(self):
+        """Shut down the worker pool, if this AI created one."""
+        if self.owns_executor:
+            self.executor.shutdown()
+            self.executor = None
+            self.owns_executor = False
+
+
+def make_mcts_racer(racer_class, track_version: TrackVersion, player_racer_config: dict, player: Player, **search_options):
+    """Create a racer that makes its choices with an MCTSRacerAI.
+
+    Use functools.partial(make_mcts_racer, racer_class, track_version, player_racer_config) as a lineup
+    entry; the plain player_racer_config is used for the racers in the rollouts. A lineup entry creates
+    a racer for every race and nothing closes its AI, so rollouts over a pool need an executor owned by
+    the caller and shared by every race.
+    """
+    if search_options.get("num_workers", 1) > 1 and search_options.get("executor") is None:
+        raise ValueError("make_mcts_racer needs an executor for num_workers > 1, a pool per race would be left open")
+    racer = racer_class(player)
+    racer.ai = MCTSRacerAI(player, racer.name, track_version, player_racer_config, **search_options)
+    return racer
@@ -0,0 +1,99 @@
+"""
+Outcome estimates for a race position, from many continuations of one race snapshot.
+
+Every continuation restores the snapshot with its own seeded dice and plays the race to its end.
+Continuation k uses seed + k, so the estimate is reproducible no matter how many workers are used.
+The snapshot is serialized once and sent to the workers per chunk of continuations.
+
+Usage:
+    snapshot = RaceSnapshot(race)  # e.g. after some race.do_turn() calls
+    result = fork_race(snapshot, num_continuations=1000, num_workers=4)
+    print(result.format_summary())
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.RaceSnapshot import RaceSnapshot
+from MidnightRunners.simulation.BatchEngine import NO_SEAT
+from MidnightRunners.simulation.LineupComparison import get_standard_error
+
+DEFAULT_CHUNK_SIZE = 50
+
+
+class ForkResult:
+    """Final results of every continuation, per seat of the lineup."""
+    def __init__(self, players: list, racer_names: list, num_continuations: int):
+        self.players = players
+        self.racer_names = racer_names
+        self.points = np.zeros((num_continuations, len(players)), dtype=np.int32)
+        self.first_place = np.full(num_continuations, NO_SEAT, dtype=np.int8)
+        self.second_place = np.full(num_continuations, NO_SEAT, dtype=np.int8)
+        self.num_turns = np.zeros(num_continuations, dtype=np.int32)
+
+    @property
+    def num_continuations(self) -> int:
+        return len(self.num_turns)
+
+    def win_probabilities(self) -> dict:
+        return {name: float(np.mean(self.first_place == seat)) for seat, name in enumerate(self.racer_names)}
+
+    def second_place_probabilities(self) -> dict:
+        return {name: float(np.mean(self.second_place == seat)) for seat, name in enumerate(self.racer_names)}
+
+    def mean_points(self) -> dict:
+        return {name: float(self.points[:, seat].mean()) for seat, name in enumerate(self.racer_names)}
+
+    def format_summary(self) -> str:
+        lines = [f"{self.num_continuations} continuations:"]
+        for seat, (player, racer_name) in enumerate(zip(self.players, self.racer_names)):
+            wins = (self.first_place == seat).astype(float)
+            lines.append(f"  {player.name} {racer_name.value:<12} win {wins.mean():6.1%} ± {get_standard_error(wins):.1%}, "
+                         f"second {np.mean(self.second_place == seat):6.1%}, "
+                         f"points {self.points[:, seat].mean():5.2f} ± {get_standard_error(self.points[:, seat]):.2f}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def concatenate(results: list) -> "ForkResult":
+        combined = ForkResult(results[0].players, results[0].racer_names, 0)
+        for attribute in ("points", "first_place", "second_place", "num_turns"):
+            setattr(combined, attribute, np.concatenate([getattr(result, attribute) for result in results]))
+        return combined
+
+
+def run_continuations(snapshot_data: bytes, seeds: list) -> ForkResult:
+    """Play the race of a serialized snapshot to its end once per seed; used as the unit of work of the pool."""
+    snapshot = RaceSnapshot.from_bytes(snapshot_data)
+    players = list(snapshot.board_state.player_to_racer_name_map)
+    racer_names = [snapshot.board_state.player_to_racer_name_map[player] for player in players]
+    result = ForkResult(players, racer_names, len(seeds))
+    for index, seed in enumerate(seeds):
+        race = snapshot.restore(dice=Dice(seed), restore_random_state=False)
+        race.continue_race()
+        bs = race.board_state
+        result.points[index] = [bs.player_points_map[player] for player in players]
+        if bs.first_place_racer is not None:
+            result.first_place[index] = racer_names.index(bs.first_place_racer)
+        if bs.second_place_racer is not None:
+            result.second_place[index] = racer_names.index(bs.second_place_racer)
+        result.num_turns[index] = race.num_turns_taken
+    return result
+
+
+def fork_race(snapshot: RaceSnapshot, num_continuations: int = 1000, seed: int = 0, num_workers: int = 1,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> ForkResult:
+    """Estimate the outcome probabilities of a race position from num_continuations continuations.
+
+    With more than one worker the racers and their AIs must be picklable, like for serializing the snapshot.
+    """
+    snapshot_data = snapshot.to_bytes()
+    seed_chunks = [list(range(seed + start, seed + min(start + chunk_size, num_continuations)))
+                   for start in range(0, num_continuations, chunk_size)]
+    if num_workers <= 1:
+        chunks = [run_continuations(snapshot_data, seeds) for seeds in seed_chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            chunks = list(executor.map(run_continuations, [snapshot_data] * len(seed_chunks), seed_chunks))
+    return ForkResult.concatenate(chunks)
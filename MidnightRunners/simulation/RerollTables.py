@@ -0,0 +1,213 @@
+"""
+Precomputed reroll decisions per track version, from dynamic programming over a two racer race.
+
+The model races the deciding racer against the leading opponent, both with the default main move and
+the track's special spaces (as in the exact solver's default move model). A state between moves is
+(own position, own trip flag, opponent position, opponent trip flag, whether first place is taken,
+who moves), where the opponent can also be gone. Value iteration gives the expected points the
+deciding racer still scores from every state, and with that the best choice after every roll: keep
+it, or roll again while rerolls are left. For two player races without powers this is exact; with
+more players the other opponents only show up through first place being taken.
+
+The decisions are generated offline with
+
+    python -m MidnightRunners.simulation.RerollTables
+
+and saved as one .npy file per track version, which is memory-mapped on first use. A decision is then
+a single lookup in an array indexed by [first place taken, own position, leading opponent position,
+opponent tripped, reroll count, rolled value - 1].
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.RacerAI import NaiveRacerAI
+from MidnightRunners.core.Track import Track, TrackVersion, FIXED_TRACK_LENGTH
+from MidnightRunners.simulation.BatchEngine import TrackTables
+
+DICE_FACES = [1, 2, 3, 4, 5, 6]
+DEFAULT_MAX_REROLLS = 2
+DEFAULT_TABLE_DIR = os.path.join(os.path.dirname(__file__), "reroll_tables")
+NO_OPPONENT = FIXED_TRACK_LENGTH - 1  # Opponent position index once no opponent is left in the race
+CONVERGENCE_TOLERANCE = 1e-12
+MAX_VALUE_ITERATIONS = 100_000
+
+MOVER_SELF = 0
+MOVER_OPPONENT = 1
+
+# Memory-mapped decision tables per track version
+reroll_tables = {}
+
+
+def get_table_path(track_version: TrackVersion, table_dir: str = DEFAULT_TABLE_DIR) -> str:
+    return os.path.join(table_dir, f"reroll_{track_version.name}.npy")
+
+
+class RerollModel:
+    """Transitions of the two racer race, with one index per state and a final absorbing state."""
+    def __init__(self, track_version: TrackVersion):
+        track = Track(track_version)
+        tables = TrackTables(track)
+        self.star_points = tables.star_points.tolist()
+        self.trip_space = tables.trip_space.tolist()
+        self.finish_space = tables.finish_space.tolist()
+        self.arrow_destination = tables.arrow_destination.tolist()
+        rewards = BoardState(2, track, {})
+        self.pts_reward_first_place = rewards.pts_reward_first_place
+        self.pts_reward_second_place = rewards.pts_reward_second_place
+
+        self.states = [(first_taken, position, tripped, opponent_position, opponent_tripped, mover)
+                       for first_taken in (False, True)
+                       for position in range(NO_OPPONENT)
+                       for tripped in (False, True)
+                       for opponent_position in range(FIXED_TRACK_LENGTH)
+                       for opponent_tripped in (False, True)
+                       for mover in (MOVER_SELF, MOVER_OPPONENT)
+                       if opponent_position != NO_OPPONENT or (not opponent_tripped and mover == MOVER_SELF)]
+        self.state_indices = {state: index for index, state in enumerate(self.states)}
+        self.finished_index = len(self.states)
+
+    def get_move(self, position: int, roll: int) -> tuple[int, int, bool, bool]:
+        """Position after the arrow, star points, trip flag and whether the racer finished."""
+        landed = Track.GetNewSpace(position, roll)
+        tripped = self.trip_space[landed] and landed != position
+        return self.arrow_destination[landed], self.star_points[landed], tripped, self.finish_space[landed]
+
+    def get_transitions(self, state) -> list:
+        """Next state index and own points for each roll of the racer that moves."""
+        first_taken, position, tripped, opponent_position, opponent_tripped, mover = state
+        next_mover = MOVER_SELF if opponent_position == NO_OPPONENT else MOVER_OPPONENT
+        transitions = []
+        if mover == MOVER_SELF:
+            if tripped:
+                next_state = (first_taken, position, False, opponent_position, opponent_tripped, next_mover)
+                return [(self.state_indices[next_state], 0)] * len(DICE_FACES)
+            for roll in DICE_FACES:
+                new_position, points, new_tripped, finished = self.get_move(position, roll)
+                if finished:
+                    points += self.pts_reward_second_place if first_taken else self.pts_reward_first_place
+                    transitions.append((self.finished_index, points))
+                else:
+                    next_state = (first_taken, new_position, new_tripped, opponent_position, opponent_tripped, next_mover)
+                    transitions.append((self.state_indices[next_state], points))
+            return transitions
+
+        if opponent_tripped:
+            next_state = (first_taken, position, tripped, opponent_position, False, MOVER_SELF)
+            return [(self.state_indices[next_state], 0)] * len(DICE_FACES)
+        for roll in DICE_FACES:
+            new_position, _, new_tripped, finished = self.get_move(opponent_position, roll)
+            if finished and first_taken:
+                transitions.append((self.finished_index, 0))  # The opponent took second place, the race is over
+            elif finished:
+                transitions.append((self.state_indices[(True, position, tripped, NO_OPPONENT, False, MOVER_SELF)], 0))
+            else:
+                next_state = (first_taken, position, tripped, new_position, new_tripped, MOVER_SELF)
+                transitions.append((self.state_indices[next_state], 0))
+        return transitions
+
+
+def solve_reroll_table(track_version: TrackVersion, max_rerolls: int = DEFAULT_MAX_REROLLS) -> tuple[np.ndarray, np.ndarray]:
+    """Value iteration over the two racer race with optimal rerolls.
+
+    Returns the reroll decisions, indexed like the saved tables, and the expected points the racer
+    still scores from every state where it is about to roll (same index without the last two axes).
+    """
+    model = RerollModel(track_version)
+    num_states = len(model.states)
+    next_indices = np.full((num_states + 1, len(DICE_FACES)), model.finished_index, dtype=np.int64)
+    points = np.zeros((num_states + 1, len(DICE_FACES)))
+    can_reroll = np.zeros(num_states + 1, dtype=bool)
+    for index, state in enumerate(model.states):
+        for roll_index, (next_index, roll_points) in enumerate(model.get_transitions(state)):
+            next_indices[index, roll_index] = next_index
+            points[index, roll_index] = roll_points
+        can_reroll[index] = state[5] == MOVER_SELF and not state[2]
+
+    values = np.zeros(num_states + 1)
+    for _ in range(MAX_VALUE_ITERATIONS):
+        move_values = points + values[next_indices]
+        roll_values = get_roll_values(move_values, can_reroll, max_rerolls)
+        new_values = roll_values[0].mean(axis=1)
+        difference = np.abs(new_values - values).max()
+        values = new_values
+        if difference < CONVERGENCE_TOLERANCE:
+            break
+
+    move_values = points + values[next_indices]
+    roll_values = get_roll_values(move_values, can_reroll, max_rerolls)
+    decisions = np.zeros((2, FIXED_TRACK_LENGTH, FIXED_TRACK_LENGTH, 2, max_rerolls, len(DICE_FACES)), dtype=np.uint8)
+    state_values = np.zeros((2, FIXED_TRACK_LENGTH, FIXED_TRACK_LENGTH, 2))
+    for index, (first_taken, position, tripped, opponent_position, opponent_tripped, mover) in enumerate(model.states):
+        if mover == MOVER_SELF and not tripped:
+            table_index = (int(first_taken), position, opponent_position, int(opponent_tripped))
+            state_values[table_index] = values[index]
+            for reroll_count in range(max_rerolls):
+                decisions[table_index][reroll_count] = roll_values[reroll_count + 1][index].mean() > move_values[index]
+    return decisions, state_values
+
+
+def get_roll_values(move_values: np.ndarray, can_reroll: np.ndarray, max_rerolls: int) -> list:
+    """Value of every state and roll after reroll_count rerolls, for reroll_count 0 to max_rerolls."""
+    roll_values = [move_values]
+    for _ in range(max_rerolls):
+        reroll_value = roll_values[0].mean(axis=1, keepdims=True)
+        roll_values.insert(0, np.where(can_reroll[:, None], np.maximum(move_values, reroll_value), move_values))
+    return roll_values
+
+
+def save_reroll_tables(table_dir: str = DEFAULT_TABLE_DIR, max_rerolls: int = DEFAULT_MAX_REROLLS):
+    os.makedirs(table_dir, exist_ok=True)
+    for track_version in TrackVersion:
+        decisions, _ = solve_reroll_table(track_version, max_rerolls)
+        np.save(get_table_path(track_version, table_dir), decisions)
+
+
+def load_reroll_table(track_version: TrackVersion, table_dir: str = DEFAULT_TABLE_DIR) -> np.ndarray:
+    """Memory-map the decision table of a track version, once per process and table directory."""
+    cache_key = (track_version, table_dir)
+    if cache_key not in reroll_tables:
+        path = get_table_path(track_version, table_dir)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No reroll table at {path}, generate it with python -m MidnightRunners.simulation.RerollTables")
+        reroll_tables[cache_key] = np.load(path, mmap_mode="r")
+    return reroll_tables[cache_key]
+
+
+class TableRerollAI(NaiveRacerAI):
+    """Decides rerolls with the precomputed table of the race's track; paths are chosen like the naive AI."""
+    def __init__(self, player_name: Player, racer_name, table_dir: str = DEFAULT_TABLE_DIR):
+        super().__init__(player_name, racer_name)
+        self.table_dir = table_dir
+
+    def decide_reroll(self, bs: BoardState, reroll_count: int, rolled_value: int) -> bool:
+        """Look up whether rerolling gives more expected points, against the leading opponent."""
+        table = load_reroll_table(bs.track.track_version, self.table_dir)
+        if reroll_count >= table.shape[4]:
+            return False
+        opponent_position, opponent_tripped = NO_OPPONENT, False
+        for racer_name, position in bs.racer_name_to_position_map.items():
+            if racer_name == self.racer_name or position < 0 or racer_name in bs.eliminated_racers:
+                continue
+            if opponent_position == NO_OPPONENT or position > opponent_position:
+                opponent_position, opponent_tripped = position, bs.racer_trip_map[racer_name]
+        position = bs.racer_name_to_position_map[self.racer_name]
+        first_taken = bs.first_place_racer is not None
+        return bool(table[int(first_taken), position, opponent_position, int(opponent_tripped), reroll_count, rolled_value - 1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the reroll decision tables for every track version.")
+    parser.add_argument("--output-dir", default=DEFAULT_TABLE_DIR, help="Directory for the .npy tables")
+    parser.add_argument("--max-rerolls", type=int, default=DEFAULT_MAX_REROLLS, help="Rerolls allowed per move")
+    args = parser.parse_args()
+    save_reroll_tables(args.output_dir, args.max_rerolls)
+    print(f"Saved reroll tables for {', '.join(version.name for version in TrackVersion)} to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
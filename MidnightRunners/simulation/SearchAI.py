@@ -0,0 +1,124 @@
+"""
+Search based racer AI that looks ahead over future dice with depth-limited expectimax.
+
+Every option is evaluated from the turn after the current one: each following turn is a chance node
+whose outcomes come from the exact turn outcome distribution, so all racer powers are resolved by the
+engine. Values are cached in a transposition table keyed on board fingerprints, and iterative
+deepening stops at the time budget, so the AI can be used in batch simulations.
+"""
+
+from copy import deepcopy
+from time import perf_counter
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.RacerAI import IRacerAI, NaiveRacerAI
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+from MidnightRunners.simulation.TurnOutcomes import get_board_fingerprint, get_turn_outcomes
+
+DEFAULT_MAX_DEPTH = 3  # Turns to look ahead
+DEFAULT_TIME_BUDGET = 0.1  # Seconds per decision
+POSITION_WEIGHT = 0.1  # Points a space of progress is worth at the search horizon
+MAX_TRANSPOSITION_ENTRIES = 100_000
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget of a decision is used up."""
+
+
+class ExpectimaxRacerAI(IRacerAI):
+    """Chooses the option with the highest expected points plus progress after a few more turns.
+
+    The transposition table maps (board fingerprint, depth) to the expected points gained from there
+    plus the progress value at the horizon. Points already scored are added per option, so states
+    that only differ in points share entries.
+    """
+    def __init__(self, player_name: Player, racer_name: RacerName, track_version: TrackVersion, player_racer_config: dict,
+                 max_depth: int = DEFAULT_MAX_DEPTH, time_budget: float = DEFAULT_TIME_BUDGET):
+        super().__init__(player_name, racer_name)
+        self.track_version = track_version
+        self.player_racer_config = player_racer_config  # Racers used inside the search, with their default AIs
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.transposition_table = {}
+        self.deadline = 0.0
+        self.last_completed_depth = 0
+        self.fallback_ai = NaiveRacerAI(player_name, racer_name)
+
+    def decide_reroll(self, bs: BoardState, reroll_count: int, rolled_value: int) -> bool:
+        """No racer rerolls yet, so this uses the naive threshold."""
+        return self.fallback_ai.decide_reroll(bs, reroll_count, rolled_value)
+
+    def choose_path(self, bs: BoardState, bs_options: list) -> int:
+        """Iteratively deepen the search over all options until the time budget or the maximum depth is reached."""
+        self.deadline = perf_counter() + self.time_budget
+        if len(self.transposition_table) > MAX_TRANSPOSITION_ENTRIES:
+            self.transposition_table = {}
+
+        next_turn_states = [get_next_turn_state(option) for option in bs_options]
+        best_index = self.get_best_index(bs_options, next_turn_states, 0)
+        self.last_completed_depth = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best_index = self.get_best_index(bs_options, next_turn_states, depth)
+            except SearchTimeout:
+                break
+            self.last_completed_depth = depth
+        return best_index
+
+    def get_best_index(self, bs_options: list, next_turn_states: list, depth: int) -> int:
+        scores = [option.player_points_map[self.player_name] + self.get_value(next_turn_state, depth)
+                  for option, next_turn_state in zip(bs_options, next_turn_states)]
+        return scores.index(max(scores))
+
+    def get_value(self, bs: BoardState, depth: int) -> float:
+        """Expected points gained over the next turns plus the progress value at the horizon."""
+        if depth == 0 or bs.race_is_finished:
+            return self.get_progress_value(bs)
+        key = (get_board_fingerprint(bs), depth)
+        if key in self.transposition_table:
+            return self.transposition_table[key]
+        if perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        value = 0.0
+        for outcome in get_turn_outcomes(self.track_version, self.player_racer_config, bs):
+            value += outcome.probability * (outcome.points_gained[self.player_name] + self.get_value(outcome.board_state, depth - 1))
+        self.transposition_table[key] = value
+        return value
+
+    def get_progress_value(self, bs: BoardState) -> float:
+        if self.racer_name in bs.eliminated_racers:
+            return 0.0
+        position = bs.racer_name_to_position_map[self.racer_name]
+        if position < 0:  # Finished, the finishing points are already counted
+            return 0.0
+        return POSITION_WEIGHT * position
+
+
+def get_next_turn_state(bs: BoardState) -> BoardState:
+    """The board state at the start of the next player's turn, treating the current turn as done."""
+    next_bs = deepcopy(bs)
+    next_bs.current_turn_phase = TurnPhase.PH0_BETWEEN_TURNS
+    turn_order = next_bs.turn_order
+    turn_order.append(turn_order.pop(0))
+    for _ in range(len(turn_order)):
+        racer_name = next_bs.player_to_racer_name_map[turn_order[0]]
+        if racer_name not in (next_bs.first_place_racer, next_bs.second_place_racer) and \
+                racer_name not in next_bs.eliminated_racers:
+            break
+        turn_order.append(turn_order.pop(0))
+    return next_bs
+
+
+def make_expectimax_racer(racer_class, track_version: TrackVersion, player_racer_config: dict, player: Player, **search_options):
+    """Create a racer that makes its choices with an ExpectimaxRacerAI.
+
+    Use functools.partial(make_expectimax_racer, racer_class, track_version, player_racer_config) as a
+    lineup entry; the plain player_racer_config is used for the racers inside the search.
+    """
+    racer = racer_class(player)
+    racer.ai = ExpectimaxRacerAI(player, racer.name, track_version, player_racer_config, **search_options)
+    return racer
@@ -0,0 +1,178 @@
+"""
+Tournament runner that simulates every lineup of the implemented racers on both tracks.
+
+Every subset of racers in every seat order is a configuration. Configurations are spread over a
+process pool and their results are stored in an on-disk cache. The cache key covers the
+configuration, the seed range and a hash of the source code of the racers, the track and the
+engine, so after a code change only the affected configurations are recomputed.
+
+Usage: python -m MidnightRunners.simulation.Tournament --races 500 --workers 4
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+import numpy as np
+
+from MidnightRunners.concreteracers.RacerRegistry import get_available_racers, get_player_racer_config, get_racer_module_name
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import run_batch
+
+# Every racer with an implementation, see RacerRegistry
+TOURNAMENT_RACERS = get_available_racers()
+# Package whose every module is part of the engine, and the engine modules outside of it
+ENGINE_PACKAGE_NAME = "MidnightRunners.core"
+ENGINE_MODULE_NAMES = [
+    "MidnightRunners.concreteracers.RacerList", "MidnightRunners.concreteracers.RacerRegistry",
+    "MidnightRunners.simulation.BatchEngine",
+]
+DEFAULT_CACHE_DIR = ".tournament_cache"
+
+# Source hash per source file, so every file is only read once per process
+module_source_hashes = {}
+
+
+class TournamentConfig:
+    """One lineup (racer names in seat order) on one track version."""
+    def __init__(self, track_version: TrackVersion, racer_names: tuple):
+        self.track_version = track_version
+        self.racer_names = racer_names
+
+    def get_player_racer_config(self) -> dict:
+        return get_player_racer_config(self.racer_names)
+
+    def get_description(self) -> str:
+        return f"{self.track_version.name}: " + " / ".join(racer_name.value for racer_name in self.racer_names)
+
+
+def enumerate_configs(racer_names: list = None, min_players: int = 2, max_players: int = 5,
+                      track_versions: list = None) -> list:
+    """All seat orders of all subsets of the given racers, for every track version."""
+    racer_names = racer_names if racer_names is not None else list(TOURNAMENT_RACERS)
+    track_versions = track_versions if track_versions is not None else list(TrackVersion)
+    configs = []
+    for track_version in track_versions:
+        for num_players in range(min_players, min(max_players, len(racer_names)) + 1):
+            for lineup in permutations(racer_names, num_players):
+                configs.append(TournamentConfig(track_version, lineup))
+    return configs
+
+
+def get_engine_source_paths() -> list:
+    """Source files every race depends on, whatever the lineup: all of the core package and a few more."""
+    package_dir = os.path.dirname(importlib.import_module(ENGINE_PACKAGE_NAME).__file__)
+    paths = [os.path.join(package_dir, file_name) for file_name in sorted(os.listdir(package_dir))
+             if file_name.endswith(".py")]
+    return paths + [importlib.import_module(module_name).__file__ for module_name in ENGINE_MODULE_NAMES]
+
+
+def get_file_hash(path: str) -> str:
+    if path not in module_source_hashes:
+        with open(path, "rb") as source_file:
+            module_source_hashes[path] = hashlib.sha256(source_file.read()).hexdigest()
+    return module_source_hashes[path]
+
+
+def get_source_hash(config: TournamentConfig) -> str:
+    """Hash of the source code of the engine and of the racers in the lineup."""
+    source_hash = hashlib.sha256()
+    paths = get_engine_source_paths() + [importlib.import_module(get_racer_module_name(racer_name)).__file__
+                                         for racer_name in config.racer_names]
+    for path in paths:
+        source_hash.update(get_file_hash(path).encode())
+    return source_hash.hexdigest()
+
+
+def get_cache_key(config: TournamentConfig, num_races: int, seed: int) -> str:
+    key_data = {
+        "track_version": config.track_version.name,
+        "lineup": [racer_name.name for racer_name in config.racer_names],
+        "num_races": num_races,
+        "seed": seed,
+        "source_hash": get_source_hash(config),
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+
+def run_config(config: TournamentConfig, num_races: int, seed: int) -> dict:
+    """Simulate one configuration and summarize the results per racer."""
+    batch = run_batch(config.track_version, config.get_player_racer_config(), num_races, seed=seed)
+    return {
+        "track_version": config.track_version.name,
+        "lineup": [racer_name.name for racer_name in config.racer_names],
+        "num_races": num_races,
+        "seed": seed,
+        "win_rates": {name.name: rate for name, rate in batch.win_rates().items()},
+        "second_place_rates": {name.name: float(np.mean(batch.second_place == seat)) for seat, name in enumerate(batch.racer_names)},
+        "mean_points": {name.name: points for name, points in batch.mean_points().items()},
+        "mean_turns": float(batch.num_turns.mean()),
+    }
+
+
+def run_tournament(configs: list, num_races: int, seed: int = 0, num_workers: int = 1,
+                   cache_dir: str = DEFAULT_CACHE_DIR, progress_callback=None) -> list:
+    """Run all configurations, reusing cached results, and return the summaries in config order.
+
+    The progress callback receives (config, summary, from_cache) for every finished configuration.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    summaries = [None] * len(configs)
+    cache_paths = [os.path.join(cache_dir, get_cache_key(config, num_races, seed) + ".json") for config in configs]
+
+    stale_indices = []
+    for index, (config, cache_path) in enumerate(zip(configs, cache_paths)):
+        if os.path.exists(cache_path):
+            with open(cache_path) as cache_file:
+                summaries[index] = json.load(cache_file)
+            if progress_callback is not None:
+                progress_callback(config, summaries[index], True)
+        else:
+            stale_indices.append(index)
+
+    def store(index: int, summary: dict):
+        summaries[index] = summary
+        with open(cache_paths[index], "w") as cache_file:
+            json.dump(summary, cache_file, indent=2)
+        if progress_callback is not None:
+            progress_callback(configs[index], summary, False)
+
+    if num_workers <= 1:
+        for index in stale_indices:
+            store(index, run_config(configs[index], num_races, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            stale_configs = [configs[index] for index in stale_indices]
+            for index, summary in zip(stale_indices, executor.map(run_config, stale_configs,
+                                                                  [num_races] * len(stale_configs),
+                                                                  [seed] * len(stale_configs))):
+                store(index, summary)
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate every lineup of the implemented racers on both tracks.")
+    parser.add_argument("--races", type=int, default=200, help="Number of races per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the dice")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--min-players", type=int, default=2)
+    parser.add_argument("--max-players", type=int, default=5)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    configs = enumerate_configs(min_players=args.min_players, max_players=args.max_players)
+    print(f"=== Tournament: {len(configs)} configurations, {args.races} races each ===")
+
+    def print_progress(config, summary, from_cache):
+        rates = ", ".join(f"{name}: {rate:.3f}" for name, rate in summary["win_rates"].items())
+        print(f"  {'[cached] ' if from_cache else ''}{config.get_description()} -> win rates {rates}")
+
+    run_tournament(configs, args.races, args.seed, args.workers, args.cache_dir, print_progress)
+
+
+if __name__ == "__main__":
+    main()
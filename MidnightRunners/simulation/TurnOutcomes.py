@@ -0,0 +1,137 @@
+"""
+Exact distribution of the outcomes of one turn, without sampling.
+
+The turn is played with the object engine, so every racer power is resolved by the racers
+themselves. The turn phases before the first roll are played once and shared. From there every
+roll sequence is tried: whenever a racer asks for another roll (e.g. after a reroll decision), the
+sequence branches into the six faces. Equal resulting board states are merged, and results are
+memoized on a fingerprint of the starting board state.
+"""
+
+from copy import deepcopy
+
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Dice import DiceExhaustedError, SequenceDice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Turn import TurnPhase
+from MidnightRunners.simulation.BatchEngine import get_lineup
+
+DICE_FACES = [1, 2, 3, 4, 5, 6]
+MAX_ROLLS_PER_TURN = 6  # Guards against powers that keep asking for rolls
+MAX_CACHED_STATES = 50_000  # The cache is cleared when it grows beyond this, e.g. during long searches
+
+# Outcomes per (track version, lineup, board state fingerprint), relative to zero points
+outcome_cache = {}
+
+
+class TurnOutcome:
+    """One distinct result of a turn with its probability and the roll sequences that lead to it."""
+    def __init__(self, board_state: BoardState, probability: float, points_gained: dict, roll_sequences: list):
+        self.board_state = board_state
+        self.probability = probability
+        self.points_gained = points_gained
+        self.roll_sequences = roll_sequences
+
+
+def get_board_fingerprint(bs: BoardState) -> tuple:
+    """Everything about a board state that affects how a turn plays out (points and turn number do not)."""
+    return (
+        tuple(sorted((racer_name.value, position) for racer_name, position in bs.racer_name_to_position_map.items())),
+        tuple(sorted((racer_name.value, tripped) for racer_name, tripped in bs.racer_trip_map.items())),
+        tuple(bs.turn_order),
+        bs.current_turn_phase,
+        bs.first_place_racer,
+        bs.second_place_racer,
+        frozenset(bs.eliminated_racers),
+        bs.race_is_finished,
+    )
+
+
+def get_outcome_fingerprint(bs: BoardState) -> tuple:
+    return get_board_fingerprint(bs) + (tuple(sorted((player.value, points) for player, points in bs.player_points_map.items())),)
+
+
+def get_turn_outcomes(track_version, player_racer_config: dict, bs: BoardState, active_player: Player = None) -> list:
+    """Distinct board states after the active player's turn, with their probabilities.
+
+    The board state must be between turns. The active player defaults to the player whose turn is
+    next. The turn limit of the race is not applied. The returned board states carry the points and
+    turn number of the given board state plus what happened during the turn.
+    """
+    if bs.current_turn_phase != TurnPhase.PH0_BETWEEN_TURNS:
+        raise ValueError("Turn outcomes can only be computed between turns")
+    start_bs = deepcopy(bs)
+    if active_player is not None:
+        while start_bs.turn_order[0] != active_player:
+            start_bs.turn_order.append(start_bs.turn_order.pop(0))
+
+    lineup_key = tuple((player, player_racer_config[player]) for player in sorted(player_racer_config, key=lambda p: p.value))
+    cache_key = (track_version, lineup_key, get_board_fingerprint(start_bs))
+    if cache_key not in outcome_cache:
+        if len(outcome_cache) >= MAX_CACHED_STATES:
+            outcome_cache.clear()
+        outcome_cache[cache_key] = resolve_turn_outcomes(track_version, player_racer_config, start_bs)
+
+    outcomes = []
+    for outcome in outcome_cache[cache_key]:
+        after_bs = deepcopy(outcome.board_state)
+        after_bs.player_points_map = {player: bs.player_points_map[player] + outcome.points_gained[player]
+                                      for player in after_bs.player_points_map}
+        after_bs.current_turn_number += bs.current_turn_number
+        outcomes.append(TurnOutcome(after_bs, outcome.probability, outcome.points_gained, outcome.roll_sequences))
+    return outcomes
+
+
+def resolve_turn_outcomes(track_version, player_racer_config: dict, start_bs: BoardState) -> list:
+    """Play the turn from a board state with zero points and turn number, branching on every roll."""
+    race = Race(track_version, get_lineup(player_racer_config), verbose=False)
+    race.board_state = deepcopy(start_bs)
+    race.board_state.player_points_map = {player: 0 for player in start_bs.player_points_map}
+    race.board_state.current_turn_number = 0
+    race.turn_order = list(start_bs.turn_order)
+
+    # Play the phases that need no dice once, they are shared by every roll sequence
+    race.set_dice(SequenceDice(()))
+    while True:
+        prefix_race = deepcopy(race)
+        try:
+            race.do_turn_phase()
+        except DiceExhaustedError:
+            break
+        if is_turn_over(race):
+            return [TurnOutcome(race.board_state, 1.0, dict(race.board_state.player_points_map), [()])]
+
+    outcomes = {}
+    branch_rolls(prefix_race, (), outcomes)
+    return list(outcomes.values())
+
+
+def branch_rolls(prefix_race: Race, rolls: tuple, outcomes: dict):
+    """Finish the turn from the shared prefix for every next roll, branching again when more rolls are needed."""
+    if len(rolls) >= MAX_ROLLS_PER_TURN:
+        raise ValueError(f"A turn asked for more than {MAX_ROLLS_PER_TURN} rolls")
+    for face in DICE_FACES:
+        sequence = rolls + (face,)
+        race = deepcopy(prefix_race)
+        race.set_dice(SequenceDice(sequence))
+        try:
+            race.do_turn_phase()
+            while not is_turn_over(race):
+                race.do_turn_phase()
+        except DiceExhaustedError:
+            branch_rolls(prefix_race, sequence, outcomes)
+            continue
+
+        probability = (1 / len(DICE_FACES)) ** len(sequence)
+        fingerprint = get_outcome_fingerprint(race.board_state)
+        if fingerprint in outcomes:
+            outcomes[fingerprint].probability += probability
+            outcomes[fingerprint].roll_sequences.append(sequence)
+        else:
+            outcomes[fingerprint] = TurnOutcome(race.board_state, probability,
+                                                dict(race.board_state.player_points_map), [sequence])
+
+
+def is_turn_over(race: Race) -> bool:
+    return race.board_state.current_turn_phase == TurnPhase.PH0_BETWEEN_TURNS or race.board_state.race_is_finished
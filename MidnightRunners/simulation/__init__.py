@@ -0,0 +1,3 @@
+"""
+Midnight Runners simulation tools: batch engines and race statistics.
+"""
@@ -1,10 +1,29 @@
 """
 GUI package for Midnight Runners
 Contains all PyQt6 GUI components
+
+The components are imported on first access, so launching the main window does not load the
+dialogs and the racers it only needs later.
 """
 
-from .main_window import MidnightRunnersMainWindow
-from .replay_dialog import RaceReplayDialog
-from .input_dialogs import DiceRollInputDialog
+from importlib import import_module
+
+_COMPONENT_MODULES = {
+    'MidnightRunnersMainWindow': '.main_window',
+    'RaceReplayDialog': '.replay_dialog',
+    'DiceRollInputDialog': '.input_dialogs',
+}
 
 __all__ = ['MidnightRunnersMainWindow', 'RaceReplayDialog', 'DiceRollInputDialog']
+
+
+def __getattr__(name):
+    if name not in _COMPONENT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    component = getattr(import_module(_COMPONENT_MODULES[name], __name__), name)
+    globals()[name] = component
+    return component
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
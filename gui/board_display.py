@@ -3,46 +3,111 @@ Custom widget for displaying the race track and racers in 2D
 """
 
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor, QPen, QFont
+from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QPixmap, QRegion
+from PyQt6.QtCore import QRect
 
 from MidnightRunners.concreteracers.RacerList import RacerNameToColorMap
-from MidnightRunners.core.Track import SpecialSpaceProperties
+from MidnightRunners.core.Track import SpecialSpaceProperties, FIXED_TRACK_LENGTH
 
 
 class BoardDisplayWidget(QWidget):
-    """Custom widget for drawing the race track and racers in 2D."""
+    """Custom widget for drawing the race track and racers in 2D.
+
+    The track, its special spaces and the legend only change with the widget size, the track version
+    and the lineup, so they are rendered once into a cached pixmap. Every paint draws that pixmap and
+    the racers on top, and a new board state only repaints the columns of racers that moved.
+    """
+
+    MARGIN = 40
+    LINE_HEIGHT = 170
+    OVERSHOOT = 30
+    RACER_SIZE = 20
+    RACER_OFFSET = -50  # Vertical offset of the first racer on a space, relative to the track line
+    RACER_SPACING = 30  # Vertical distance between racers on the same space
+    MAX_PARTIAL_REPAINT_COLUMNS = 4  # Repaint everything when more spaces change at once
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.board_state = None
         self.track = None
+        self.track_pixmap = None
+        self.track_pixmap_key = None
         self.setMinimumHeight(300)
         self.setMaximumHeight(400)
 
     def set_board_state(self, board_state, track):
-        """Update the board state to display."""
+        """Update the board state to display, repainting only the spaces whose racers changed."""
+        old_board_state = self.board_state
         self.board_state = board_state
         self.track = track
-        self.update()  # Trigger a repaint
+        changed_positions = self._get_changed_positions(old_board_state, board_state)
+        if changed_positions is None or len(changed_positions) > self.MAX_PARTIAL_REPAINT_COLUMNS:
+            self.update()  # Trigger a repaint
+            return
+        region = QRegion()
+        for position in changed_positions:
+            region = region.united(self._get_racer_column_rect(position))
+        if not region.isEmpty():
+            self.update(region)
+
+    def _get_changed_positions(self, old_board_state, new_board_state):
+        """Spaces whose racer stack looks different, or None if the static layer may have changed too."""
+        if old_board_state is None or old_board_state.player_to_racer_name_map != new_board_state.player_to_racer_name_map:
+            return None
+        changed_positions = set()
+        for racer_name, new_position in new_board_state.racer_name_to_position_map.items():
+            old_position = old_board_state.racer_name_to_position_map.get(racer_name)
+            if old_position != new_position or \
+                    old_board_state.racer_trip_map.get(racer_name) != new_board_state.racer_trip_map.get(racer_name):
+                changed_positions.update([old_position, new_position])
+        return changed_positions
+
+    def _get_space_width(self):
+        return (self.width() - 2 * self.MARGIN) / (FIXED_TRACK_LENGTH - 1)
+
+    def _get_racer_column_rect(self, position):
+        """Area above a space where its racers are drawn."""
+        space_width = self._get_space_width()
+        x = self.MARGIN + position * space_width
+        half_width = max(space_width, self.RACER_SIZE) / 2 + 2
+        bottom = self.height() // 2 + self.RACER_OFFSET + self.RACER_SIZE // 2 + 2
+        return QRect(int(x - half_width), 0, int(2 * half_width) + 1, bottom + 1)
 
     def paintEvent(self, event):
-        """Draw the board and racers."""
+        """Draw the cached track layer and the racers on top."""
         if not self.board_state or not self.track:
             return
 
         painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._get_track_pixmap())
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        # Calculate dimensions
+        self._draw_racers(painter)
+
+    def _get_track_pixmap(self):
+        """Static layer for the current size, track version and lineup, rendered when any of them changed."""
+        key = (self.width(), self.height(), self.devicePixelRatio(), self.track.track_version,
+               tuple(self.board_state.player_to_racer_name_map.items()))
+        if key != self.track_pixmap_key:
+            pixel_ratio = self.devicePixelRatio()
+            pixmap = QPixmap(int(self.width() * pixel_ratio), int(self.height() * pixel_ratio))
+            pixmap.setDevicePixelRatio(pixel_ratio)
+            pixmap.fill(self.palette().color(self.backgroundRole()))
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self._draw_track(painter)
+            self._draw_legend(painter)
+            painter.end()
+            self.track_pixmap = pixmap
+            self.track_pixmap_key = key
+        return self.track_pixmap
+
+    def _draw_track(self, painter):
+        """Draw the track line, the spaces and their special properties."""
         width = self.width()
-        height = self.height()
-        margin = 40
-        track_length = 31  # Positions 0-30
-
-        # Draw track
-        track_y = height // 2
-        track_width = width - 2 * margin
-        space_width = track_width / (track_length - 1)
+        margin = self.MARGIN
+        track_length = FIXED_TRACK_LENGTH  # Positions 0-30
+        track_y = self.height() // 2
+        space_width = self._get_space_width()
 
         # Draw track line
         painter.setPen(QPen(QColor(50, 50, 50), 3))
@@ -52,9 +117,6 @@ class BoardDisplayWidget(QWidget):
         font = QFont("Arial", 8)
         painter.setFont(font)
 
-        line_height = 170
-        overshoot = 30
-
         for i in range(track_length):
             x = margin + i * space_width
 
@@ -65,13 +127,11 @@ class BoardDisplayWidget(QWidget):
             # Draw vertical line for space
             if (i < track_length - 1):
                 x_line = x + (space_width/2)
-                painter.drawLine(int(x_line), int(track_y + overshoot), int(x_line), int(track_y - line_height))
+                painter.drawLine(int(x_line), int(track_y + self.OVERSHOOT), int(x_line), int(track_y - self.LINE_HEIGHT))
 
             # Draw space number
             height = painter.fontMetrics().boundingRect(str(i)).height()
             painter.drawText(int(x - (height / 2)), int(track_y + 20), str(i))
-            # painter.sePen(QPen(QColor(50, 50, 50), 3))
-            # painter.drtawLine(margin, track_y, width - margin, track_y)
 
             # Draw special properties
             base_vertical_offset = 30
@@ -112,7 +172,36 @@ class BoardDisplayWidget(QWidget):
                     painter.restore()  # Restore the previous state
                     y_offset += width
 
-        # Draw racers
+    def _draw_legend(self, painter):
+        """Draw the color and name of every player's racer below the track."""
+        legend_y = self.height() // 2 + self.LINE_HEIGHT
+        legend_x = self.MARGIN
+        legend_font = QFont("Arial", 9)
+        painter.setFont(legend_font)
+
+        for player, racer_name in self.board_state.player_to_racer_name_map.items():
+            color = QColor(*RacerNameToColorMap[racer_name])
+
+            # Draw color circle
+            circle_size = 15
+            painter.setBrush(color)
+            painter.setPen(QPen(QColor(0, 0, 0), 2))
+            painter.drawEllipse(int(legend_x), int(legend_y - circle_size/2), circle_size, circle_size)
+
+            # Draw racer name
+            painter.setPen(QColor(0, 0, 0))
+            text = f"{player.value}: {racer_name.value}"
+            painter.drawText(int(legend_x + circle_size + 8), int(legend_y + 5), text)
+
+            # Move to next legend entry
+            text_width = painter.fontMetrics().boundingRect(text).width()
+            legend_x += circle_size + text_width + 30
+
+    def _draw_racers(self, painter):
+        """Draw the racers stacked above their spaces."""
+        track_y = self.height() // 2
+        space_width = self._get_space_width()
+
         racer_positions = {}
         for racer_name, position in self.board_state.racer_name_to_position_map.items():
             if position not in racer_positions:
@@ -123,12 +212,12 @@ class BoardDisplayWidget(QWidget):
         painter.setFont(font_bold)
 
         for position, racers in racer_positions.items():
-            x = margin + position * space_width
-            y_offset = -50
+            x = self.MARGIN + position * space_width
+            y_offset = self.RACER_OFFSET
 
             for racer_name in racers:
                 # Draw racer circle
-                racer_size = 20
+                racer_size = self.RACER_SIZE
                 painter.setBrush(QColor(*RacerNameToColorMap[racer_name]))
                 painter.setPen(QPen(QColor(0, 0, 0), 2))
                 painter.drawEllipse(int(x - racer_size/2), int(track_y + y_offset - racer_size/2),
@@ -147,28 +236,4 @@ class BoardDisplayWidget(QWidget):
                     painter.setPen(QPen(QColor(255, 255, 255), 20))
                     painter.drawText(int(x - (indicator_width/2)), int(track_y + y_offset + 6), indicator)
 
-                y_offset -= 30
-
-        # Draw legend
-        legend_y = track_y + line_height
-        legend_x = margin
-        legend_font = QFont("Arial", 9)
-        painter.setFont(legend_font)
-
-        for player, racer_name in self.board_state.player_to_racer_name_map.items():
-            color = QColor(*RacerNameToColorMap[racer_name])
-
-            # Draw color circle
-            circle_size = 15
-            painter.setBrush(color)
-            painter.setPen(QPen(QColor(0, 0, 0), 2))
-            painter.drawEllipse(int(legend_x), int(legend_y - circle_size/2), circle_size, circle_size)
-
-            # Draw racer name
-            painter.setPen(QColor(0, 0, 0))
-            text = f"{player.value}: {racer_name.value}"
-            painter.drawText(int(legend_x + circle_size + 8), int(legend_y + 5), text)
-
-            # Move to next legend entry
-            text_width = painter.fontMetrics().boundingRect(text).width()
-            legend_x += circle_size + text_width + 30
+                y_offset -= self.RACER_SPACING
@@ -0,0 +1,120 @@
+"""
+List model for the change log panes of the live and replay dialogs
+"""
+
+from collections import deque
+from PyQt6.QtCore import QStringListModel, QModelIndex, Qt
+
+
+class ChangeLogModel(QStringListModel):
+    """Log lines of a range of changes between header and footer lines.
+
+    Moving the range only inserts the lines of changes that entered it and removes those of changes
+    that left it, so stepping through a race costs the same at every step. Shown in a QListView with
+    uniform item sizes, only the visible rows are rendered. The lines are kept by QStringListModel, so
+    the view's layout passes over all rows never call back into Python.
+    """
+
+    def __init__(self, format_change, newest_first=False, parent=None):
+        super().__init__(parent)
+        self.format_change = format_change  # Change -> list of log lines (may be empty)
+        self.newest_first = newest_first
+        self.changes = []
+        self.header_lines = []
+        self.footer_lines = []
+        self.num_body_lines = 0
+        self.block_sizes = deque()  # Number of lines per change in the range, in display order
+        self.range_start = 0
+        self.range_stop = 0
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable if index.isValid() else Qt.ItemFlag.NoItemFlags
+
+    def set_changes(self, changes):
+        """Show another change list, starting with an empty range."""
+        self.changes = changes
+        self.num_body_lines = 0
+        self.block_sizes = deque()
+        self.range_start = 0
+        self.range_stop = 0
+        self.setStringList(self.header_lines + self.footer_lines)
+
+    def set_header(self, lines):
+        self.header_lines = self._replace_lines(self.header_lines, lines, 0)
+
+    def set_footer(self, lines):
+        self.footer_lines = self._replace_lines(self.footer_lines, lines, len(self.header_lines) + self.num_body_lines)
+
+    def _replace_lines(self, old_lines, new_lines, first_row):
+        """Swap a group of lines, only writing the rows whose text changed."""
+        new_lines = list(new_lines)
+        if len(new_lines) < len(old_lines):
+            self.removeRows(first_row + len(new_lines), len(old_lines) - len(new_lines))
+        elif len(new_lines) > len(old_lines):
+            self.insertRows(first_row + len(old_lines), len(new_lines) - len(old_lines))
+        for row, line in enumerate(new_lines):
+            if row >= len(old_lines) or old_lines[row] != line:
+                self.setData(self.index(first_row + row), line)
+        return new_lines
+
+    def set_range(self, start, stop):
+        """Show the lines of changes start to stop (exclusive)."""
+        start, stop = max(0, start), min(stop, len(self.changes))
+        stop = max(start, stop)
+        if stop <= self.range_start or start >= self.range_stop:
+            self.refresh(start, stop)
+            return
+        while self.range_start < start:
+            self._remove_block(oldest=True)
+            self.range_start += 1
+        while self.range_stop > stop:
+            self._remove_block(oldest=False)
+            self.range_stop -= 1
+        while self.range_start > start:
+            self.range_start -= 1
+            self._add_block(self.range_start, oldest=True)
+        while self.range_stop < stop:
+            self._add_block(self.range_stop, oldest=False)
+            self.range_stop += 1
+
+    def refresh(self, start=None, stop=None):
+        """Rebuild the lines of the range, e.g. after the formatting options changed."""
+        start = self.range_start if start is None else start
+        stop = self.range_stop if stop is None else stop
+        body_lines = deque()
+        self.block_sizes = deque()
+        for change_index in range(start, stop):
+            lines = self.format_change(self.changes[change_index])
+            if self.newest_first:
+                body_lines.extendleft(reversed(lines))
+                self.block_sizes.appendleft(len(lines))
+            else:
+                body_lines.extend(lines)
+                self.block_sizes.append(len(lines))
+        self.range_start, self.range_stop = start, stop
+        self.num_body_lines = len(body_lines)
+        self.setStringList(self.header_lines + list(body_lines) + self.footer_lines)
+
+    def _add_block(self, change_index, oldest):
+        lines = self.format_change(self.changes[change_index])
+        at_top = oldest != self.newest_first
+        first_row = len(self.header_lines) + (0 if at_top else self.num_body_lines)
+        if at_top:
+            self.block_sizes.appendleft(len(lines))
+        else:
+            self.block_sizes.append(len(lines))
+        if not lines:
+            return
+        self.insertRows(first_row, len(lines))
+        for row, line in enumerate(lines, first_row):
+            self.setData(self.index(row), line)
+        self.num_body_lines += len(lines)
+
+    def _remove_block(self, oldest):
+        at_top = oldest != self.newest_first
+        num_lines = self.block_sizes.popleft() if at_top else self.block_sizes.pop()
+        if not num_lines:
+            return
+        first_row = len(self.header_lines) + (0 if at_top else self.num_body_lines - num_lines)
+        self.removeRows(first_row, num_lines)
+        self.num_body_lines -= num_lines
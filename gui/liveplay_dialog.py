@@ -3,9 +3,11 @@ Race live dialog for stepping through ongoing races
 """
 
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                              QPushButton, QComboBox, QTextEdit)
+                              QPushButton, QComboBox, QListView)
 from PyQt6.QtCore import QTimer
 
+from gui.change_log_model import ChangeLogModel
+
 
 class RaceLiveDialog(QDialog):
     """Dialog window for showing live races step by step."""
@@ -37,11 +39,13 @@ class RaceLiveDialog(QDialog):
         self.progress_label.setStyleSheet("font-size: 12px; padding: 5px;")
         layout.addWidget(self.progress_label)
 
-        # Text display area
-        self.replay_text = QTextEdit()
-        self.replay_text.setReadOnly(True)
-        self.replay_text.setStyleSheet("font-family: 'Courier New', monospace; font-size: 11px;")
-        layout.addWidget(self.replay_text)
+        # Log display area, only the lines of new changes are added each step
+        self.log_model = ChangeLogModel(format_change_messages)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setStyleSheet("font-family: 'Courier New', monospace; font-size: 11px;")
+        layout.addWidget(self.log_view)
 
         # Control buttons
         controls_layout = QHBoxLayout()
@@ -99,6 +103,7 @@ class RaceLiveDialog(QDialog):
         num_players = self.current_race.num_players
         self.info_label.setText(f"{num_players} Players | Track: {track}")
 
+        self.log_model.set_changes(self.changeset if self.changeset else [])
         self._display_step()
 
     def _on_race_changed(self, index):
@@ -107,30 +112,23 @@ class RaceLiveDialog(QDialog):
 
     def _display_step(self):
         """Display the current step of the replay."""
-        # Build display text
+        # Show initial lineup
         text_lines = []
         text_lines.append("="*60)
         text_lines.append("STARTING POSITIONS:")
         text_lines.append("="*60)
-
-        # Show initial lineup
         bs = self.current_race.board_state
         for player in bs.turn_order:
             racer_name = bs.player_to_racer_name_map[player]
             position = bs.racer_name_to_position_map[racer_name]
             text_lines.append(f"  {player.value}: {racer_name.value} at position {position}")
         text_lines.append("")
+        self.log_model.set_header(text_lines)
 
         # Show changes up to current step
-        if self.current_step > 0 and self.changeset:
-            num_changes = min(self.current_step, len(self.changeset))
-            for i in range(num_changes):
-                change = self.changeset[i]
-                if change.change_messages:
-                    text_lines.append("-" * 60)
-                    for msg in change.change_messages:
-                        text_lines.append(f"  {msg}")
+        self.log_model.set_range(0, self.current_step)
 
+        text_lines = []
         if self.current_step >= len(self.changeset) if self.changeset else 0:
             text_lines.append("")
             text_lines.append("="*60)
@@ -138,8 +136,8 @@ class RaceLiveDialog(QDialog):
             text_lines.append("="*60)
             text_lines.append(f"Winner: {bs.first_place_racer.value}")
             text_lines.append(f"Second Place: {bs.second_place_racer.value}")
-
-        self.replay_text.setText("\n".join(text_lines))
+        self.log_model.set_footer(text_lines)
+        self.log_view.scrollTo(self.log_model.index(self.log_model.rowCount() - 1))
 
         # Update progress
         total_steps = len(self.changeset) if self.changeset else 0
@@ -194,3 +192,10 @@ class RaceLiveDialog(QDialog):
             self._next_step()
         else:
             self._toggle_play()
+
+
+def format_change_messages(change):
+    """Log lines of a change: a separator and its messages, or nothing if it has no messages."""
+    if not change.change_messages:
+        return []
+    return ["-" * 60] + [f"  {msg}" for msg in change.change_messages]
@@ -2,23 +2,17 @@
 Main window for Midnight Runners race setup
 """
 
-from copy import deepcopy
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                               QLabel, QPushButton, QComboBox, QGroupBox,
-                              QMessageBox, QSpinBox)
-from PyQt6.QtCore import Qt
-
-from MidnightRunners.concreteracers.CR_Banana import Banana
-from MidnightRunners.concreteracers.CR_Gunk import Gunk
-from MidnightRunners.concreteracers.CR_Mouth import Mouth
-from MidnightRunners.concreteracers.CR_Romantic import Romantic
-from MidnightRunners.concreteracers.CR_Suckerfish import Suckerfish
+                              QMessageBox, QSpinBox, QProgressBar)
+from PyQt6.QtCore import Qt, QThread
+
 from MidnightRunners.concreteracers.RacerList import RacerName
-from MidnightRunners.core.Race import Race
+from MidnightRunners.concreteracers.RacerRegistry import get_available_racers, get_racer_factory
 from MidnightRunners.core.Track import TrackVersion
 from MidnightRunners.core.Player import Player
 
-from .replay_dialog import RaceReplayDialog
+from .race_store import CompletedRaceStore
 
 
 class MidnightRunnersMainWindow(QMainWindow):
@@ -39,22 +33,21 @@ class MidnightRunnersMainWindow(QMainWindow):
         self.setWindowTitle("Midnight Runners - Setup")
         self.setMinimumSize(600, 400)
 
-        # Map racer names to their classes
-        self.racer_classes = {
-            RacerName.BANANA.value: Banana,
-            RacerName.ROMANTIC.value: Romantic,
-            RacerName.GUNK.value: Gunk,
-            RacerName.MOUTH.value: Mouth,
-            RacerName.SUCKERFISH.value: Suckerfish,
-        }
+        # Racers with an implementation, by display name; their modules are imported when a race starts
+        self.racer_names = {racer_name.value: racer_name for racer_name in get_available_racers()}
 
         # Player selection dropdowns
         self.player_combos = {}
 
-        # Store race results for replay
-        self.completed_races = []
+        # Store race results for replay, compressed until a race is replayed
+        self.completed_races = CompletedRaceStore()
         self.last_race_config = None
 
+        # Background race batch, if one is running
+        self.batch_thread = None
+        self.batch_worker = None
+        self.replay_dialog = None
+
         self._setup_ui()
 
     def _setup_ui(self):
@@ -141,9 +134,25 @@ class MidnightRunnersMainWindow(QMainWindow):
         self.watch_replay_button.setEnabled(False)
         button_layout.addWidget(self.watch_replay_button)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setStyleSheet("font-size: 14px; padding: 10px 30px;")
+        self.cancel_button.clicked.connect(self._cancel_batch)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+
         button_layout.addStretch()
         main_layout.addLayout(button_layout)
 
+        # Batch progress
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        progress_layout.addWidget(self.progress_bar)
+        self.rate_label = QLabel("")
+        self.rate_label.setMinimumWidth(120)
+        progress_layout.addWidget(self.rate_label)
+        main_layout.addLayout(progress_layout)
+
         main_layout.addStretch()
 
     def _update_player_fields(self):
@@ -178,17 +187,17 @@ class MidnightRunnersMainWindow(QMainWindow):
 
             # Racer selection combo box
             racer_combo = QComboBox()
-            racer_combo.addItems(sorted(self.racer_classes.keys()))
+            racer_combo.addItems(sorted(self.racer_names.keys()))
 
             # Set default racer based on DEFAULT_RACERS list
             if i < len(self.DEFAULT_RACERS):
                 default_racer = self.DEFAULT_RACERS[i]
-                if default_racer in self.racer_classes:
+                if default_racer in self.racer_names:
                     racer_combo.setCurrentText(default_racer)
                 else:
-                    racer_combo.setCurrentIndex(i % len(self.racer_classes))
+                    racer_combo.setCurrentIndex(i % len(self.racer_names))
             else:
-                racer_combo.setCurrentIndex(i % len(self.racer_classes))
+                racer_combo.setCurrentIndex(i % len(self.racer_names))
 
             row_layout.addWidget(racer_combo)
 
@@ -214,8 +223,7 @@ class MidnightRunnersMainWindow(QMainWindow):
                 return
 
             used_racers.add(racer_name)
-            racer_class = self.racer_classes[racer_name]
-            player_racer_config[player] = racer_class
+            player_racer_config[player] = get_racer_factory(self.racer_names[racer_name])
 
         # Get track version
         track_version_str = self.track_combo.currentText()
@@ -224,77 +232,85 @@ class MidnightRunnersMainWindow(QMainWindow):
         # Get number of races to run
         num_races = self.race_count_spinbox.value()
 
-        # Clear previous race data
-        self.completed_races = []
+        # Clear previous race data; an open replay would keep showing the previous batch
+        if self.replay_dialog is not None:
+            self.replay_dialog.close()
+            self.replay_dialog = None
+        self.completed_races = CompletedRaceStore()
         self.overall_config = {
             'track_version': track_version,
             'player_racer_config': player_racer_config,
             'num_races': num_races
         }
 
-        # Run multiple races
-        # try:
-        print("\n" + "="*70)
-        print(f"=== Starting {num_races} Race(s) with Same Configuration ===")
-        print("="*70)
-
-        for race_num in range(1, num_races + 1):
-            # Create fresh racer instances for each race
-            player_to_racer_map = {player: racer_class(player) for player, racer_class in player_racer_config.items()}
-
-            race = Race(track_version=track_version, player_to_racer_map=player_to_racer_map)
-            initial_board_state = deepcopy(race.board_state)
-
-            # Display game info in console
-            print("\n" + "="*50)
-            if num_races > 1:
-                print(f"=== Race {race_num} of {num_races} ===")
-            else:
-                print("=== Midnight Runners ===")
-            print(f"Players: {race.num_players} | Track: {race.track.track_version.value}")
-            print()
-
-            # Display players
-            print("Starting Lineup:")
-            for player, racer_name in race.board_state.player_to_racer_name_map.items():
-                position = race.board_state.racer_name_to_position_map[racer_name]
-                print(f"  {player.value}: {racer_name} at position {position}")
-            print("="*50 + "\n")
-
-            # Run the race
-            full_race_changeset = race.do_race()
-
-            # Store race data for replay
-            self.completed_races.append({
-                'race_number': race_num,
-                'race': race,
-                'initial_board_state': initial_board_state,
-                'changeset': full_race_changeset
-            })
-
-            print(f"\n>>> Race {race_num} Complete <<<\n")
-
-        print("="*70)
-        print(f"=== All {num_races} Race(s) Complete ===")
-        print("="*70 + "\n")
-
-        # Enable replay button
+        # Run the races in the background, results are streamed in as they finish
+        self.progress_bar.setMaximum(num_races)
+        self.progress_bar.setValue(0)
+        self.rate_label.setText("")
+        self.start_race_button.setEnabled(False)
+        self.watch_replay_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        from .race_batch_worker import RaceBatchWorker
+
+        self.batch_thread = QThread(self)
+        self.batch_worker = RaceBatchWorker(track_version, player_racer_config, num_races)
+        self.batch_worker.moveToThread(self.batch_thread)
+        self.batch_thread.started.connect(self.batch_worker.run)
+        self.batch_worker.race_finished.connect(self._on_race_finished)
+        self.batch_worker.progress.connect(self._on_batch_progress)
+        self.batch_worker.finished.connect(self._on_batch_finished)
+        self.batch_worker.finished.connect(self.batch_thread.quit)
+        self.batch_thread.finished.connect(self.batch_worker.deleteLater)
+        self.batch_thread.finished.connect(self.batch_thread.deleteLater)
+        self.batch_thread.start()
+
+    def _on_race_finished(self, race_data):
+        """Store a finished race for replay, so replay can start before the batch completes."""
+        self.completed_races.append(race_data)
         self.watch_replay_button.setEnabled(True)
-
-        QMessageBox.information(
-            self,
-            "All Races Complete",
-            f"{num_races} race(s) finished! Check the console for details."
-        )
-
-        ###### NOTE: Exception handling disabled for easier debugging ######
-        # except Exception as e:
-        #     print(f"Error during race: {str(e)}")
-        #     QMessageBox.critical(
-        #         self,
-        #         "Error",
-        #         f"An error occurred while running the race:\n{str(e)}"
-        #     )
+        if self.replay_dialog is not None:
+            self.replay_dialog.refresh_race_list()
+
+    def _on_batch_progress(self, num_completed, num_races, races_per_second):
+        """Show how far the batch is and how fast races finish."""
+        self.progress_bar.setValue(num_completed)
+        self.rate_label.setText(f"{races_per_second:.1f} races/s")
+
+    def _on_batch_finished(self, cancelled):
+        """Re-enable the setup once the batch is done or cancelled."""
+        self.batch_thread = None
+        self.batch_worker = None
+        self.start_race_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+        num_completed = len(self.completed_races)
+        if cancelled:
+            QMessageBox.information(
+                self,
+                "Races Cancelled",
+                f"Batch cancelled after {num_completed} of {self.overall_config['num_races']} race(s)."
+            )
+        else:
+            QMessageBox.information(
+                self,
+                "All Races Complete",
+                f"{num_completed} race(s) finished! Check the console for details."
+            )
+
+    def _cancel_batch(self):
+        """Stop the running batch after its current race."""
+        if self.batch_worker is not None:
+            self.batch_worker.cancel()
+            self.cancel_button.setEnabled(False)
+
+    def closeEvent(self, event):
+        """Stop a running batch before the window closes."""
+        if self.batch_thread is not None:
+            self.batch_worker.cancel()
+            self.batch_thread.quit()
+            self.batch_thread.wait()
+        super().closeEvent(event)
 
     def _watch_replay(self):
         """Open the replay dialog to watch completed races."""
@@ -302,5 +318,12 @@ class MidnightRunnersMainWindow(QMainWindow):
             QMessageBox.warning(self, "No Races", "No completed races to replay!")
             return
 
-        replay_dialog = RaceReplayDialog(self.completed_races, self.overall_config, self)
-        replay_dialog.exec()
+        from .replay_dialog import RaceReplayDialog
+
+        # Not modal, so the batch can be followed and cancelled while watching
+        self.replay_dialog = RaceReplayDialog(self.completed_races, self.overall_config, self)
+        self.replay_dialog.finished.connect(self._on_replay_closed)
+        self.replay_dialog.show()
+
+    def _on_replay_closed(self):
+        self.replay_dialog = None
@@ -0,0 +1,89 @@
+"""
+Background worker that runs a batch of races off the GUI thread
+"""
+
+from copy import deepcopy
+from time import perf_counter
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from MidnightRunners.core.Race import Race
+
+
+class RaceBatchWorker(QObject):
+    """Runs races one after another and streams each finished race to the GUI thread.
+
+    Move the worker to a QThread and connect the thread's started signal to run(). Signals are
+    delivered to the GUI thread through queued connections, so the window stays responsive.
+    """
+
+    race_finished = pyqtSignal(dict)  # Race data in the format of CompletedRaceStore
+    progress = pyqtSignal(int, int, float)  # Races completed, races in the batch, races per second
+    finished = pyqtSignal(bool)  # True if the batch was cancelled
+
+    def __init__(self, track_version, player_racer_config, num_races, verbose=True):
+        super().__init__()
+        self.track_version = track_version
+        self.player_racer_config = player_racer_config
+        self.num_races = num_races
+        self.verbose = verbose
+        self.cancel_requested = False
+
+    def cancel(self):
+        """Stop after the race that is running now; safe to call from the GUI thread."""
+        self.cancel_requested = True
+
+    def run(self):
+        """Run the races of the batch until all are done or the batch is cancelled."""
+        start_time = perf_counter()
+        print("\n" + "="*70)
+        print(f"=== Starting {self.num_races} Race(s) with Same Configuration ===")
+        print("="*70)
+
+        for race_num in range(1, self.num_races + 1):
+            if self.cancel_requested:
+                break
+            self.race_finished.emit(self._run_race(race_num))
+            elapsed = perf_counter() - start_time
+            self.progress.emit(race_num, self.num_races, race_num / elapsed if elapsed > 0 else 0.0)
+
+        print("="*70)
+        if self.cancel_requested:
+            print("=== Race batch cancelled ===")
+        else:
+            print(f"=== All {self.num_races} Race(s) Complete ===")
+        print("="*70 + "\n")
+        self.finished.emit(self.cancel_requested)
+
+    def _run_race(self, race_num):
+        """Run one race with fresh racer instances and return its replay data."""
+        player_to_racer_map = {player: racer_class(player) for player, racer_class in self.player_racer_config.items()}
+
+        race = Race(track_version=self.track_version, player_to_racer_map=player_to_racer_map, verbose=self.verbose)
+        initial_board_state = deepcopy(race.board_state)
+
+        # Display game info in console
+        print("\n" + "="*50)
+        if self.num_races > 1:
+            print(f"=== Race {race_num} of {self.num_races} ===")
+        else:
+            print("=== Midnight Runners ===")
+        print(f"Players: {race.num_players} | Track: {race.track.track_version.value}")
+        print()
+
+        # Display players
+        print("Starting Lineup:")
+        for player, racer_name in race.board_state.player_to_racer_name_map.items():
+            position = race.board_state.racer_name_to_position_map[racer_name]
+            print(f"  {player.value}: {racer_name} at position {position}")
+        print("="*50 + "\n")
+
+        # Run the race
+        full_race_changeset = race.do_race()
+        print(f"\n>>> Race {race_num} Complete <<<\n")
+
+        return {
+            'race_number': race_num,
+            'race': race,
+            'initial_board_state': initial_board_state,
+            'changeset': full_race_changeset
+        }
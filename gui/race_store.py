@@ -0,0 +1,52 @@
+"""
+Memory-bounded store of the races completed in a batch, for replay
+"""
+
+import pickle
+import zlib
+from collections import OrderedDict
+
+DEFAULT_MAX_DECODED_RACES = 8  # Races kept decoded, most recently used first to stay
+COMPRESSION_LEVEL = 6
+
+
+class CompletedRaceStore:
+    """Completed races as dicts of race_number, race, initial_board_state and changeset, kept compressed.
+
+    Every race is pickled and compressed as soon as it is added, which keeps a race in a few KB instead
+    of the few hundred KB of its Race object, initial board state and changeset. Races are decoded
+    when they are first read, and the most recently read ones are kept decoded so stepping through a
+    race does not decode it again.
+    """
+
+    def __init__(self, max_decoded_races=DEFAULT_MAX_DECODED_RACES):
+        self.max_decoded_races = max_decoded_races
+        self.encoded_races = []
+        self.decoded_races = OrderedDict()  # Race index -> race data, least recently used first
+
+    def append(self, race_data):
+        self.encoded_races.append(zlib.compress(pickle.dumps(race_data, protocol=pickle.HIGHEST_PROTOCOL),
+                                                COMPRESSION_LEVEL))
+
+    def __len__(self):
+        return len(self.encoded_races)
+
+    def __getitem__(self, race_index):
+        """Race data of a race, decoded on first use."""
+        race_index = range(len(self.encoded_races))[race_index]  # Negative indices and bounds like a list
+        if race_index in self.decoded_races:
+            self.decoded_races.move_to_end(race_index)
+            return self.decoded_races[race_index]
+        race_data = pickle.loads(zlib.decompress(self.encoded_races[race_index]))
+        self.decoded_races[race_index] = race_data
+        if len(self.decoded_races) > self.max_decoded_races:
+            self.decoded_races.popitem(last=False)
+        return race_data
+
+    def __iter__(self):
+        for race_index in range(len(self.encoded_races)):
+            yield self[race_index]
+
+    def get_encoded_size(self):
+        """Total size of the compressed races in bytes."""
+        return sum(len(encoded_race) for encoded_race in self.encoded_races)
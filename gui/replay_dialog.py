@@ -4,11 +4,15 @@ Race replay dialog for viewing completed races
 
 from copy import deepcopy
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                              QPushButton, QComboBox, QTextEdit, QCheckBox, QSplitter)
+                              QPushButton, QComboBox, QListView, QCheckBox, QSplitter)
 from PyQt6.QtCore import QTimer, Qt
 
 from MidnightRunners.core.BoardView import PrintBoardState, PrintChangeList
 from gui.board_display import BoardDisplayWidget
+from gui.change_log_model import ChangeLogModel
+
+RECENT_CHANGES_SHOWN = 20  # Changes before the current step shown in the log, newest first
+BOARD_STATE_CHECKPOINT_INTERVAL = 50  # Steps between stored board states, for stepping back
 
 
 class RaceReplayDialog(QDialog):
@@ -34,13 +38,13 @@ class RaceReplayDialog(QDialog):
         """Setup the replay dialog UI."""
         layout = QVBoxLayout(self)
 
-        # Race selector
-        if len(self.completed_races) > 1:
+        # Race selector (races of a running batch are added as they finish)
+        self.race_selector = None
+        if self.overall_config['num_races'] > 1:
             race_selector_layout = QHBoxLayout()
             race_selector_label = QLabel("Select Race:")
             self.race_selector = QComboBox()
-            for i, race_data in enumerate(self.completed_races, 1):
-                self.race_selector.addItem(f"Race {i} of {len(self.completed_races)}")
+            self.refresh_race_list()
             self.race_selector.currentIndexChanged.connect(self._on_race_changed)
             race_selector_layout.addWidget(race_selector_label)
             race_selector_layout.addWidget(self.race_selector)
@@ -64,11 +68,13 @@ class RaceReplayDialog(QDialog):
         self.board_display = BoardDisplayWidget()
         splitter.addWidget(self.board_display)
 
-        # Text display area
-        self.replay_text = QTextEdit()
-        self.replay_text.setReadOnly(True)
-        self.replay_text.setStyleSheet("font-family: 'Courier New', monospace; font-size: 11px;")
-        splitter.addWidget(self.replay_text)
+        # Log display area, only the lines of changes entering or leaving the shown range are updated
+        self.log_model = ChangeLogModel(self._format_change, newest_first=True)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setStyleSheet("font-family: 'Courier New', monospace; font-size: 11px;")
+        splitter.addWidget(self.log_view)
 
         # Set initial sizes - give more space to graphical display
         splitter.setSizes([400, 200])
@@ -138,6 +144,14 @@ class RaceReplayDialog(QDialog):
         self.play_timer = QTimer()
         self.play_timer.timeout.connect(self._auto_advance)
 
+    def refresh_race_list(self):
+        """Add selector entries for races that finished since the dialog was opened."""
+        if self.race_selector is None:
+            return
+        num_races = self.overall_config['num_races']
+        for i in range(self.race_selector.count(), len(self.completed_races)):
+            self.race_selector.addItem(f"Race {i + 1} of {num_races}")
+
     def _load_race(self, race_index):
         """Load a specific race for replay."""
         self.current_race_index = race_index
@@ -146,13 +160,18 @@ class RaceReplayDialog(QDialog):
         self.play_timer.stop()
         self.play_pause_button.setText("▶ Play")
 
+        # Races are decoded from the store only when selected
         race_data = self.completed_races[race_index]
         self.current_race = race_data['race']
         self.changeset = race_data['changeset']
         self.initial_board_state = race_data['initial_board_state']
+        self.board_state_checkpoints = {0: self.initial_board_state}
+        self.board_state = None
+        self.board_state_step = 0
+        self.log_model.set_changes(self.changeset if self.changeset else [])
 
         # Update info label
-        num_races = len(self.completed_races)
+        num_races = self.overall_config['num_races']
         if num_races > 1:
             race_label = f"Race {race_index + 1} of {num_races}"
         else:
@@ -168,13 +187,33 @@ class RaceReplayDialog(QDialog):
         """Handle race selection change."""
         self._load_race(index)
 
+    def _get_board_state(self, step):
+        """Board state after the given step, applying only the changes since the closest earlier state."""
+        if self.board_state is None or step < self.board_state_step:
+            checkpoint_step = step - step % BOARD_STATE_CHECKPOINT_INTERVAL
+            while checkpoint_step not in self.board_state_checkpoints:
+                checkpoint_step -= BOARD_STATE_CHECKPOINT_INTERVAL
+            self.board_state = deepcopy(self.board_state_checkpoints[checkpoint_step])
+            self.board_state_step = checkpoint_step
+        while self.board_state_step < step:
+            self.board_state.apply_change_list([self.changeset[self.board_state_step]])
+            self.board_state_step += 1
+            if self.board_state_step % BOARD_STATE_CHECKPOINT_INTERVAL == 0:
+                self.board_state_checkpoints.setdefault(self.board_state_step, deepcopy(self.board_state))
+        return self.board_state
+
+    def _format_change(self, change):
+        """Log lines of a change, or nothing if it is hidden by the current settings."""
+        if not change.change_messages or not self._change_viewable(change):
+            return []
+        return ["-" * 60] + [f"  {msg}" for msg in change.change_messages]
+
     def _display_step(self):
         """Display the current step of the replay."""
-        # Reconstruct board state at current step
-        bs = deepcopy(self.initial_board_state)
-        bs.apply_change_list(self.changeset[:self.current_step])
+        # Board state at current step, copied so the board display can tell what changed
+        bs = deepcopy(self._get_board_state(self.current_step))
 
-        # Build display text
+        # Build standings
         text_lines = []
         text_lines.append("="*60)
         text_lines.append("CURRENT STANDINGS:")
@@ -188,18 +227,12 @@ class RaceReplayDialog(QDialog):
             tripped = " (tripped)" if bs.racer_trip_map.get(racer_name, False) else ""
             text_lines.append(f"  {player.value} [{pts} pts]: {racer_name.value} at position {position}{tripped}")
         text_lines.append("")
+        self.log_model.set_header(text_lines)
 
-        # Show changes up to current step
-        if self.current_step > 0 and self.changeset:
-            show_up_to_index = min(self.current_step, len(self.changeset))
-            start_index = max(0, show_up_to_index - 20)  # Show last few changes for context
-            for i in reversed(range(start_index, show_up_to_index)):
-                change = self.changeset[i]
-                if change.change_messages and self._change_viewable(change):
-                    text_lines.append("-" * 60)
-                    for msg in change.change_messages:
-                        text_lines.append(f"  {msg}")
+        # Show the last few changes up to current step for context
+        self.log_model.set_range(self.current_step - RECENT_CHANGES_SHOWN, self.current_step)
 
+        text_lines = []
         if self.current_step >= (len(self.changeset) if self.changeset else 0):
             text_lines.append("")
             text_lines.append("="*60)
@@ -207,8 +240,7 @@ class RaceReplayDialog(QDialog):
             text_lines.append("="*60)
             text_lines.append(f"Winner: {bs.first_place_racer.value if bs.first_place_racer else 'N/A'}")
             text_lines.append(f"Second Place: {bs.second_place_racer.value if bs.second_place_racer else 'N/A'}")
-
-        self.replay_text.setText("\n".join(text_lines))
+        self.log_model.set_footer(text_lines)
 
         # Update graphical board display
         self.board_display.set_board_state(bs, self.current_race.track)
@@ -305,6 +337,7 @@ class RaceReplayDialog(QDialog):
         """Handle skip turn-phase-only-changes checkbox state change."""
         # Refresh internal next/prev step behavior flag so that changes with only turn phase changes are/are not skipped
         self.skip_turn_phase_only_changes = (state == 2)  # Checked state is 2
+        self.log_model.refresh()
         self._display_step()
 
     def _on_skip_no_movement_checkbox_changed(self, state):
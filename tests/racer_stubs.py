@@ -0,0 +1,19 @@
+"""
+Racers without powers shared by the tests, standing in for racers that are not implemented yet
+"""
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.AbstractRacer import AbstractRacer
+from MidnightRunners.core.Player import Player
+
+
+class Egg(AbstractRacer):
+    """Racer without powers, only using the default main move"""
+    def __init__(self, player_name: Player):
+        super().__init__(player_name, RacerName.EGG)
+
+
+class RocketScientist(AbstractRacer):
+    """Racer without powers, only using the default main move"""
+    def __init__(self, player_name: Player):
+        super().__init__(player_name, RacerName.ROCKET_SCIENTIST)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the adaptive Monte Carlo runner
+"""
+
+import unittest
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.AdaptiveRunner import bootstrap_mean_interval, run_adaptive, wilson_interval
+
+from racer_stubs import Egg
+
+
+class TestIntervals(unittest.TestCase):
+    """Test cases for the confidence interval helpers"""
+
+    def test_wilson_interval(self):
+        """Test the Wilson interval against a known value and its edge cases"""
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low, 0.4038, places=3)
+        self.assertAlmostEqual(high, 0.5962, places=3)
+
+        low, high = wilson_interval(0, 20)
+        self.assertAlmostEqual(low, 0.0)
+        self.assertAlmostEqual(high, 0.1611, places=3)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+    def test_bootstrap_interval_contains_mean(self):
+        """Test that the bootstrap interval surrounds the sample mean and shrinks with more samples"""
+        counts = np.array([30, 0, 0, 70])  # 30 zeros and 70 threes
+        low, high = bootstrap_mean_interval(counts)
+        self.assertLess(low, 2.1)
+        self.assertGreater(high, 2.1)
+
+        wide = high - low
+        low, high = bootstrap_mean_interval(counts * 100)
+        self.assertLess(high - low, wide)
+
+
+class TestRunAdaptive(unittest.TestCase):
+    """Test cases for run_adaptive"""
+
+    def test_stops_when_converged(self):
+        """Test that the runner stops before the budget once the target precision is reached"""
+        progress = []
+        result = run_adaptive(TrackVersion.WILD, {Player.P1: Egg, Player.P2: Gunk}, win_rate_precision=0.02,
+                              points_precision=0.1, chunk_size=1000, max_races=100_000, progress_callback=progress.append)
+
+        self.assertTrue(result.converged)
+        self.assertLess(result.num_races, 100_000)
+        self.assertEqual(len(progress), result.num_races // 1000)
+        for estimate in result.racer_estimates:
+            low, high = estimate.win_rate_interval
+            self.assertLessEqual((high - low) / 2, 0.02)
+            self.assertTrue(low <= estimate.win_rate <= high)
+
+    def test_stops_at_budget(self):
+        """Test that the runner gives up when the budget runs out"""
+        result = run_adaptive(TrackVersion.MILD, {Player.P1: Egg, Player.P2: Gunk}, win_rate_precision=0.0001,
+                              chunk_size=500, max_races=1500)
+
+        self.assertFalse(result.converged)
+        self.assertEqual(result.num_races, 1500)
+
+        for chunk_size, max_races in [(300, 1000), (2000, 100)]:
+            with self.subTest(chunk_size=chunk_size, max_races=max_races):
+                result = run_adaptive(TrackVersion.MILD, {Player.P1: Egg, Player.P2: Gunk}, win_rate_precision=0.0001,
+                                      chunk_size=chunk_size, max_races=max_races)
+                self.assertFalse(result.converged)
+                self.assertEqual(result.num_races, max_races)
+
+    def test_parallel_matches_serial(self):
+        """Test that parallel workers give the same result as a single worker"""
+        config = {Player.P1: Banana, Player.P2: Gunk}
+        serial = run_adaptive(TrackVersion.MILD, config, win_rate_precision=0.0001, chunk_size=4, max_races=10)
+        parallel = run_adaptive(TrackVersion.MILD, config, win_rate_precision=0.0001, chunk_size=4, max_races=10, num_workers=2)
+
+        self.assertEqual(serial.num_races, 10)
+        self.assertEqual(serial.num_races, parallel.num_races)
+        self.assertEqual(serial.get_estimate(RacerName.BANANA).win_rate, parallel.get_estimate(RacerName.BANANA).win_rate)
+        self.assertEqual(serial.get_estimate(RacerName.GUNK).mean_points, parallel.get_estimate(RacerName.GUNK).mean_points)
+
+
+if __name__ == '__main__':
+    unittest.main()
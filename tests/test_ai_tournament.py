@@ -0,0 +1,89 @@
+"""
+Unit tests for the paired AI tournament
+"""
+
+import unittest
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.CR_Suckerfish import Suckerfish
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.RacerAI import NaiveRacerAI
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.AITournament import Difference, run_ai_tournament, run_paired_chunk
+
+from racer_stubs import Egg
+
+
+class LaggardAI(NaiveRacerAI):
+    """Chooses the option that leaves the racer furthest behind"""
+    def choose_path(self, bs, bs_options: list) -> int:
+        positions = [option.racer_name_to_position_map[self.racer_name] for option in bs_options]
+        return positions.index(min(positions))
+
+
+class TestAITournament(unittest.TestCase):
+    """Test cases for comparing racer AIs with paired races"""
+
+    def setUp(self):
+        self.config = {Player.P1: Gunk, Player.P2: Suckerfish, Player.P3: Banana}
+
+    def test_same_ai_has_no_difference(self):
+        """Test that the baseline against itself skips every candidate race"""
+        result = run_ai_tournament(TrackVersion.MILD, self.config, NaiveRacerAI, num_races=6, chunk_size=4)
+        self.assertEqual(result.num_races, 6)
+        self.assertEqual(result.num_races_run, 6)
+        self.assertEqual(result.num_races_skipped, 18)
+        self.assertEqual(result.points_difference.mean, 0.0)
+        self.assertFalse(result.win_rate_difference.is_significant())
+
+    def test_skipping_identical_races_is_exact(self):
+        """Test that skipping races where the candidate agrees gives the same results as running them"""
+        skipped = run_paired_chunk(TrackVersion.MILD, self.config, LaggardAI, NaiveRacerAI, 3, seed=2)
+        run = run_paired_chunk(TrackVersion.MILD, self.config, LaggardAI, NaiveRacerAI, 3, seed=2, skip_identical=False)
+        self.assertGreater(skipped.num_races_skipped, 0)
+        self.assertEqual(run.num_races_skipped, 0)
+        np.testing.assert_array_equal(skipped.candidate_points, run.candidate_points)
+        np.testing.assert_array_equal(skipped.candidate_wins, run.candidate_wins)
+        np.testing.assert_array_equal(skipped.baseline_points, run.baseline_points)
+
+    def test_only_deciding_seats_differ(self):
+        """Test that a worse Suckerfish AI only changes the races where Suckerfish has it"""
+        result = run_ai_tournament(TrackVersion.MILD, self.config, LaggardAI, num_races=6)
+        self.assertGreater(result.num_races_run, 6)
+        self.assertEqual(result.seat_points_differences[0].mean, 0.0)
+        self.assertEqual(result.seat_points_differences[2].mean, 0.0)
+        self.assertIn("P2 Suckerfish", result.format_summary())
+
+    def test_default_lineup_uses_batch_engine(self):
+        """Test that a lineup whose racers never ask their AI needs no candidate races"""
+        config = {Player.P1: Gunk, Player.P2: Egg}
+        result = run_ai_tournament(TrackVersion.WILD, config, LaggardAI, num_races=50)
+        self.assertEqual(result.num_races_skipped, 100)
+        self.assertEqual(result.candidate_win_rate, result.baseline_win_rate)
+        for difference in [result.win_rate_difference, result.points_difference,
+                           *result.seat_win_rate_differences, *result.seat_points_differences]:
+            self.assertEqual(difference.mean, 0.0)
+
+        chunk = run_paired_chunk(TrackVersion.WILD, config, LaggardAI, NaiveRacerAI, 20, seed=1)
+        np.testing.assert_array_equal(chunk.candidate_wins, chunk.baseline_wins)
+        np.testing.assert_array_equal(chunk.candidate_points, chunk.baseline_points)
+
+    def test_workers_reproducible(self):
+        """Test that the result does not depend on the number of workers"""
+        single = run_ai_tournament(TrackVersion.MILD, self.config, LaggardAI, num_races=4, chunk_size=2)
+        pooled = run_ai_tournament(TrackVersion.MILD, self.config, LaggardAI, num_races=4, chunk_size=2, num_workers=2)
+        self.assertEqual(single.points_difference.mean, pooled.points_difference.mean)
+        self.assertEqual(single.num_races_run, pooled.num_races_run)
+
+    def test_difference_interval(self):
+        """Test that the interval is centred on the mean and excludes zero for a clear difference"""
+        difference = Difference(np.array([1.0, 2.0, 1.5, 1.0, 2.0]), 0.95)
+        self.assertAlmostEqual(sum(difference.interval) / 2, difference.mean)
+        self.assertTrue(difference.is_significant())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit tests for the vectorized batch engine
+"""
+
+import unittest
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Dice import Dice, ScriptedDice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import (
+    DiceTable, can_vectorize, run_batch, run_object_batch, run_vectorized_batch
+)
+
+from racer_stubs import Egg, RocketScientist
+
+
+class TestDice(unittest.TestCase):
+    """Test cases for seeded and scripted dice"""
+
+    def test_seeded_dice_per_player_streams(self):
+        """Test that a player's rolls do not depend on the rolls of other players"""
+        dice_a = Dice(seed=3)
+        dice_b = Dice(seed=3)
+        rolls_a = [dice_a.roll(Player.P1) for _ in range(10)]
+        rolls_b = []
+        for _ in range(10):
+            dice_b.roll(Player.P2)
+            rolls_b.append(dice_b.roll(Player.P1))
+        self.assertEqual(rolls_a, rolls_b)
+        self.assertTrue(all(1 <= roll <= 6 for roll in rolls_a))
+
+    def test_dice_table_seat_streams(self):
+        """Test that a seat's rolls in a dice table do not depend on the lineup size or race count"""
+        races, seats, roll_indices = np.arange(10), np.zeros(10, dtype=int), np.arange(10) * 13
+        rolls = DiceTable(0, 10, 3).get_rolls(races, seats, roll_indices)
+        np.testing.assert_array_equal(rolls, DiceTable(0, 10, 2).get_rolls(races, seats, roll_indices))
+        np.testing.assert_array_equal(rolls, DiceTable(0, 25, 2).get_rolls(races, seats, roll_indices))
+        self.assertFalse(np.array_equal(rolls, DiceTable(0, 10, 2).get_rolls(races, seats + 1, roll_indices)))
+
+    def test_scripted_dice(self):
+        """Test that scripted dice hand out the given rolls in order and fail when exhausted"""
+        dice = ScriptedDice({Player.P1: [4, 2]})
+        self.assertEqual(dice.roll(Player.P1), 4)
+        self.assertEqual(dice.roll(Player.P1), 2)
+        with self.assertRaises(IndexError):
+            dice.roll(Player.P1)
+
+
+class TestBatchEngine(unittest.TestCase):
+    """Test cases for the vectorized batch engine against Race.do_race"""
+
+    def assert_same_results(self, track_version, config, num_races=15, seed=11):
+        vectorized = run_vectorized_batch(track_version, config, DiceTable(seed, num_races, len(config)))
+        objects = run_object_batch(track_version, config, DiceTable(seed, num_races, len(config)))
+        np.testing.assert_array_equal(vectorized.points, objects.points)
+        np.testing.assert_array_equal(vectorized.final_positions, objects.final_positions)
+        np.testing.assert_array_equal(vectorized.first_place, objects.first_place)
+        np.testing.assert_array_equal(vectorized.second_place, objects.second_place)
+        np.testing.assert_array_equal(vectorized.num_turns, objects.num_turns)
+
+    def test_default_racers_match_object_engine_mild(self):
+        """Test that default racers give the same results as the object engine on the Mild track"""
+        self.assert_same_results(TrackVersion.MILD, {Player.P1: Egg, Player.P2: RocketScientist})
+
+    def test_default_racers_match_object_engine_wild(self):
+        """Test that default racers give the same results as the object engine on the Wild track"""
+        self.assert_same_results(TrackVersion.WILD, {Player.P1: Egg, Player.P2: RocketScientist})
+
+    def test_gunk_matches_object_engine(self):
+        """Test that Gunk's -1 power gives the same results as the object engine"""
+        config = {Player.P1: Egg, Player.P2: Gunk, Player.P3: RocketScientist}
+        self.assert_same_results(TrackVersion.MILD, config)
+        self.assert_same_results(TrackVersion.WILD, config)
+
+    def test_can_vectorize(self):
+        """Test that only default racers and Gunk are vectorized"""
+        self.assertTrue(can_vectorize({Player.P1: Egg, Player.P2: Gunk}))
+        self.assertFalse(can_vectorize({Player.P1: Banana, Player.P2: Gunk}))
+
+    def test_fallback_to_object_engine(self):
+        """Test that lineups with unsupported racers still run with the object engine"""
+        result = run_batch(TrackVersion.WILD, {Player.P1: Banana, Player.P2: Gunk}, num_races=3, seed=5)
+
+        self.assertFalse(result.vectorized)
+        self.assertEqual(result.num_races, 3)
+        self.assertTrue(np.all(result.first_place >= 0))
+        self.assertTrue(np.all(result.second_place >= 0))
+
+    def test_same_seed_same_results(self):
+        """Test that a batch is reproducible from its seed"""
+        config = {Player.P1: Egg, Player.P2: Gunk, Player.P3: RocketScientist}
+        result_a = run_batch(TrackVersion.WILD, config, num_races=200, seed=1)
+        result_b = run_batch(TrackVersion.WILD, config, num_races=200, seed=1)
+
+        self.assertTrue(result_a.vectorized)
+        np.testing.assert_array_equal(result_a.points, result_b.points)
+        self.assertAlmostEqual(sum(result_a.win_rates().values()), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
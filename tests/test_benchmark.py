@@ -0,0 +1,35 @@
+"""
+Unit tests for the engine benchmark suite
+"""
+
+import unittest
+
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.Benchmark import compare_to_baseline, results_to_json, run_benchmarks
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for running benchmarks and comparing them against a baseline"""
+
+    def test_small_run(self):
+        """Test that a small run covers races, racers and engine stages"""
+        results = results_to_json(run_benchmarks(races_per_lineup=1, micro_repeats=2,
+                                                 track_versions=[TrackVersion.MILD], player_counts=[2]))
+
+        self.assertEqual(results["do_race/MILD/2p"]["calls"], 1)
+        for name in ["check_triggers/MILD", "get_power_changes/Suckerfish/MILD", "Track.trig_changes/MILD",
+                     "BoardState.apply_change_list/MILD", "board_state_loop_detected/MILD"]:
+            self.assertEqual(results[name]["calls"], 2)
+            self.assertGreater(results[name]["calls_per_second"], 0)
+
+    def test_compare_to_baseline(self):
+        """Test that only benchmarks slowed down beyond the tolerance are flagged"""
+        baseline = {"fast": {"median_latency": 1.0}, "slow": {"median_latency": 1.0}}
+        results = {"fast": {"median_latency": 1.1}, "slow": {"median_latency": 2.0}, "new": {"median_latency": 5.0}}
+
+        self.assertEqual(compare_to_baseline(results, baseline, tolerance=0.25), [("slow", 2.0)])
+        self.assertEqual(compare_to_baseline(results, baseline, tolerance=1.5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Unit tests for the cached track layer of the board display widget
+"""
+
+import os
+import unittest
+from copy import deepcopy
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import Track, TrackVersion
+
+try:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from gui.board_display import BoardDisplayWidget
+except ImportError:
+    BoardDisplayWidget = None
+
+
+@unittest.skipIf(BoardDisplayWidget is None, "PyQt6 is not installed")
+class TestBoardDisplayWidget(unittest.TestCase):
+    """Test cases for rendering the static track once and repainting only moved racers"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.track = Track(TrackVersion.WILD)
+        self.bs = BoardState(2, self.track, {Player.P1: RacerName.GUNK, Player.P2: RacerName.BANANA})
+        self.widget = BoardDisplayWidget()
+        self.widget.resize(800, 350)
+        self.widget.set_board_state(self.bs, self.track)
+
+    def test_track_pixmap_cached(self):
+        """Test that the track layer is reused until the size or track changes"""
+        self.widget.grab()
+        pixmap = self.widget.track_pixmap
+        moved_bs = deepcopy(self.bs)
+        moved_bs.racer_name_to_position_map[RacerName.GUNK] = 4
+        self.widget.set_board_state(moved_bs, self.track)
+        self.widget.grab()
+        self.assertIs(self.widget.track_pixmap, pixmap)
+
+        self.widget.resize(900, 350)
+        self.widget.grab()
+        self.assertIsNot(self.widget.track_pixmap, pixmap)
+
+    def test_changed_positions(self):
+        """Test that only the old and new spaces of moved or tripped racers are repainted"""
+        moved_bs = deepcopy(self.bs)
+        moved_bs.racer_name_to_position_map[RacerName.GUNK] = 4
+        moved_bs.racer_trip_map[RacerName.BANANA] = True
+        self.assertEqual(self.widget._get_changed_positions(self.bs, moved_bs), {0, 4})
+        self.assertEqual(self.widget._get_changed_positions(self.bs, deepcopy(self.bs)), set())
+
+        other_lineup = BoardState(2, self.track, {Player.P1: RacerName.GUNK, Player.P2: RacerName.MOUTH})
+        self.assertIsNone(self.widget._get_changed_positions(self.bs, other_lineup))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Unit tests for the causal trigger graph
+"""
+
+import json
+import unittest
+from copy import deepcopy
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.CausalGraph import CausalGraph, NODE_CREATED, NODE_EDITED, NODE_ROOT
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.StateChange import ChangeSet
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import DiceTable, replay_race
+
+
+class TestCausalGraph(unittest.TestCase):
+    """Test cases for recording which change caused which"""
+
+    def setUp(self):
+        self.graph = CausalGraph()
+        self.race = replay_race(TrackVersion.WILD, {Player.P1: Banana, Player.P2: Gunk}, DiceTable(0, 1, 2), 0,
+                                causal_graph=self.graph)
+
+    def test_one_root_per_turn_phase(self):
+        """Test that every turn phase change is a root and every other node has earlier parents"""
+        num_phases = sum(1 for change in self.race.full_race_change_list if change.turn_phase_changes)
+        roots = [node for node in self.graph.nodes if node.kind == NODE_ROOT]
+        self.assertEqual(len(roots), num_phases)
+        for node in self.graph.nodes:
+            if node.kind != NODE_ROOT:
+                self.assertEqual(len(node.parent_ids), 1)
+                self.assertLess(node.parent_ids[0], node.node_id)
+
+    def test_gunk_edits_main_moves(self):
+        """Test that Gunk shortening Banana's main move is an edit of the move, caused by the main move phase"""
+        gunk_edits = [node for node in self.graph.nodes if node.owner == "Gunk" and node.kind == NODE_EDITED]
+        self.assertGreater(len(gunk_edits), 0)
+        for edit in gunk_edits:
+            main_move = self.graph.nodes[edit.parent_ids[0]]
+            self.assertEqual((main_move.owner, main_move.kind), ("Banana", NODE_CREATED))
+            self.assertEqual(main_move.change_id, edit.change_id)
+            root = self.graph.nodes[self.graph.get_ancestors(edit.node_id)[0]]
+            self.assertEqual(root.kind, NODE_ROOT)
+            self.assertIn(edit.node_id, self.graph.get_descendants(root.node_id))
+
+    def test_change_id_survives_copies(self):
+        """Test that a deep copied change set keeps its identity"""
+        change = ChangeSet()
+        self.race.link_new_changes([change])
+        self.assertIsNotNone(change.change_id)
+        self.assertEqual(deepcopy(change).change_id, change.change_id)
+
+    def test_export(self):
+        """Test that the graph exports as JSON and Graphviz"""
+        graph_json = json.loads(json.dumps(self.graph.to_json()))
+        self.assertEqual(len(graph_json["nodes"]), len(self.graph.nodes))
+        self.assertIn("->", self.graph.to_dot())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for the incremental change log model of the live and replay dialogs
+"""
+
+import os
+import unittest
+from types import SimpleNamespace
+
+try:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    from gui.change_log_model import ChangeLogModel
+except ImportError:
+    ChangeLogModel = None
+
+
+def format_change(change):
+    return [f"  {msg}" for msg in change.change_messages]
+
+
+def get_full_lines(model, start, stop):
+    """Lines the model should show, built from scratch like the dialogs used to."""
+    body = []
+    for change in model.changes[max(0, start):stop]:
+        lines = model.format_change(change)
+        body = lines + body if model.newest_first else body + lines
+    return model.header_lines + body + model.footer_lines
+
+
+@unittest.skipIf(ChangeLogModel is None, "PyQt6 is not installed")
+class TestChangeLogModel(unittest.TestCase):
+    """Test cases for moving the shown range of changes one block at a time"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        # Every third change has no messages, others have one or two
+        self.changes = [SimpleNamespace(change_messages=[f"change {i}"] * (i % 3)) for i in range(30)]
+
+    def test_forward_and_backward_steps(self):
+        """Test that the lines match a full rebuild after every step in both directions"""
+        for newest_first in (False, True):
+            model = ChangeLogModel(format_change, newest_first=newest_first)
+            model.set_changes(self.changes)
+            model.set_header(["header"])
+            steps = list(range(31)) + list(range(30, -1, -3))
+            for step in steps:
+                model.set_range(step - 5, step)
+                model.set_footer([f"step {step}"] * (step % 2))
+                self.assertEqual(model.stringList(), get_full_lines(model, step - 5, step))
+
+    def test_only_new_rows_inserted(self):
+        """Test that advancing one step inserts only the rows of the new change"""
+        model = ChangeLogModel(format_change)
+        model.set_changes(self.changes)
+        model.set_range(0, 11)
+        inserted, resets = [], []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        model.modelReset.connect(lambda: resets.append(True))
+        model.set_range(0, 12)
+        self.assertEqual(inserted, [(10, 11)])
+        self.assertEqual(resets, [])
+
+    def test_jump_and_refresh(self):
+        """Test that a jump to a disjoint range and a refresh rebuild the lines"""
+        model = ChangeLogModel(format_change, newest_first=True)
+        model.set_changes(self.changes)
+        model.set_range(0, 5)
+        model.set_range(20, 25)
+        self.assertEqual(model.stringList(), get_full_lines(model, 20, 25))
+        model.format_change = lambda change: [msg.upper() for msg in change.change_messages]
+        model.refresh()
+        self.assertEqual(model.stringList(), get_full_lines(model, 20, 25))
+
+    def test_read_only(self):
+        """Test that log lines cannot be edited in the view"""
+        model = ChangeLogModel(format_change)
+        model.set_header(["header"])
+        self.assertFalse(model.flags(model.index(0)) & Qt.ItemFlag.ItemIsEditable)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the lazily loaded core package and the import cost of simulation workers
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import MidnightRunners.core as core
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_MODULES = ["AbstractRacer", "BoardState", "BoardView", "CausalGraph", "Dice", "Player", "Profiler",
+                "Race", "RacerAI", "RaceSnapshot", "RaceTracer", "StateChange", "TriggerCounters", "Track", "Turn"]
+PACKAGE_IMPORT_BUDGET_MS = 10  # Own modules imported by "import MidnightRunners.core"
+
+
+def import_in_fresh_interpreter(statement):
+    """Loaded modules and the self time of the repo's own modules in microseconds, after the statement."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{statement}; import sys; print('\\n'.join(sys.modules))"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    own_time_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module_name = line[len("import time:"):].split("|")
+        if module_name.strip().startswith("MidnightRunners"):
+            own_time_us += int(self_time)
+    return set(result.stdout.split()), own_time_us
+
+
+class TestCoreImports(unittest.TestCase):
+    """Test cases for importing the core package without loading the whole engine"""
+
+    def test_package_import_loads_no_modules(self):
+        """Test that importing the package alone loads none of its modules and stays within budget"""
+        modules, own_time_us = import_in_fresh_interpreter("import MidnightRunners.core")
+        self.assertEqual(sorted(module for module in modules if module.startswith("MidnightRunners.core.")), [])
+        self.assertLess(own_time_us / 1000, PACKAGE_IMPORT_BUDGET_MS)
+
+    def test_board_state_without_engine(self):
+        """Test that the board state is importable without the race engine and its tracing"""
+        modules, _ = import_in_fresh_interpreter("from MidnightRunners.core.BoardState import BoardState")
+        for module_name in ["Race", "AbstractRacer", "CausalGraph", "RaceTracer"]:
+            self.assertNotIn(f"MidnightRunners.core.{module_name}", modules)
+        self.assertNotIn("json", modules)
+
+    def test_modules_import_standalone(self):
+        """Test that every core module can be the first one imported in a process"""
+        for module_name in CORE_MODULES:
+            with self.subTest(module_name=module_name):
+                modules, _ = import_in_fresh_interpreter(f"import MidnightRunners.core.{module_name}")
+                self.assertIn(f"MidnightRunners.core.{module_name}", modules)
+
+    def test_exported_classes(self):
+        """Test that the package exports the classes, also after their modules were imported"""
+        from MidnightRunners.core.Race import Race
+        from MidnightRunners.core import AbstractRacer, BoardState, Player, Track
+        self.assertIs(core.Race, Race)
+        self.assertEqual([cls.__name__ for cls in (AbstractRacer, BoardState, Player, Track)],
+                         ["AbstractRacer", "BoardState", "Player", "Track"])
+        self.assertIsInstance(core.BoardState, type)
+        self.assertEqual(set(core.__all__) - set(dir(core)), set())
+        with self.assertRaises(AttributeError):
+            core.NotACoreClass
+
+
+if __name__ == "__main__":
+    unittest.main()
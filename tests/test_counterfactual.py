@@ -0,0 +1,76 @@
+"""
+Unit tests for re-simulating variants of a recorded race from its checkpoints
+"""
+
+import unittest
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.Counterfactual import (EVENT_ROLL, EventRecorder, RecordingAI, RecordingDice,
+                                                       record_race)
+
+
+def new_race(seed):
+    return Race(TrackVersion.MILD, {Player.P1: Gunk(Player.P1), Player.P2: Banana(Player.P2)}, dice=Dice(seed), verbose=False)
+
+
+def get_outcome(race):
+    bs = race.board_state
+    return race.num_turns_taken, dict(bs.player_points_map), dict(bs.racer_name_to_position_map)
+
+
+class TestCounterfactual(unittest.TestCase):
+    """Test cases for recording a race and overriding its events"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.recorded = record_race(new_race(4), checkpoint_turns=2)
+
+    def test_recording(self):
+        """Test that recording plays the same race and numbers its events"""
+        race = new_race(4)
+        race.do_race()
+        self.assertEqual(get_outcome(self.recorded.race), get_outcome(race))
+        self.assertEqual([event.index for event in self.recorded.events], list(range(len(self.recorded.events))))
+        self.assertTrue(all(event.turn is not None for event in self.recorded.events))
+        self.assertGreater(len(self.recorded.checkpoints), 1)
+
+    def test_same_value_reproduces_race(self):
+        """Test that overriding events with their recorded values gives the recorded race"""
+        rolls = [event for event in self.recorded.events if event.kind == EVENT_ROLL]
+        variants = [{event.index: event.value} for event in rolls[::5]]
+        for race in self.recorded.run_counterfactuals(variants):
+            self.assertEqual(get_outcome(race), get_outcome(self.recorded.race))
+        self.assertIs(self.recorded.run_counterfactual({}), self.recorded.race)
+
+    def test_matches_race_from_start(self):
+        """Test that variants sharing their prefix end like races played from the start with the override"""
+        roll = [event for event in self.recorded.events if event.kind == EVENT_ROLL][7]
+        variants = [{roll.index: value} for value in range(1, 7)] + [{roll.index + 1: 1}, {3: 6, roll.index: 1}]
+        races = self.recorded.run_counterfactuals(variants)
+        for overrides, race in zip(variants, races):
+            with self.subTest(overrides=overrides):
+                expected = new_race(4)
+                recorder = EventRecorder(overrides)
+                expected.set_dice(RecordingDice(expected.dice, recorder))
+                for racer in expected.player_to_racer_map.values():
+                    racer.ai = RecordingAI(racer.ai, recorder)
+                expected.do_race()
+                self.assertEqual(get_outcome(race), get_outcome(expected))
+        self.assertNotEqual(len({str(get_outcome(race)) for race in races[:6]}), 1)
+
+    def test_invalid_overrides(self):
+        """Test that overrides must be values the event could have had"""
+        roll = next(event for event in self.recorded.events if event.kind == EVENT_ROLL)
+        with self.assertRaises(ValueError):
+            self.recorded.run_counterfactual({roll.index: 7})
+        with self.assertRaises(IndexError):
+            self.recorded.run_counterfactual({len(self.recorded.events): 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Unit tests for the exact Markov chain solver
+"""
+
+import unittest
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import run_batch
+from MidnightRunners.simulation.ExactSolver import (
+    DefaultMoveModel, EngineModel, FinishedState, solve_exact, solve_markov_chain
+)
+
+from racer_stubs import Egg
+
+
+class TestExactSolver(unittest.TestCase):
+    """Test cases for solving races exactly"""
+
+    def test_probabilities_sum_to_one(self):
+        """Test that first and second place probabilities each sum to one"""
+        result = solve_exact(TrackVersion.WILD, {Player.P1: Egg, Player.P2: Gunk})
+
+        self.assertAlmostEqual(sum(result.first_place_probabilities.values()), 1.0, places=9)
+        self.assertAlmostEqual(sum(result.second_place_probabilities.values()), 1.0, places=9)
+        # 3 points for first place, 1 for second, plus stars collected on the way
+        self.assertGreater(sum(result.expected_points.values()), 4.0)
+
+    def test_matches_monte_carlo(self):
+        """Test that the exact result lies close to a large batch of simulated races"""
+        config = {Player.P1: Egg, Player.P2: Gunk}
+        exact = solve_exact(TrackVersion.MILD, config)
+        simulated = run_batch(TrackVersion.MILD, config, num_races=20000, seed=2)
+
+        for racer_name, win_rate in simulated.win_rates().items():
+            self.assertAlmostEqual(exact.first_place_probabilities[racer_name], win_rate, delta=0.015)
+        for racer_name, mean_points in simulated.mean_points().items():
+            self.assertAlmostEqual(exact.expected_points[racer_name], mean_points, delta=0.05)
+
+    def test_results_are_cached(self):
+        """Test that solving the same configuration twice returns the cached result"""
+        config = {Player.P1: Gunk, Player.P2: Egg}
+        self.assertIs(solve_exact(TrackVersion.MILD, config), solve_exact(TrackVersion.MILD, config))
+
+    def test_engine_model_matches_default_model(self):
+        """Test that the object engine gives the same first turn transitions as the fast model"""
+        config = {Player.P1: Egg, Player.P2: Gunk}
+        default_model = DefaultMoveModel(TrackVersion.WILD, config)
+        engine_model = EngineModel(TrackVersion.WILD, config)
+
+        default_transitions = default_model.get_transitions(default_model.get_initial_state())
+        engine_transitions = engine_model.get_transitions(engine_model.get_initial_state())
+        for (default_state, default_points), (engine_state, engine_points) in zip(default_transitions, engine_transitions):
+            self.assertEqual(default_points, engine_points)
+            self.assertEqual(default_state[0], engine_state[0])  # Positions
+            self.assertEqual(default_state[1], engine_state[1])  # Trip flags
+
+    def test_too_many_states(self):
+        """Test that lineups with too many states are rejected"""
+        model = DefaultMoveModel(TrackVersion.MILD, {Player.P1: Egg, Player.P2: Gunk})
+        with self.assertRaises(ValueError):
+            solve_markov_chain(model, max_states=100)
+
+    def test_finished_state_equality(self):
+        """Test that finished states with the same places are interchangeable"""
+        self.assertEqual(FinishedState(0, 1), FinishedState(0, 1))
+        self.assertNotEqual(FinishedState(0, 1), FinishedState(1, 0))
+        self.assertEqual(len({FinishedState(0, 1), FinishedState(0, 1)}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
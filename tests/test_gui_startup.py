@@ -0,0 +1,71 @@
+"""
+Import-time budget for launching the GUI main window
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+try:
+    import PyQt6  # noqa: F401
+except ImportError:
+    PyQt6 = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OWN_PACKAGES = ("gui", "MidnightRunners")
+IMPORT_TIME_BUDGET_MS = 60  # Own modules only, PyQt6 and the standard library are not counted
+
+# Modules the main window only needs once a race is started or replayed
+DEFERRED_MODULES = [
+    "gui.replay_dialog",
+    "gui.liveplay_dialog",
+    "gui.input_dialogs",
+    "gui.race_batch_worker",
+    "gui.board_display",
+    "MidnightRunners.concreteracers.CR_Banana",
+    "MidnightRunners.concreteracers.CR_Gunk",
+    "MidnightRunners.concreteracers.CR_Mouth",
+    "MidnightRunners.concreteracers.CR_Romantic",
+    "MidnightRunners.concreteracers.CR_Suckerfish",
+]
+
+
+def import_main_window():
+    """Import the main window in a fresh interpreter; returns the loaded modules and -X importtime rows."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         "import sys, gui.main_window; print('\\n'.join(sys.modules))"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    import_times = []  # (module name, self time in microseconds)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module_name = line[len("import time:"):].split("|")
+        import_times.append((module_name.strip(), int(self_time)))
+    return set(result.stdout.split()), import_times
+
+
+@unittest.skipIf(PyQt6 is None, "PyQt6 is not installed")
+class TestGuiStartup(unittest.TestCase):
+    """Test cases for keeping the launch of the main window light"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.modules, cls.import_times = import_main_window()
+
+    def test_deferred_modules_not_imported(self):
+        """Test that dialogs, the batch worker and racers are not imported at launch"""
+        self.assertIn("gui.main_window", self.modules)
+        self.assertEqual([module for module in DEFERRED_MODULES if module in self.modules], [])
+
+    def test_import_time_budget(self):
+        """Test that the own modules imported at launch stay within the import time budget"""
+        own_time_us = sum(self_time for module_name, self_time in self.import_times
+                          if module_name.split(".")[0] in OWN_PACKAGES)
+        self.assertGreater(own_time_us, 0)
+        self.assertLess(own_time_us / 1000, IMPORT_TIME_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
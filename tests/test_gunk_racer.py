@@ -253,6 +253,38 @@ class TestGunkGetPowerChanges(unittest.TestCase):
         self.assertEqual(len(new_changes), 1)
         self.assertEqual(new_changes[0].position_changes[0].new_position, 7)
 
+    def test_only_dependent_changes_dropped(self):
+        """Test that changes caused by the edited move are dropped and unrelated later changes are kept"""
+        phase_change = ChangeSet()
+        phase_change.change_id = 0
+
+        move_change = ChangeSet()
+        move_change.change_id = 1
+        move_change.set_cause(phase_change)
+        pos_change = PositionChange(RacerName.BANANA, 3, 8)
+        pos_change.set_move_type(MoveType.MAIN)
+        move_change.add_pos_change_obj(pos_change)
+
+        # Landing effect of the move, and an effect of that effect
+        landing_change = ChangeSet()
+        landing_change.change_id = 2
+        landing_change.set_cause(move_change)
+        follow_up_change = ChangeSet()
+        follow_up_change.change_id = 3
+        follow_up_change.set_cause(landing_change)
+
+        # Reaction to the phase change, not to the move
+        unrelated_change = ChangeSet()
+        unrelated_change.change_id = 4
+        unrelated_change.set_cause(phase_change)
+
+        changes = [phase_change, move_change, landing_change, follow_up_change, unrelated_change]
+        new_changes, power_activated = self.gunk.get_power_changes(self.board_state, changes)
+
+        self.assertTrue(power_activated)
+        self.assertEqual([change.change_id for change in new_changes], [0, 1, 4])
+        self.assertEqual(new_changes[1].position_changes[0].new_position, 7)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+"""
+Unit tests for paired lineup comparisons with common random numbers and antithetic dice
+"""
+
+import unittest
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import DiceTable
+from MidnightRunners.simulation.ExactSolver import solve_exact
+from MidnightRunners.simulation.LineupComparison import compare_lineups
+
+from racer_stubs import Egg, RocketScientist
+
+
+class TestAntitheticDice(unittest.TestCase):
+    """Test cases for antithetic dice"""
+
+    def test_antithetic_dice_table(self):
+        """Test that an antithetic dice table mirrors every roll of the plain table"""
+        races, seats, roll_indices = np.arange(10), np.zeros(10, dtype=int), np.arange(10)
+        plain = DiceTable(4, 10, 2).get_rolls(races, seats, roll_indices)
+        mirrored = DiceTable(4, 10, 2, antithetic=True).get_rolls(races, seats, roll_indices)
+        np.testing.assert_array_equal(plain + mirrored, 7)
+
+    def test_antithetic_dice(self):
+        """Test that antithetic seeded dice mirror the plain seeded dice"""
+        plain, mirrored = Dice(seed=8), Dice(seed=8, antithetic=True)
+        for _ in range(10):
+            self.assertEqual(plain.roll(Player.P1) + mirrored.roll(Player.P1), 7)
+
+
+class TestCompareLineups(unittest.TestCase):
+    """Test cases for compare_lineups"""
+
+    def setUp(self):
+        self.config_a = {Player.P1: Egg, Player.P2: Gunk}
+        self.config_b = {Player.P1: Egg, Player.P2: RocketScientist}
+        exact_a = solve_exact(TrackVersion.WILD, self.config_a)
+        exact_b = solve_exact(TrackVersion.WILD, self.config_b)
+        # Seat P2 has Gunk in lineup A and Rocket Scientist in lineup B
+        self.exact_points_difference = exact_a.expected_points[RacerName.GUNK] - exact_b.expected_points[RacerName.ROCKET_SCIENTIST]
+
+    def test_common_random_numbers_reduce_variance(self):
+        """Test that sharing dice streams gives a lower variance than independent sampling"""
+        independent = compare_lineups(TrackVersion.WILD, self.config_a, self.config_b, 10000, common_random_numbers=False)[1]
+        paired = compare_lineups(TrackVersion.WILD, self.config_a, self.config_b, 10000)[1]
+
+        self.assertEqual(paired.racer_name_a, RacerName.GUNK)
+        self.assertEqual(paired.racer_name_b, RacerName.ROCKET_SCIENTIST)
+        self.assertLess(paired.points_difference_se, independent.points_difference_se)
+        self.assertGreater(paired.variance_reduction, 1.5)
+        self.assertAlmostEqual(paired.points_difference, self.exact_points_difference, delta=4 * paired.points_difference_se)
+
+    def test_antithetic_pairs(self):
+        """Test that antithetic pairing still estimates the right difference"""
+        comparison = compare_lineups(TrackVersion.WILD, self.config_a, self.config_b, 10000, antithetic=True)[1]
+
+        self.assertEqual(comparison.num_races, 10000)
+        self.assertAlmostEqual(comparison.points_difference, self.exact_points_difference, delta=4 * comparison.points_difference_se)
+
+    def test_different_players_rejected(self):
+        """Test that lineups with different players cannot be compared"""
+        with self.assertRaises(ValueError):
+            compare_lineups(TrackVersion.MILD, self.config_a, {Player.P1: Egg}, 10)
+
+    def test_race_count_rejected(self):
+        """Test that antithetic pairs need an even race count and every comparison enough samples"""
+        for num_races, antithetic in [(11, True), (1, True), (2, True), (1, False)]:
+            with self.subTest(num_races=num_races, antithetic=antithetic):
+                with self.assertRaises(ValueError):
+                    compare_lineups(TrackVersion.MILD, self.config_a, self.config_b, num_races, antithetic=antithetic)
+        self.assertEqual(compare_lineups(TrackVersion.MILD, self.config_a, self.config_b, 4, antithetic=True)[0].num_races, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
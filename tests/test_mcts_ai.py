@@ -0,0 +1,110 @@
+"""
+Unit tests for the Monte Carlo tree search racer AI
+"""
+
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from functools import partial
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.CR_Suckerfish import Suckerfish
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import Track, TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+from MidnightRunners.simulation.BatchEngine import run_batch
+from MidnightRunners.simulation.MCTSAI import MCTSRacerAI, make_mcts_racer, run_rollout
+from MidnightRunners.simulation.SearchAI import get_next_turn_state
+from MidnightRunners.simulation.TurnOutcomes import get_board_fingerprint
+
+
+class TestMCTSRacerAI(unittest.TestCase):
+    """Test cases for choosing paths with rollouts"""
+
+    def setUp(self):
+        self.config = {Player.P1: Gunk, Player.P2: Suckerfish}
+        self.bs = BoardState(2, Track(TrackVersion.MILD), {Player.P1: RacerName.GUNK, Player.P2: RacerName.SUCKERFISH})
+        self.bs.current_turn_phase = TurnPhase.PH3_MAIN_MOVE
+        self.bs.racer_name_to_position_map[RacerName.GUNK] = 20
+        self.bs.racer_name_to_position_map[RacerName.SUCKERFISH] = 5
+        self.ai = MCTSRacerAI(Player.P2, RacerName.SUCKERFISH, TrackVersion.MILD, self.config,
+                              time_budget=60.0, max_iterations=16, batch_size=4, seed=1)
+
+    def get_options(self, positions: list) -> list:
+        options = []
+        for position in positions:
+            option = deepcopy(self.bs)
+            option.racer_name_to_position_map[RacerName.SUCKERFISH] = position
+            options.append(option)
+        return options
+
+    def test_rollout_path(self):
+        """Test that a rollout plays to the end and records the first turns"""
+        next_bs = get_next_turn_state(self.get_options([5])[0])
+        points, path = run_rollout(TrackVersion.MILD, self.config, next_bs, Player.P2, seed=3, tree_depth=2)
+        self.assertEqual(path[0], (get_board_fingerprint(next_bs), 0))
+        self.assertEqual(len(path), 2)
+        self.assertGreaterEqual(points, path[-1][1])
+
+    def test_prefers_progress(self):
+        """Test that riding along with the leader is chosen over staying behind"""
+        self.assertEqual(self.ai.choose_path(self.bs, self.get_options([5, 20])), 1)
+        self.assertEqual(self.ai.last_num_iterations, 16)
+
+    def test_tree_reused(self):
+        """Test that a repeated decision is answered from the kept tree without new rollouts"""
+        options = self.get_options([5, 20])
+        chosen_index = self.ai.choose_path(self.bs, options)
+        self.assertEqual(self.ai.choose_path(self.bs, options), chosen_index)
+        self.assertEqual(self.ai.last_num_iterations, 0)
+
+        self.bs.current_turn_number = -1  # Going back in turns means a new race
+        self.ai.choose_path(self.bs, options)
+        self.assertEqual(self.ai.last_num_iterations, 16)
+
+    def test_time_budget(self):
+        """Test that an exhausted time budget still gives a valid choice"""
+        self.ai.time_budget = 0.0
+        self.assertIn(self.ai.choose_path(self.bs, self.get_options([5, 20])), [0, 1])
+        self.assertEqual(self.ai.last_num_iterations, 0)
+
+    def test_worker_pool(self):
+        """Test that rollouts spread over a pool give the same statistics as in process"""
+        options = self.get_options([5, 20])
+        pool_ai = MCTSRacerAI(Player.P2, RacerName.SUCKERFISH, TrackVersion.MILD, self.config,
+                              time_budget=60.0, max_iterations=16, batch_size=4, num_workers=2, seed=1)
+        try:
+            self.assertEqual(pool_ai.choose_path(self.bs, options), self.ai.choose_path(self.bs, options))
+        finally:
+            pool_ai.close()
+        self.assertIsNone(pool_ai.executor)
+        self.assertEqual({fingerprint: (node.visits, node.total_points) for fingerprint, node in pool_ai.nodes.items()},
+                         {fingerprint: (node.visits, node.total_points) for fingerprint, node in self.ai.nodes.items()})
+
+    def test_in_batch(self):
+        """Test that a racer with the MCTS AI can race in a batch"""
+        config = {Player.P1: Gunk,
+                  Player.P2: partial(make_mcts_racer, Suckerfish, TrackVersion.MILD, self.config, max_iterations=2)}
+        batch = run_batch(TrackVersion.MILD, config, num_races=1, seed=3)
+        self.assertGreaterEqual(batch.first_place[0], 0)
+
+    def test_in_batch_with_pool(self):
+        """Test that racers of a batch share the caller's pool and leave no pool open"""
+        with self.assertRaises(ValueError):
+            make_mcts_racer(Suckerfish, TrackVersion.MILD, self.config, Player.P2, num_workers=2)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            config = {Player.P1: Gunk,
+                      Player.P2: partial(make_mcts_racer, Suckerfish, TrackVersion.MILD, self.config, max_iterations=4,
+                                         batch_size=4, num_workers=2, executor=executor)}
+            batch = run_batch(TrackVersion.MILD, config, num_races=3, seed=3)
+            self.assertTrue((batch.first_place >= 0).all())
+            self.assertLessEqual(len(multiprocessing.active_children()), 2)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Unit tests for the background race batch worker of the GUI
+"""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import TrackVersion
+
+try:
+    from gui.race_batch_worker import RaceBatchWorker
+except ImportError:
+    RaceBatchWorker = None
+
+
+@unittest.skipIf(RaceBatchWorker is None, "PyQt6 is not installed")
+class TestRaceBatchWorker(unittest.TestCase):
+    """Test cases for streaming races from the batch worker"""
+
+    def setUp(self):
+        self.worker = RaceBatchWorker(TrackVersion.WILD, {Player.P1: Banana, Player.P2: Gunk}, 3, verbose=False)
+        self.races = []
+        self.progress = []
+        self.cancelled = []
+        self.worker.race_finished.connect(self.races.append)
+        self.worker.progress.connect(lambda *args: self.progress.append(args))
+        self.worker.finished.connect(self.cancelled.append)
+
+    def run_worker(self):
+        with redirect_stdout(io.StringIO()):
+            self.worker.run()
+
+    def test_streams_every_race(self):
+        """Test that every race is streamed with its replay data and progress"""
+        self.run_worker()
+        self.assertEqual([race_data['race_number'] for race_data in self.races], [1, 2, 3])
+        self.assertTrue(all(race_data['race'].board_state.race_is_finished for race_data in self.races))
+        self.assertEqual([(done, total) for done, total, _ in self.progress], [(1, 3), (2, 3), (3, 3)])
+        self.assertTrue(all(rate > 0 for _, _, rate in self.progress))
+        self.assertEqual(self.cancelled, [False])
+
+    def test_cancel(self):
+        """Test that cancelling stops the batch after the current race"""
+        self.worker.race_finished.connect(lambda race_data: self.worker.cancel())
+        self.run_worker()
+        self.assertEqual(len(self.races), 1)
+        self.assertEqual(self.cancelled, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
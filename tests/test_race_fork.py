@@ -0,0 +1,57 @@
+"""
+Unit tests for estimating outcomes from continuations of a race snapshot
+"""
+
+import unittest
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.RaceSnapshot import RaceSnapshot
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.RaceFork import fork_race, run_continuations
+
+
+class TestRaceFork(unittest.TestCase):
+    """Test cases for forking a race into seeded continuations"""
+
+    @classmethod
+    def setUpClass(cls):
+        race = Race(TrackVersion.MILD, {Player.P1: Gunk(Player.P1), Player.P2: Banana(Player.P2)}, dice=Dice(2), verbose=False)
+        race.trigger_before_race_powers()
+        for _ in range(4):
+            race.do_turn()
+        cls.race = race
+        cls.snapshot = RaceSnapshot(race)
+
+    def test_probabilities(self):
+        """Test that every continuation finishes and the probabilities add up"""
+        result = fork_race(self.snapshot, num_continuations=20, seed=3, chunk_size=8)
+        self.assertEqual(result.num_continuations, 20)
+        self.assertEqual(result.racer_names, [RacerName.GUNK, RacerName.BANANA])
+        self.assertAlmostEqual(sum(result.win_probabilities().values()), 1.0)
+        self.assertAlmostEqual(sum(result.second_place_probabilities().values()), 1.0)
+        self.assertTrue((result.num_turns >= self.race.num_turns_taken).all())
+        self.assertIn("20 continuations", result.format_summary())
+
+    def test_reproducible_across_chunks(self):
+        """Test that continuation k always uses seed + k, however the continuations are chunked"""
+        whole = fork_race(self.snapshot, num_continuations=6, seed=10, chunk_size=6)
+        chunked = fork_race(self.snapshot, num_continuations=6, seed=10, chunk_size=4)
+        single = run_continuations(self.snapshot.to_bytes(), [14])
+        self.assertEqual(whole.points.tolist(), chunked.points.tolist())
+        self.assertEqual(whole.first_place.tolist(), chunked.first_place.tolist())
+        self.assertEqual(whole.points[4].tolist(), single.points[0].tolist())
+
+    def test_worker_pool(self):
+        """Test that continuations run in a process pool give the same results"""
+        serial = fork_race(self.snapshot, num_continuations=4, seed=1, chunk_size=2)
+        parallel = fork_race(self.snapshot, num_continuations=4, seed=1, num_workers=2, chunk_size=2)
+        self.assertEqual(serial.points.tolist(), parallel.points.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Unit tests for the opt-in race profiler
+"""
+
+import unittest
+
+import numpy as np
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Profiler import (
+    RaceProfiler, RACE_OWNER, STAGE_RACE, STAGE_POWER_CHANGES, STAGE_RACER_TRIGGERS, STAGE_TRIGGER_PASS
+)
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import run_batch
+
+
+class TestRaceProfiler(unittest.TestCase):
+    """Test cases for profiling the stages of a batch of races"""
+
+    def setUp(self):
+        self.config = {Player.P1: Banana, Player.P2: Gunk}
+        self.profiler = RaceProfiler()
+        self.batch = run_batch(TrackVersion.MILD, self.config, num_races=3, seed=1, profiler=self.profiler)
+
+    def test_costs_aggregated_over_batch(self):
+        """Test that every race and every trigger pass of the batch is counted"""
+        self.assertEqual(self.profiler.get_stats(RACE_OWNER, STAGE_RACE).calls, 3)
+        num_passes = self.profiler.get_stats(RACE_OWNER, STAGE_TRIGGER_PASS).calls
+        self.assertGreater(num_passes, int(self.batch.num_turns.sum()))
+
+        racer_costs = self.profiler.get_racer_costs()
+        self.assertEqual(set(racer_costs.keys()), {"Banana", "Gunk"})
+        for stages in racer_costs.values():
+            # Every racer is asked for triggers once per pass
+            self.assertEqual(stages[STAGE_RACER_TRIGGERS].calls, num_passes)
+            self.assertEqual(stages[STAGE_POWER_CHANGES].calls, num_passes)
+            self.assertLessEqual(stages[STAGE_POWER_CHANGES].total_time, stages[STAGE_RACER_TRIGGERS].total_time)
+
+    def test_cost_table(self):
+        """Test that the cost table is sorted by total time and the race itself is the full share"""
+        rows = self.profiler.get_cost_table()
+        self.assertEqual(rows[0][:2], (RACE_OWNER, STAGE_RACE))
+        self.assertAlmostEqual(rows[0][5], 1.0)
+        self.assertEqual([row[3] for row in rows], sorted((row[3] for row in rows), reverse=True))
+        self.assertIn("Gunk", self.profiler.format_cost_table())
+
+    def test_profiling_does_not_change_results(self):
+        """Test that a profiled batch has the same outcome as an unprofiled object engine batch"""
+        unprofiled = run_batch(TrackVersion.MILD, self.config, num_races=3, seed=1)
+        self.assertFalse(unprofiled.vectorized)
+        np.testing.assert_array_equal(self.batch.points, unprofiled.points)
+        np.testing.assert_array_equal(self.batch.num_turns, unprofiled.num_turns)
+
+
+if __name__ == '__main__':
+    unittest.main()
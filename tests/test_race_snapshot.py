@@ -0,0 +1,99 @@
+"""
+Unit tests for pausing, serializing and restoring races with snapshots
+"""
+
+import random
+import unittest
+from copy import deepcopy
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.CR_Mouth import Mouth
+from MidnightRunners.core.Dice import Dice
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.RaceSnapshot import RaceSnapshot
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+
+
+def make_race(seed, dice=None):
+    lineup = {Player.P1: Gunk(Player.P1), Player.P2: Banana(Player.P2), Player.P3: Mouth(Player.P3)}
+    return Race(TrackVersion.WILD, lineup, dice=dice if dice is not None else Dice(seed), verbose=False)
+
+
+def get_outcome(race):
+    bs = race.board_state
+    return (dict(bs.player_points_map), dict(bs.racer_name_to_position_map), bs.first_place_racer,
+            bs.second_place_racer, race.num_turns_taken)
+
+
+class TestRaceSnapshot(unittest.TestCase):
+    """Test cases for restoring races that go on exactly like the original"""
+
+    def test_restored_race_finishes_like_original(self):
+        """Test that a race restored mid-race from serialized data ends like the uninterrupted race"""
+        for seed in range(3):
+            full_race = make_race(seed)
+            full_changes = full_race.do_race()
+
+            race = make_race(seed)
+            race.trigger_before_race_powers()
+            for _ in range(5):
+                race.do_turn()
+            snapshot = RaceSnapshot.from_bytes(RaceSnapshot(race).to_bytes())
+            first_changes = list(race.full_race_change_list)
+            restored = snapshot.restore()
+            restored_changes = restored.continue_race()
+
+            self.assertEqual(get_outcome(restored), get_outcome(full_race))
+            self.assertEqual(len(first_changes) + len(restored_changes), len(full_changes))
+            self.assertEqual([change.change_id for change in restored_changes],
+                             [change.change_id for change in full_changes[len(first_changes):]])
+
+    def test_snapshot_is_independent(self):
+        """Test that going on with the original race or a restored one leaves the snapshot unchanged"""
+        race = make_race(7)
+        race.do_turn()
+        snapshot = RaceSnapshot(race)
+        race.do_race()
+        first = snapshot.restore()
+        first.continue_race()
+        second = snapshot.restore()
+        second.continue_race()
+        self.assertEqual(get_outcome(first), get_outcome(second))
+        self.assertIs(first.player_to_racer_map[Player.P1].dice, first.dice)
+
+    def test_unseeded_dice_and_fresh_race(self):
+        """Test that the global random state is restored and that an unstarted race is started on restore"""
+        random.seed(11)
+        snapshot = RaceSnapshot(make_race(None, dice=Dice()))
+        outcomes = []
+        for _ in range(2):
+            race = snapshot.restore()
+            self.assertFalse(race.race_started)
+            race.continue_race()
+            outcomes.append(get_outcome(race))
+        self.assertEqual(outcomes[0], outcomes[1])
+
+    def test_from_board_state(self):
+        """Test that a replayed board state between turns can be restored, and others are refused"""
+        race = make_race(5)
+        race.trigger_before_race_powers()
+        race.do_turn()
+        race.do_turn()
+        bs = deepcopy(race.board_state)
+        lineup = {player: type(racer)(player) for player, racer in race.player_to_racer_map.items()}
+        restored = RaceSnapshot.from_board_state(TrackVersion.WILD, lineup, bs, dice=Dice(5)).restore()
+        self.assertEqual(restored.num_turns_taken, bs.current_turn_number)
+        restored.continue_race()
+        self.assertTrue(restored.board_state.race_is_finished)
+
+        race.do_turn_phase()
+        self.assertNotEqual(race.board_state.current_turn_phase, TurnPhase.PH0_BETWEEN_TURNS)
+        with self.assertRaises(ValueError):
+            RaceSnapshot.from_board_state(TrackVersion.WILD, lineup, race.board_state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Unit tests for the compressed store of completed races of the GUI
+"""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from copy import deepcopy
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Track import TrackVersion
+
+try:
+    from gui.race_store import CompletedRaceStore
+except ImportError:
+    CompletedRaceStore = None
+
+
+def run_race(race_number):
+    race = Race(TrackVersion.WILD, {Player.P1: Banana(Player.P1), Player.P2: Gunk(Player.P2)}, verbose=False)
+    initial_board_state = deepcopy(race.board_state)
+    return {
+        'race_number': race_number,
+        'race': race,
+        'initial_board_state': initial_board_state,
+        'changeset': race.do_race()
+    }
+
+
+@unittest.skipIf(CompletedRaceStore is None, "PyQt6 is not installed")
+class TestCompletedRaceStore(unittest.TestCase):
+    """Test cases for storing races compressed and decoding them on demand"""
+
+    @classmethod
+    def setUpClass(cls):
+        with redirect_stdout(io.StringIO()):
+            cls.races = [run_race(race_number) for race_number in range(1, 4)]
+
+    def setUp(self):
+        self.store = CompletedRaceStore(max_decoded_races=2)
+        for race_data in self.races:
+            self.store.append(race_data)
+
+    def test_races_round_trip(self):
+        """Test that decoded races replay like the original ones"""
+        self.assertEqual(len(self.store), 3)
+        for race_data, stored in zip(self.races, self.store):
+            self.assertEqual(stored['race_number'], race_data['race_number'])
+            self.assertEqual(len(stored['changeset']), len(race_data['changeset']))
+            bs = deepcopy(stored['initial_board_state'])
+            bs.apply_change_list(stored['changeset'])
+            self.assertEqual(bs.player_points_map, race_data['race'].board_state.player_points_map)
+            self.assertEqual(bs.first_place_racer, race_data['race'].board_state.first_place_racer)
+        self.assertEqual(self.store[-1]['race_number'], 3)
+        with self.assertRaises(IndexError):
+            self.store[3]
+
+    def test_stays_compressed_until_read(self):
+        """Test that races are only decoded when read and that few stay decoded"""
+        self.assertEqual(len(self.store.decoded_races), 0)
+        self.assertIs(self.store[0], self.store[0])
+        self.store[1]
+        self.store[0]
+        self.store[2]
+        self.assertEqual(list(self.store.decoded_races), [0, 2])
+        self.assertLess(self.store.get_encoded_size(), 100_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
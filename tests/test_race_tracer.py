@@ -0,0 +1,71 @@
+"""
+Unit tests for the Chrome trace export of a race
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.RaceTracer import (
+    RaceTracer, CATEGORY_TURN, CATEGORY_PHASE, CATEGORY_TRIGGERS, CATEGORY_RACER, CATEGORY_TRACK, trace
+)
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation.BatchEngine import DiceTable, replay_race, run_batch
+
+
+class TestRaceTracer(unittest.TestCase):
+    """Test cases for tracing a single race of a batch"""
+
+    def setUp(self):
+        self.config = {Player.P1: Banana, Player.P2: Gunk}
+        self.tracer = RaceTracer()
+        self.race = replay_race(TrackVersion.WILD, self.config, DiceTable(5, 4, 2), 2, tracer=self.tracer)
+
+    def test_replay_matches_batch(self):
+        """Test that a replayed race has the outcome of the same race in the batch"""
+        batch = run_batch(TrackVersion.WILD, self.config, num_races=4, seed=5)
+        self.assertEqual(batch.num_turns[2], self.race.board_state.current_turn_number)
+        self.assertEqual(list(batch.points[2]), [self.race.board_state.player_points_map[player] for player in batch.players])
+
+    def test_spans_are_nested(self):
+        """Test that every turn, phase and trigger call is recorded inside its parent span"""
+        turns = self.tracer.get_spans(CATEGORY_TURN)
+        self.assertEqual(len(turns), self.race.board_state.current_turn_number)
+        self.assertGreater(len(self.tracer.get_spans(CATEGORY_PHASE)), 4 * (len(turns) - 1))
+        self.assertGreater(len(self.tracer.get_spans(CATEGORY_TRACK)), 0)
+
+        passes = self.tracer.get_spans(CATEGORY_TRIGGERS)
+        racer_calls = self.tracer.get_spans(CATEGORY_RACER)
+        # Both racers are asked for triggers in every pass
+        self.assertEqual(len(racer_calls), 2 * len(passes))
+        for racer_call in racer_calls:
+            self.assertIn("triggered", racer_call["args"])
+            parent = [span for span in passes if span["ts"] <= racer_call["ts"] and
+                      racer_call["ts"] + racer_call["dur"] <= span["ts"] + span["dur"]]
+            self.assertEqual(len(parent), 1)
+
+    def test_save(self):
+        """Test that the trace is saved as Chrome trace JSON"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "race.json")
+            self.tracer.save(path)
+            with open(path) as trace_file:
+                trace_json = json.load(trace_file)
+        timestamps = [event["ts"] for event in trace_json["traceEvents"]]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertTrue(all(event["ph"] == "X" for event in trace_json["traceEvents"]))
+
+    def test_untraced_spans_share_nothing(self):
+        """Test that arguments written without a tracer do not show up in later untraced spans"""
+        with trace(None, "first", CATEGORY_PHASE) as first_args:
+            first_args["num_changes"] = 3
+        with trace(None, "second", CATEGORY_PHASE) as second_args:
+            self.assertEqual(second_args, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
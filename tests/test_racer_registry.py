@@ -0,0 +1,75 @@
+"""
+Unit tests for the lazily importing racer registry
+"""
+
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+
+from MidnightRunners.concreteracers import RacerRegistry
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.concreteracers.RacerRegistry import (get_available_racers, get_player_racer_config,
+                                                          get_racer_factory, register_racer)
+from MidnightRunners.core.AbstractRacer import AbstractRacer
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race
+from MidnightRunners.core.Track import TrackVersion
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_egg(player):
+    """Plugin style factory for a racer without a concrete racer module."""
+    return AbstractRacer(player, RacerName.EGG)
+
+
+class TestRacerRegistry(unittest.TestCase):
+    """Test cases for finding racers by name and importing them on first use"""
+
+    def tearDown(self):
+        RacerRegistry.registered_racers.pop(RacerName.EGG, None)
+        RacerRegistry.racer_factories.pop(RacerName.EGG, None)
+
+    def test_available_racers(self):
+        """Test that racers are found by module name and racers without a module are not offered"""
+        self.assertEqual(get_available_racers(),
+                         [RacerName.BANANA, RacerName.ROMANTIC, RacerName.GUNK, RacerName.MOUTH, RacerName.SUCKERFISH])
+        self.assertIs(get_racer_factory(RacerName.BANANA), Banana)
+        with self.assertRaises(KeyError):
+            get_racer_factory(RacerName.EGG)
+
+    def test_listing_does_not_import_racers(self):
+        """Test that listing the racers in a fresh process loads none of the racer modules"""
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys; from MidnightRunners.concreteracers.RacerRegistry import get_available_racers; "
+             "get_available_racers(); print('\\n'.join(sys.modules))"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual([module for module in result.stdout.split() if ".CR_" in module], [])
+
+    def test_registered_plugin_racer(self):
+        """Test that a registered factory is offered and builds its racer"""
+        with self.assertRaises(ValueError):
+            register_racer(RacerName.EGG, "no_attribute_given")
+        register_racer(RacerName.EGG, f"{__name__}:make_egg")
+        self.assertIn(RacerName.EGG, get_available_racers())
+        egg = get_racer_factory(RacerName.EGG)(Player.P2)
+        self.assertEqual((egg.player_name, egg.name), (Player.P2, RacerName.EGG))
+
+    def test_lineup_from_names(self):
+        """Test that a lineup built from names runs a race and can be sent to pool workers"""
+        config = get_player_racer_config([RacerName.GUNK, RacerName.BANANA])
+        self.assertEqual(config, {Player.P1: Gunk, Player.P2: Banana})
+        self.assertEqual(pickle.loads(pickle.dumps(config)), config)
+        race = Race(TrackVersion.MILD, {player: factory(player) for player, factory in config.items()}, verbose=False)
+        race.do_race()
+        self.assertTrue(race.board_state.race_is_finished)
+        with self.assertRaises(ValueError):
+            get_player_racer_config([RacerName.GUNK] * 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
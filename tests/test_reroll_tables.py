@@ -0,0 +1,66 @@
+"""
+Unit tests for the precomputed reroll tables
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import Track, TrackVersion
+from MidnightRunners.simulation.RerollTables import (
+    DEFAULT_MAX_REROLLS, NO_OPPONENT, TableRerollAI, load_reroll_table, save_reroll_tables, solve_reroll_table
+)
+
+
+class TestRerollTables(unittest.TestCase):
+    """Test cases for generating and using the reroll tables"""
+
+    def test_saved_tables_up_to_date(self):
+        """Test that the shipped tables match freshly solved ones"""
+        for track_version in TrackVersion:
+            decisions, _ = solve_reroll_table(track_version)
+            np.testing.assert_array_equal(load_reroll_table(track_version), decisions)
+
+    def test_decisions(self):
+        """Test that low rolls are rerolled at the start and nothing is rerolled when finishing anyway"""
+        decisions, _ = solve_reroll_table(TrackVersion.MILD)
+        self.assertTrue(decisions[0, 0, 0, 0, 0, 0])
+        self.assertFalse(decisions[0, 0, 0, 0, 0, 5])
+        self.assertFalse(decisions[0, 27, NO_OPPONENT, 0].any())
+
+    def test_rerolls_add_value(self):
+        """Test that the expected points with optimal rerolls beat those without rerolls"""
+        for track_version in TrackVersion:
+            _, values = solve_reroll_table(track_version)
+            _, values_without_rerolls = solve_reroll_table(track_version, max_rerolls=0)
+            self.assertGreater(values[0, 0, 0, 0], values_without_rerolls[0, 0, 0, 0])
+            self.assertTrue((values >= values_without_rerolls - 1e-9).all())
+
+    def test_ai_lookup(self):
+        """Test that the AI looks up its position against the leading opponent"""
+        racer_names = {Player.P1: RacerName.GUNK, Player.P2: RacerName.BANANA, Player.P3: RacerName.MOUTH}
+        bs = BoardState(3, Track(TrackVersion.MILD), racer_names)
+        bs.racer_name_to_position_map.update({RacerName.GUNK: 20, RacerName.BANANA: 25, RacerName.MOUTH: 3})
+        ai = TableRerollAI(Player.P1, RacerName.GUNK)
+        table = load_reroll_table(TrackVersion.MILD)
+        for rolled_value in range(1, 7):
+            self.assertEqual(ai.decide_reroll(bs, 0, rolled_value), bool(table[0, 20, 25, 0, 0, rolled_value - 1]))
+        self.assertFalse(ai.decide_reroll(bs, DEFAULT_MAX_REROLLS, 1))
+
+    def test_missing_table(self):
+        """Test that tables are saved to and loaded from a given directory"""
+        with tempfile.TemporaryDirectory() as table_dir:
+            with self.assertRaises(FileNotFoundError):
+                load_reroll_table(TrackVersion.WILD, table_dir)
+            save_reroll_tables(table_dir, max_rerolls=1)
+            self.assertTrue(os.path.exists(os.path.join(table_dir, "reroll_WILD.npy")))
+            self.assertEqual(load_reroll_table(TrackVersion.WILD, table_dir).shape[4], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
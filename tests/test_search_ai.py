@@ -0,0 +1,85 @@
+"""
+Unit tests for the expectimax racer AI
+"""
+
+import unittest
+from copy import deepcopy
+from functools import partial
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.CR_Suckerfish import Suckerfish
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Track import Track, TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+from MidnightRunners.simulation.BatchEngine import run_batch
+from MidnightRunners.simulation.SearchAI import ExpectimaxRacerAI, get_next_turn_state, make_expectimax_racer
+
+
+class TestExpectimaxRacerAI(unittest.TestCase):
+    """Test cases for choosing paths with expectimax search"""
+
+    def setUp(self):
+        self.config = {Player.P1: Gunk, Player.P2: Suckerfish}
+        self.bs = BoardState(2, Track(TrackVersion.MILD), {Player.P1: RacerName.GUNK, Player.P2: RacerName.SUCKERFISH})
+        self.bs.current_turn_phase = TurnPhase.PH3_MAIN_MOVE
+        self.bs.racer_name_to_position_map[RacerName.GUNK] = 12
+        self.bs.racer_name_to_position_map[RacerName.SUCKERFISH] = 5
+        self.ai = ExpectimaxRacerAI(Player.P2, RacerName.SUCKERFISH, TrackVersion.MILD, self.config,
+                                    max_depth=2, time_budget=10.0)
+
+    def get_options(self, positions: list) -> list:
+        options = []
+        for position in positions:
+            option = deepcopy(self.bs)
+            option.racer_name_to_position_map[RacerName.SUCKERFISH] = position
+            options.append(option)
+        return options
+
+    def test_prefers_progress(self):
+        """Test that riding along to a further space is chosen"""
+        self.assertEqual(self.ai.choose_path(self.bs, self.get_options([5, 12])), 1)
+        self.assertEqual(self.ai.last_completed_depth, 2)
+
+    def test_prefers_finishing_first(self):
+        """Test that an option that finishes first wins over one that does not"""
+        options = self.get_options([29, -1])
+        options[1].first_place_racer = RacerName.SUCKERFISH
+        options[1].player_points_map[Player.P2] += options[1].pts_reward_first_place
+        self.assertEqual(self.ai.choose_path(self.bs, options), 1)
+
+    def test_time_budget(self):
+        """Test that an exhausted time budget still gives the depth 0 choice"""
+        self.ai.time_budget = 0.0
+        self.assertEqual(self.ai.choose_path(self.bs, self.get_options([5, 12])), 1)
+        self.assertEqual(self.ai.last_completed_depth, 0)
+
+    def test_transposition_table_reused(self):
+        """Test that a repeated decision is answered from the transposition table"""
+        options = self.get_options([5, 12])
+        self.ai.choose_path(self.bs, options)
+        num_entries = len(self.ai.transposition_table)
+        self.assertGreater(num_entries, 0)
+        self.ai.choose_path(self.bs, options)
+        self.assertEqual(len(self.ai.transposition_table), num_entries)
+
+    def test_next_turn_state(self):
+        """Test that the next turn goes to the next player still in the race"""
+        next_bs = get_next_turn_state(self.bs)
+        self.assertEqual(next_bs.turn_order[0], Player.P2)
+        self.assertEqual(next_bs.current_turn_phase, TurnPhase.PH0_BETWEEN_TURNS)
+
+        self.bs.first_place_racer = RacerName.SUCKERFISH
+        self.assertEqual(get_next_turn_state(self.bs).turn_order[0], Player.P1)
+
+    def test_in_batch(self):
+        """Test that a racer with the search AI can race in a batch"""
+        config = {Player.P1: Gunk,
+                  Player.P2: partial(make_expectimax_racer, Suckerfish, TrackVersion.MILD, self.config, time_budget=0.01)}
+        batch = run_batch(TrackVersion.MILD, config, num_races=1, seed=3)
+        self.assertGreaterEqual(batch.first_place[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Unit tests for the tournament runner and its result cache
+"""
+
+import os
+import tempfile
+import unittest
+
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.simulation import Tournament
+from MidnightRunners.simulation.Tournament import (
+    TournamentConfig, enumerate_configs, get_cache_key, get_engine_source_paths, run_tournament
+)
+
+
+class TestEnumerateConfigs(unittest.TestCase):
+    """Test cases for enumerating tournament configurations"""
+
+    def test_all_lineups_on_both_tracks(self):
+        """Test that every seat order of every subset of 2 to 5 racers is enumerated for both tracks"""
+        configs = enumerate_configs()
+        # 5*4 + 5*4*3 + 5*4*3*2 + 5*4*3*2*1 lineups per track
+        self.assertEqual(len(configs), 2 * (20 + 60 + 120 + 120))
+        self.assertEqual(len({(config.track_version, config.racer_names) for config in configs}), len(configs))
+
+    def test_restricted_lineups(self):
+        """Test that the racers, player counts and tracks can be restricted"""
+        configs = enumerate_configs([RacerName.GUNK, RacerName.MOUTH, RacerName.BANANA], 3, 3, [TrackVersion.MILD])
+        self.assertEqual(len(configs), 6)
+        self.assertTrue(all(config.track_version == TrackVersion.MILD for config in configs))
+
+
+class TestTournamentCache(unittest.TestCase):
+    """Test cases for reusing cached tournament results"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.configs = enumerate_configs([RacerName.GUNK, RacerName.BANANA], 2, 2, [TrackVersion.MILD])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cache_key_covers_seed_range(self):
+        """Test that the cache key changes with the configuration, race count and seed"""
+        config = TournamentConfig(TrackVersion.MILD, (RacerName.GUNK, RacerName.BANANA))
+        swapped = TournamentConfig(TrackVersion.MILD, (RacerName.BANANA, RacerName.GUNK))
+        key = get_cache_key(config, 10, 0)
+
+        self.assertEqual(key, get_cache_key(config, 10, 0))
+        self.assertNotEqual(key, get_cache_key(swapped, 10, 0))
+        self.assertNotEqual(key, get_cache_key(config, 11, 0))
+        self.assertNotEqual(key, get_cache_key(config, 10, 1))
+
+    def test_cache_key_covers_engine_sources(self):
+        """Test that the cache key changes with any core module, the AIs included, and the racer registry"""
+        config = TournamentConfig(TrackVersion.MILD, (RacerName.GUNK, RacerName.BANANA))
+        key = get_cache_key(config, 10, 0)
+        paths = get_engine_source_paths()
+        for module_file in ["RacerAI.py", "CausalGraph.py", "RacerRegistry.py"]:
+            with self.subTest(module_file=module_file):
+                path = next(path for path in paths if os.path.basename(path) == module_file)
+                original_hash = Tournament.module_source_hashes[path]
+                Tournament.module_source_hashes[path] = "edited"
+                try:
+                    self.assertNotEqual(key, get_cache_key(config, 10, 0))
+                finally:
+                    Tournament.module_source_hashes[path] = original_hash
+        self.assertEqual(key, get_cache_key(config, 10, 0))
+
+    def test_second_run_uses_cache(self):
+        """Test that a second run with the same settings only reads cached results"""
+        first_run = []
+        summaries = run_tournament(self.configs, 2, cache_dir=self.temp_dir.name,
+                                   progress_callback=lambda config, summary, cached: first_run.append(cached))
+        second_run = []
+        cached_summaries = run_tournament(self.configs, 2, cache_dir=self.temp_dir.name,
+                                          progress_callback=lambda config, summary, cached: second_run.append(cached))
+
+        self.assertEqual(first_run, [False, False])
+        self.assertEqual(second_run, [True, True])
+        self.assertEqual(summaries, cached_summaries)
+        self.assertEqual(len(os.listdir(self.temp_dir.name)), 2)
+        self.assertAlmostEqual(sum(summaries[0]["win_rates"].values()), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Unit tests for the trigger amplification counters
+"""
+
+import unittest
+
+from MidnightRunners.concreteracers.CR_Banana import Banana
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.AbstractRacer import AbstractRacer
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.Race import Race, num_turns_limit
+from MidnightRunners.core.Track import TrackVersion
+from MidnightRunners.core.TriggerCounters import TriggerCounters, STOP_RACE_FINISHED
+from MidnightRunners.simulation.BatchEngine import run_batch
+
+
+class Sleeper(AbstractRacer):
+    """Racer that never moves, so races only end by the turn limit"""
+    def __init__(self, player_name: Player):
+        super().__init__(player_name, RacerName.EGG)
+
+    def get_main_move_changes(self, board_state) -> list:
+        return []
+
+
+class TestTriggerCounters(unittest.TestCase):
+    """Test cases for counting change set reprocessing"""
+
+    def test_batch_counters(self):
+        """Test that the counters of a batch add up over races and turn phases"""
+        counters = TriggerCounters()
+        batch = run_batch(TrackVersion.WILD, {Player.P1: Banana, Player.P2: Gunk}, num_races=3, seed=4,
+                          trigger_counters=counters)
+
+        self.assertFalse(batch.vectorized)
+        self.assertEqual(counters.num_races, 3)
+        self.assertEqual(counters.races_ended_by_turn_limit, 0)
+        self.assertEqual(counters.stop_reasons[STOP_RACE_FINISHED], 3)
+        self.assertEqual(sum(counters.stop_reasons.values()), counters.num_check_triggers_calls)
+        self.assertEqual(sum(counters.passes_histogram.values()), counters.num_check_triggers_calls)
+        self.assertGreaterEqual(counters.get_mean_passes(), 1.0)
+        for owner in ["Banana", "Gunk", "Track"]:
+            self.assertLessEqual(counters.change_processings[owner], counters.change_visits[owner])
+            self.assertGreater(counters.get_amplification(owner), 0.0)
+        self.assertIn("Gunk", counters.format_summary())
+
+    def test_turn_limit_counted(self):
+        """Test that a race that never finishes is counted as ended by the turn limit"""
+        counters = TriggerCounters()
+        race = Race(TrackVersion.MILD, {Player.P1: Sleeper(Player.P1)}, verbose=False, trigger_counters=counters)
+        race.do_race()
+
+        self.assertEqual(race.num_turns_taken, num_turns_limit + 1)
+        self.assertEqual(counters.num_races, 1)
+        self.assertEqual(counters.races_ended_by_turn_limit, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the turn outcome distribution
+"""
+
+import unittest
+
+from MidnightRunners.concreteracers.CR_Gunk import Gunk
+from MidnightRunners.concreteracers.CR_Suckerfish import Suckerfish
+from MidnightRunners.concreteracers.RacerList import RacerName
+from MidnightRunners.core.AbstractRacer import AbstractRacer
+from MidnightRunners.core.BoardState import BoardState
+from MidnightRunners.core.Player import Player
+from MidnightRunners.core.StateChange import ChangeSet, MoveType, PositionChange
+from MidnightRunners.core.Track import Track, TrackVersion
+from MidnightRunners.core.Turn import TurnPhase
+from MidnightRunners.simulation.BatchEngine import get_lineup
+from MidnightRunners.simulation.TurnOutcomes import get_turn_outcomes, outcome_cache
+
+from racer_stubs import Egg
+
+
+class Reroller(AbstractRacer):
+    """Racer that rerolls its main move once when its AI asks for it (below 4)"""
+    def __init__(self, player_name: Player):
+        super().__init__(player_name, RacerName.ROCKET_SCIENTIST)
+
+    def main_move(self, board_state) -> list:
+        roll = self.dice.roll(self.player_name)
+        if self.ai.decide_reroll(board_state, 0, roll):
+            roll = self.dice.roll(self.player_name)
+        current_position = board_state.racer_name_to_position_map[self.name]
+        pos_change = PositionChange(self.name, current_position, Track.GetNewSpace(current_position, roll))
+        pos_change.set_move_type(MoveType.MAIN)
+        pos_change.set_intended_movement(roll)
+        change = ChangeSet()
+        change.add_pos_change_obj(pos_change)
+        return [change]
+
+
+def get_board_state(track_version: TrackVersion, player_racer_config: dict) -> BoardState:
+    lineup = get_lineup(player_racer_config)
+    return BoardState(len(lineup), Track(track_version), {player: racer.name for player, racer in lineup.items()})
+
+
+class TestTurnOutcomes(unittest.TestCase):
+    """Test cases for enumerating the outcomes of one turn"""
+
+    def test_six_rolls_with_powers(self):
+        """Test that each roll gives its own outcome, resolved with the racers' powers"""
+        config = {Player.P1: Egg, Player.P2: Gunk, Player.P3: Suckerfish}
+        outcomes = get_turn_outcomes(TrackVersion.MILD, config, get_board_state(TrackVersion.MILD, config))
+
+        self.assertEqual(len(outcomes), 6)
+        self.assertAlmostEqual(sum(outcome.probability for outcome in outcomes), 1.0)
+        for outcome in outcomes:
+            roll = outcome.roll_sequences[0][0]
+            positions = outcome.board_state.racer_name_to_position_map
+            # Gunk slows the move by one and Suckerfish rides along from the start space
+            self.assertEqual(positions[RacerName.EGG], roll - 1)
+            self.assertEqual(positions[RacerName.SUCKERFISH], roll - 1 if roll > 1 else 0)
+            self.assertEqual(outcome.board_state.turn_order[0], Player.P2)
+            self.assertEqual(outcome.board_state.current_turn_phase, TurnPhase.PH0_BETWEEN_TURNS)
+
+    def test_reroll_decisions_branch(self):
+        """Test that a reroll branches into six more rolls with the right probabilities"""
+        config = {Player.P1: Reroller, Player.P2: Egg}
+        outcomes = get_turn_outcomes(TrackVersion.MILD, config, get_board_state(TrackVersion.MILD, config))
+
+        probabilities = {outcome.board_state.racer_name_to_position_map[RacerName.ROCKET_SCIENTIST]: outcome.probability
+                         for outcome in outcomes}
+        self.assertAlmostEqual(probabilities[1], 1 / 12)
+        self.assertAlmostEqual(probabilities[4], 1 / 6 + 1 / 12)
+        self.assertEqual(sum(len(outcome.roll_sequences) for outcome in outcomes), 3 + 3 * 6)
+
+    def test_tripped_player_has_one_outcome(self):
+        """Test that a tripped active player gets back up without rolling"""
+        config = {Player.P1: Egg, Player.P2: Gunk}
+        bs = get_board_state(TrackVersion.MILD, config)
+        bs.racer_trip_map[RacerName.EGG] = True
+        outcomes = get_turn_outcomes(TrackVersion.MILD, config, bs)
+
+        self.assertEqual(len(outcomes), 1)
+        self.assertEqual(outcomes[0].probability, 1.0)
+        self.assertFalse(outcomes[0].board_state.racer_trip_map[RacerName.EGG])
+
+    def test_memoized_on_fingerprint(self):
+        """Test that states differing only in points share the memoized outcomes, rebased on their points"""
+        config = {Player.P1: Egg, Player.P2: Gunk}
+        bs = get_board_state(TrackVersion.WILD, config)
+        get_turn_outcomes(TrackVersion.WILD, config, bs)
+        num_cached = len(outcome_cache)
+
+        bs.player_points_map[Player.P1] = 5
+        outcomes = get_turn_outcomes(TrackVersion.WILD, config, bs)
+        self.assertEqual(len(outcome_cache), num_cached)
+        for outcome in outcomes:
+            self.assertEqual(outcome.board_state.player_points_map[Player.P1], 5 + outcome.points_gained[Player.P1])
+
+    def test_active_player_and_phase(self):
+        """Test that another active player can be chosen and only states between turns are accepted"""
+        config = {Player.P1: Egg, Player.P2: Gunk}
+        bs = get_board_state(TrackVersion.MILD, config)
+        outcomes = get_turn_outcomes(TrackVersion.MILD, config, bs, active_player=Player.P2)
+        self.assertEqual({outcome.board_state.racer_name_to_position_map[RacerName.GUNK] for outcome in outcomes},
+                         {1, 2, 3, 4, 5, 6})
+
+        bs.current_turn_phase = TurnPhase.PH3_MAIN_MOVE
+        with self.assertRaises(ValueError):
+            get_turn_outcomes(TrackVersion.MILD, config, bs)
+
+
+if __name__ == '__main__':
+    unittest.main()